@@ -0,0 +1,115 @@
+import unittest
+import sys
+import os
+import hashlib
+import tempfile
+import shutil
+import numpy as np
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from artifact_store import ArtifactStore, ArtifactEncoder, ArtifactTooLarge
+
+class ArtifactStoreTest(unittest.TestCase):
+    """Tests for the content-addressed result image store"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_artifacts_are_stored_by_content_hash(self):
+        """Test that the key is the SHA-256 of the bytes and identical data is stored once"""
+        store = ArtifactStore(max_bytes=1024)
+
+        digest = store.put(b'image bytes', 'image/png')
+        again = store.put(b'image bytes', 'image/png')
+
+        self.assertEqual(digest, hashlib.sha256(b'image bytes').hexdigest())
+        self.assertEqual(digest, again)
+        self.assertEqual(store.get(digest), (b'image bytes', 'image/png'))
+        self.assertEqual(store.stats()['artifacts'], 1)
+
+    def test_least_recently_used_artifact_is_evicted(self):
+        """Test that the byte budget drops the least recently used artifact"""
+        store = ArtifactStore(max_bytes=25)
+
+        first = store.put(b'a' * 10, 'image/png')
+        second = store.put(b'b' * 10, 'image/png')
+        store.get(first)  # second is now least recently used
+        store.put(b'c' * 10, 'image/png')
+
+        self.assertIsNone(store.get(second))
+        self.assertIsNotNone(store.get(first))
+        self.assertEqual(store.stats()['evictions'], 1)
+
+    def test_disk_store_survives_restart(self):
+        """Test that artifacts written to a directory are served by a new store"""
+        store = ArtifactStore(max_bytes=1024, directory=self.directory)
+        digest = store.put(b'webp bytes', 'image/webp')
+
+        self.assertTrue(os.path.exists(os.path.join(self.directory, f'{digest}.webp')))
+        restarted = ArtifactStore(max_bytes=1024, directory=self.directory)
+        self.assertEqual(restarted.get(digest), (b'webp bytes', 'image/webp'))
+
+    def test_disk_eviction_removes_files(self):
+        """Test that evicted on-disk artifacts are deleted"""
+        store = ArtifactStore(max_bytes=15, directory=self.directory)
+
+        first = store.put(b'a' * 10, 'image/png')
+        store.put(b'b' * 10, 'image/png')
+
+        self.assertFalse(os.path.exists(os.path.join(self.directory, f'{first}.png')))
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    def test_malformed_digest_is_rejected(self):
+        """Test that lookups cannot escape the store directory"""
+        store = ArtifactStore(max_bytes=1024, directory=self.directory)
+
+        self.assertIsNone(store.get('../../etc/passwd'))
+
+    def test_artifact_encoder_returns_urls(self):
+        """Test that the encoder stores the image and returns its artifact URL"""
+        store = ArtifactStore(max_bytes=1024 * 1024)
+        encoder = ArtifactEncoder(store, 'png')
+
+        url = encoder.render(np.zeros((4, 4, 3), dtype=np.float32))
+
+        self.assertTrue(url.startswith('/artifacts/'))
+        data, mimetype = store.get(url[len('/artifacts/'):])
+        self.assertEqual(mimetype, 'image/png')
+        self.assertTrue(data.startswith(b'\x89PNG'))
+
+    def test_oversized_artifact_is_rejected(self):
+        """Test that data larger than the whole store is refused rather than given a dead URL"""
+        store = ArtifactStore(max_bytes=8)
+
+        with self.assertRaises(ArtifactTooLarge):
+            store.put(b'x' * 9, 'image/png')
+
+    def test_artifact_encoder_inlines_oversized_images(self):
+        """Test that an image the store cannot hold is returned inline as a data URL"""
+        encoder = ArtifactEncoder(ArtifactStore(max_bytes=8), 'png')
+
+        value = encoder.render(np.zeros((4, 4, 3), dtype=np.float32))
+
+        self.assertTrue(value.startswith('data:image/png;base64,'))
+
+    def test_shared_directory_serves_other_processes_artifacts(self):
+        """Test that a store sees artifacts another store wrote to the same directory after it started"""
+        reader = ArtifactStore(max_bytes=1024, directory=self.directory)
+        writer = ArtifactStore(max_bytes=1024, directory=self.directory)
+
+        digest = writer.put(b'jpeg bytes', 'image/jpeg')
+
+        self.assertEqual(reader.get(digest), (b'jpeg bytes', 'image/jpeg'))
+        self.assertIsNone(reader.get('0' * 64))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,10 +3,14 @@ import sys
 import os
 import io
 import json
+import shutil
+import mimetypes
 from unittest.mock import patch, MagicMock
 
 # Add the project root to the Python path - FIX: use correct path to project root
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Backend modules import each other by bare name, as they do when run from ui/backend
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 # Set up mocks for dependencies
 mock_fgsm_instance = MagicMock()
@@ -42,7 +46,11 @@ mock_fgsm_instance.auto_tune_attack.return_value = auto_tune_attack_result
 
 # Mock modules before importing Flask app
 
-sys.modules['fgsm'] = MagicMock(FGSM=mock_fgsm_class)
+mock_fgsm_module = MagicMock(
+    FGSM=mock_fgsm_class,
+    SUPPORTED_MODELS=('mobilenet_v2', 'inception_v3', 'vgg19', 'densenet121')
+)
+sys.modules['fgsm'] = mock_fgsm_module
 sys.modules['db'] = MagicMock()
 sys.modules['jwt'] = MagicMock()
 sys.modules['flask_bcrypt'] = MagicMock()
@@ -51,6 +59,7 @@ sys.modules['auth'] = MagicMock()
 # Import the Flask app
 with patch.dict('os.environ', {'JWT_SECRET': 'test_secret'}):
     from ui.backend.app import app
+from model_registry import ModelRegistry
 
 class AttackTest(unittest.TestCase):
     """Tests for both regular and auto-tune attack functionality"""
@@ -63,6 +72,10 @@ class AttackTest(unittest.TestCase):
         # Create a mock image file
         self.mock_image_data = b'mock image data'
         
+        # The test client guesses upload content types from the mime tables;
+        # load them now, because they cannot be read once open is mocked
+        mimetypes.init()
+        
         # Set up file system mocks
         self.file_mock_patcher = patch('builtins.open', create=True)
         self.mock_file = self.file_mock_patcher.start()
@@ -71,9 +84,19 @@ class AttackTest(unittest.TestCase):
         self.remove_patcher = patch('os.remove')
         self.mock_remove = self.remove_patcher.start()
         
+        # Give every test an empty model registry. It imports fgsm when it loads
+        # a model, and other test modules install their own fgsm mocks
+        mock_fgsm_class.reset_mock()
+        self.fgsm_module_patcher = patch.dict(sys.modules, {'fgsm': mock_fgsm_module})
+        self.fgsm_module_patcher.start()
+        self.registry_patcher = patch('ui.backend.app.model_registry', ModelRegistry(memory_budget_mb=0))
+        self.registry = self.registry_patcher.start()
+        
     def tearDown(self):
         self.file_mock_patcher.stop()
         self.remove_patcher.stop()
+        self.registry_patcher.stop()
+        self.fgsm_module_patcher.stop()
         
     def test_attack_without_auto_tune(self):
         """Test regular attack without auto-tuning"""
@@ -133,6 +156,379 @@ class AttackTest(unittest.TestCase):
         mock_fgsm_instance.auto_tune_attack.assert_called_once()
         mock_fgsm_instance.attack.assert_not_called()
         
+    def test_auto_tune_search_strategy(self):
+        """Test that the requested epsilon search strategy reaches auto-tune"""
+        mock_fgsm_instance.auto_tune_attack.reset_mock()
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'autoTune': 'true',
+            'searchStrategy': 'batched',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        
+        response = self.client.post('/attack', data=data)
+        
+        self.assertEqual(response.status_code, 200)
+        call_args = mock_fgsm_instance.auto_tune_attack.call_args[1]
+        self.assertEqual(call_args['search_strategy'], 'batched')
+        
+    def test_auto_tune_bisect_budget(self):
+        """Test that bisection tolerance and forward-pass budget reach auto-tune"""
+        mock_fgsm_instance.auto_tune_attack.reset_mock()
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'autoTune': 'true',
+            'searchStrategy': 'bisect',
+            'tolerance': '0.0005',
+            'maxForwardPasses': '12',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        
+        response = self.client.post('/attack', data=data)
+        
+        self.assertEqual(response.status_code, 200)
+        call_args = mock_fgsm_instance.auto_tune_attack.call_args[1]
+        self.assertEqual(call_args['search_strategy'], 'bisect')
+        self.assertEqual(call_args['tolerance'], 0.0005)
+        self.assertEqual(call_args['max_forward_passes'], 12)
+        
+    def test_auto_tune_rejects_unknown_strategy(self):
+        """Test that an unsupported search strategy is a 400, not a 500"""
+        mock_fgsm_instance.auto_tune_attack.reset_mock()
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'autoTune': 'true',
+            'searchStrategy': 'spiral',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        response = self.client.post('/attack', data=data)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('spiral', json.loads(response.data)['error'])
+        mock_fgsm_instance.auto_tune_attack.assert_not_called()
+        
+    def test_auto_tune_rejects_bad_budget(self):
+        """Test that a zero, negative or non-numeric forward-pass budget is a 400, not a 500"""
+        mock_fgsm_instance.auto_tune_attack.reset_mock()
+        
+        for budget in ('0', '-3', 'many'):
+            data = {
+                'model': 'mobilenet_v2',
+                'autoTune': 'true',
+                'maxForwardPasses': budget,
+                'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+            }
+            response = self.client.post('/attack', data=data)
+            self.assertEqual(response.status_code, 400)
+        
+        mock_fgsm_instance.auto_tune_attack.assert_not_called()
+        
+    def test_attack_batch_streams_ndjson(self):
+        """Test that batch attacks stream one JSON line per image"""
+        mock_fgsm_instance.attack_batch.reset_mock()
+        mock_fgsm_instance.attack_batch.return_value = iter([
+            dict(regular_attack_result, index=0, name='a.jpg'),
+            dict(regular_attack_result, index=1, name='b.png'),
+        ])
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'epsilon': '0.1',
+            'images': [
+                (io.BytesIO(b'first image'), 'a.jpg'),
+                (io.BytesIO(b'second image'), 'b.png')
+            ]
+        }
+        
+        response = self.client.post('/attack-batch', data=data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual([line['name'] for line in lines], ['a.jpg', 'b.png'])
+        self.assertTrue(all(line['model_used'] == 'mobilenet_v2' for line in lines))
+        
+        images = list(mock_fgsm_instance.attack_batch.call_args[0][0])
+        self.assertEqual(images, [('a.jpg', b'first image'), ('b.png', b'second image')])
+        self.assertEqual(mock_fgsm_instance.attack_batch.call_args[1]['epsilon'], 0.1)
+        
+    def test_attack_batch_zip_archive(self):
+        """Test that zip uploads are expanded into the batch"""
+        import zipfile
+        mock_fgsm_instance.attack_batch.reset_mock()
+        mock_fgsm_instance.attack_batch.side_effect = lambda images, **kwargs: iter(
+            [{'name': name, 'adv_class': 'dog'} for name, _ in images]
+        )
+        mock_fgsm_instance.images_from_zip.return_value = iter([('zipped/cat.jpg', b'cat bytes')])
+        
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('zipped/cat.jpg', b'cat bytes')
+        archive.seek(0)
+        
+        data = {'model': 'mobilenet_v2', 'archive': (archive, 'images.zip')}
+        response = self.client.post('/attack-batch', data=data)
+        
+        self.assertEqual(response.status_code, 200)
+        lines = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+        self.assertEqual(lines, [{'name': 'zipped/cat.jpg', 'adv_class': 'dog', 'model_used': 'mobilenet_v2'}])
+        mock_fgsm_instance.attack_batch.side_effect = None
+        
+    def test_attack_batch_rejects_bad_input(self):
+        """Test that invalid batch uploads are rejected before attacking"""
+        mock_fgsm_instance.attack_batch.reset_mock()
+        
+        response = self.client.post('/attack-batch', data={'model': 'mobilenet_v2'})
+        self.assertEqual(response.status_code, 400)
+        
+        data = {'model': 'mobilenet_v2', 'images': [(io.BytesIO(b'text'), 'notes.txt')]}
+        response = self.client.post('/attack-batch', data=data)
+        self.assertEqual(response.status_code, 400)
+        
+        data = {'model': 'mobilenet_v2', 'archive': (io.BytesIO(b'not a zip'), 'images.zip')}
+        response = self.client.post('/attack-batch', data=data)
+        self.assertEqual(response.status_code, 400)
+        
+        for batch_size in ('0', '65', 'abc'):
+            data = {'model': 'mobilenet_v2', 'batchSize': batch_size,
+                    'images': [(io.BytesIO(b'image'), 'a.jpg')]}
+            response = self.client.post('/attack-batch', data=data)
+            self.assertEqual(response.status_code, 400)
+        
+        mock_fgsm_instance.attack_batch.assert_not_called()
+        
+    def test_attack_batch_rejects_oversized_archive(self):
+        """Test that an archive over the uncompressed size limits is rejected before attacking"""
+        import zipfile
+        mock_fgsm_instance.attack_batch.reset_mock()
+        mock_fgsm_instance.images_from_zip.side_effect = ValueError("Archive is larger than 10 bytes uncompressed")
+        
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('cat.jpg', b'cat bytes')
+        archive.seek(0)
+        
+        response = self.client.post('/attack-batch', data={'model': 'mobilenet_v2', 'archive': (archive, 'images.zip')})
+        mock_fgsm_instance.images_from_zip.side_effect = None
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('uncompressed', json.loads(response.data)['error'])
+        kwargs = mock_fgsm_instance.images_from_zip.call_args[1]
+        self.assertIn('max_entry_bytes', kwargs)
+        self.assertIn('max_total_bytes', kwargs)
+        mock_fgsm_instance.attack_batch.assert_not_called()
+        
+    def test_iterative_attack_method(self):
+        """Test that an iterative attack method is routed to iterative_attack"""
+        mock_fgsm_instance.attack.reset_mock()
+        mock_fgsm_instance.iterative_attack.reset_mock()
+        mock_fgsm_instance.iterative_attack.return_value = dict(regular_attack_result, iterations_run=3)
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'epsilon': '0.03',
+            'autoTune': 'false',
+            'attackMethod': 'PGD',
+            'iterations': '20',
+            'stepSize': '0.005',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        
+        response = self.client.post('/attack', data=data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.data)['iterations_run'], 3)
+        mock_fgsm_instance.attack.assert_not_called()
+        call_args = mock_fgsm_instance.iterative_attack.call_args[1]
+        self.assertEqual(call_args['method'], 'pgd')
+        self.assertEqual(call_args['epsilon'], 0.03)
+        self.assertEqual(call_args['iterations'], 20)
+        self.assertEqual(call_args['step_size'], 0.005)
+        
+    def test_iterative_attack_rejects_bad_options(self):
+        """Test that malformed iterative settings are a 400, not a 500"""
+        mock_fgsm_instance.iterative_attack.reset_mock()
+        mock_fgsm_instance.attack_batch.reset_mock()
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'attackMethod': 'pgd',
+            'iterations': 'ten',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        self.assertEqual(self.client.post('/attack', data=data).status_code, 400)
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'attackMethod': 'pgd',
+            'stepSize': 'small',
+            'images': [(io.BytesIO(b'image'), 'a.jpg')]
+        }
+        self.assertEqual(self.client.post('/attack-batch', data=data).status_code, 400)
+        
+        # Unknown attack methods are rejected by every attack route
+        data = {
+            'model': 'mobilenet_v2',
+            'attackMethod': 'deepfool',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        response = self.client.post('/attack', data=data)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('deepfool', json.loads(response.data)['error'])
+        
+        data = {'model': 'mobilenet_v2', 'attackMethod': 'deepfool', 'imageUrl': 'http://example.com/cat.jpg'}
+        self.assertEqual(self.client.post('/attack-from-url', json=data).status_code, 400)
+        
+        data = {
+            'model': 'mobilenet_v2',
+            'attackMethod': 'deepfool',
+            'images': [(io.BytesIO(b'image'), 'a.jpg')]
+        }
+        self.assertEqual(self.client.post('/attack-batch', data=data).status_code, 400)
+        
+        mock_fgsm_instance.iterative_attack.assert_not_called()
+        mock_fgsm_instance.attack_batch.assert_not_called()
+        
+    def test_upload_attacked_in_memory(self):
+        """Test that the uploaded bytes go straight to the engine without a temp file"""
+        mock_fgsm_instance.attack.reset_mock()
+        mock_fgsm_instance.attack.return_value = regular_attack_result
+
+        data = {
+            'model': 'mobilenet_v2',
+            'epsilon': '0.05',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.png')
+        }
+
+        response = self.client.post('/attack', data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_fgsm_instance.attack.call_args[0][0], self.mock_image_data)
+        self.mock_file.assert_not_called()
+        self.mock_remove.assert_not_called()
+
+    def test_output_format_option(self):
+        """Test that the output format reaches the engine and bad formats are rejected"""
+        mock_fgsm_instance.attack.reset_mock()
+        mock_fgsm_instance.attack.return_value = regular_attack_result
+
+        data = {
+            'model': 'mobilenet_v2',
+            'outputFormat': 'webp',
+            'outputQuality': '70',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        response = self.client.post('/attack', data=data)
+
+        self.assertEqual(response.status_code, 200)
+        encoder = mock_fgsm_instance.attack.call_args[1]['encoder']
+        self.assertEqual((encoder.image_format, encoder.quality), ('webp', 70))
+
+        data = {
+            'model': 'mobilenet_v2',
+            'outputFormat': 'tiff',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        response = self.client.post('/attack', data=data)
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_url_response_mode_and_artifact_route(self):
+        """Test that responseMode=urls selects artifact URLs, served with strong caching headers"""
+        from ui.backend.app import artifact_store
+        mock_fgsm_instance.attack.reset_mock()
+        mock_fgsm_instance.attack.return_value = regular_attack_result
+
+        data = {
+            'model': 'mobilenet_v2',
+            'responseMode': 'urls',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        response = self.client.post('/attack', data=data)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIs(mock_fgsm_instance.attack.call_args[1]['encoder'].store, artifact_store)
+
+        digest = artifact_store.put(b'png bytes', 'image/png')
+        response = self.client.get(f'/artifacts/{digest}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, b'png bytes')
+        self.assertEqual(response.mimetype, 'image/png')
+        self.assertEqual(response.headers['ETag'], f'"{digest}"')
+        self.assertIn('immutable', response.headers['Cache-Control'])
+
+        response = self.client.get(f'/artifacts/{digest}', headers={'If-None-Match': f'"{digest}"'})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(f'/artifacts/{"0" * 64}')
+        self.assertEqual(response.status_code, 404)
+        # Conditional requests only get a 304 for artifacts that exist
+        response = self.client.get(f'/artifacts/{"0" * 64}', headers={'If-None-Match': '*'})
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(f'/artifacts/{"1" * 64}', headers={'If-None-Match': f'"{"1" * 64}"'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_auto_tune_job_queue(self):
+        """Test that an auto-tune job is queued, reports progress and finishes with its result"""
+        import tempfile
+        import time
+        from ui.backend.app import run_auto_tune_job
+        from jobs import JobManager
+
+        def auto_tune(image_bytes, progress=None, **kwargs):
+            progress({'epsilon': 0.02, 'forward_passes': 4, 'best_epsilon': 0.02})
+            return dict(auto_tune_attack_result)
+
+        mock_fgsm_instance.auto_tune_attack.side_effect = auto_tune
+        directory = tempfile.mkdtemp()
+        manager = JobManager(run_auto_tune_job, db_path=os.path.join(directory, 'jobs.sqlite3'),
+                             max_workers=1, progress_interval=0)
+        try:
+            with patch('ui.backend.app.job_manager', manager):
+                data = {
+                    'model': 'mobilenet_v2',
+                    'searchStrategy': 'bisect',
+                    'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+                }
+                response = self.client.post('/attack-jobs', data=data)
+                self.assertEqual(response.status_code, 202)
+                status_url = json.loads(response.data)['status_url']
+
+                deadline = time.time() + 5
+                while time.time() < deadline:
+                    job = json.loads(self.client.get(status_url).data)
+                    if job['status'] in ('succeeded', 'failed'):
+                        break
+                    time.sleep(0.01)
+
+                self.assertEqual(job['status'], 'succeeded')
+                self.assertEqual(job['progress']['forward_passes'], 4)
+                self.assertEqual(job['result']['epsilon_used'], 0.02)
+                self.assertEqual(job['result']['model_used'], 'mobilenet_v2')
+                self.assertEqual(mock_fgsm_instance.auto_tune_attack.call_args[1]['search_strategy'], 'bisect')
+                self.assertEqual(self.client.get('/attack-jobs/missing').status_code, 404)
+                
+                # A job queued with a token is only visible to the same user
+                users = {'token-a': 1, 'token-b': 2}
+                def verify(token):
+                    return {'success': True, 'user': {'user_id': users[token]}}
+                with patch('ui.backend.app.verify_token', side_effect=verify):
+                    data = {
+                        'model': 'mobilenet_v2',
+                        'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+                    }
+                    response = self.client.post('/attack-jobs', data=data, headers={'Authorization': 'Bearer token-a'})
+                    status_url = json.loads(response.data)['status_url']
+                    self.assertEqual(self.client.get(status_url, headers={'Authorization': 'Bearer token-a'}).status_code, 200)
+                    self.assertEqual(self.client.get(status_url, headers={'Authorization': 'Bearer token-b'}).status_code, 404)
+                    self.assertEqual(self.client.get(status_url).status_code, 404)
+        finally:
+            mock_fgsm_instance.auto_tune_attack.side_effect = None
+            shutil.rmtree(directory, ignore_errors=True)
+
     def test_different_models(self):
         """Test different model types for attacks"""
         # List of models to test
@@ -176,10 +572,11 @@ class AttackTest(unittest.TestCase):
             self.assertEqual(response_data['adv_class'], model_specific_results[model_name]['adv_class'], 
                             f"Model {model_name} should predict {model_specific_results[model_name]['adv_class']}")
             
-            # Verify FGSM was initialized with the correct model name
+            # Verify the registry loaded an engine for the correct model name
             mock_fgsm_class.assert_called_once()
             call_args = mock_fgsm_class.call_args[1]
             self.assertEqual(call_args['model_name'], model_name)
+            mock_fgsm_instance.warm_up.assert_called()
     
     def test_different_epsilon_values(self):
         """Test different epsilon values for regular attacks"""
@@ -188,7 +585,6 @@ class AttackTest(unittest.TestCase):
         
         for epsilon in epsilon_values:
             # Reset mocks
-            mock_fgsm_class.reset_mock()
             mock_fgsm_instance.attack.reset_mock()
             
             # Create epsilon-specific result 
@@ -212,10 +608,27 @@ class AttackTest(unittest.TestCase):
             response_data = json.loads(response.data)
             self.assertEqual(response_data['epsilon_used'], float(epsilon))
             
-            # Verify FGSM was initialized with the correct epsilon value
-            mock_fgsm_class.assert_called_once()
-            call_args = mock_fgsm_class.call_args[1]
+            # Verify the shared engine was called with the correct epsilon value
+            mock_fgsm_instance.attack.assert_called_once()
+            call_args = mock_fgsm_instance.attack.call_args[1]
             self.assertEqual(call_args['epsilon'], float(epsilon))
+        
+        # The engine is built once and reused for every request
+        mock_fgsm_class.assert_called_once()
+
+    def test_unsupported_model(self):
+        """Test that an unknown model name is rejected without loading anything"""
+        data = {
+            'model': 'resnet50',
+            'epsilon': '0.05',
+            'autoTune': 'false',
+            'image': (io.BytesIO(self.mock_image_data), 'test_image.jpg')
+        }
+        
+        response = self.client.post('/attack', data=data)
+        
+        self.assertEqual(response.status_code, 400)
+        mock_fgsm_class.assert_not_called()
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
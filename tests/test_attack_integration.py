@@ -7,6 +7,8 @@ import sys, os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Backend modules import each other by bare name, as they do when run from ui/backend
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 from ui.backend.app import app  # Adjust if needed
 
@@ -17,9 +19,9 @@ class AttackIntegrationTest(unittest.TestCase):
         self.test_image_data = b'test image bytes'
         self.mock_file = io.BytesIO(self.test_image_data)
         
-        # Setup mock for FGSM
-        self.patcher = patch('ui.backend.app.FGSM')
-        self.mock_fgsm_class = self.patcher.start()
+        # Setup mock for the model registry and the engine it hands out
+        self.patcher = patch('ui.backend.app.model_registry')
+        self.mock_registry = self.patcher.start()
         self.mock_instance = MagicMock()
         
         # Mock successful attack results
@@ -42,7 +44,7 @@ class AttackIntegrationTest(unittest.TestCase):
             'adv_image': 'base64_encoded_image'
         }
         
-        self.mock_fgsm_class.return_value = self.mock_instance
+        self.mock_registry.get.return_value = self.mock_instance
         
         # Mock requests.get for URL-based tests
         self.requests_patcher = patch('requests.get')
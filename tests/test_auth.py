@@ -3,8 +3,9 @@ import sys
 import os
 from unittest.mock import patch, MagicMock
 
-# Add the project root to the Python path
+# Add the project root and backend directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 # Mock the db module before importing auth
 sys.modules['db'] = MagicMock()
@@ -99,6 +100,30 @@ class AuthTest(unittest.TestCase):
         self.assertEqual(result['token'], "test_token")
         self.assertEqual(result['user']['email'], self.email)
 
+    @patch('ui.backend.auth.execute_query')
+    @patch('ui.backend.auth.bcrypt')
+    @patch('ui.backend.auth.jwt')
+    def test_login_user_rehashes_outdated_password(self, mock_jwt, mock_bcrypt, mock_execute_query):
+        """Test that a successful login re-stores an outdated password hash"""
+        # Mock the database query, then the UPDATE
+        mock_execute_query.side_effect = [[self.db_user], None]
+
+        # Mock a matching password stored at an old cost
+        mock_bcrypt.check_password_hash.return_value = True
+        mock_bcrypt.needs_rehash.return_value = True
+        mock_bcrypt.generate_password_hash.return_value = b'new_hash'
+        mock_jwt.encode.return_value = "test_token"
+
+        # Call the function
+        result = login_user(self.email, self.password)
+
+        # Check result
+        self.assertTrue(result['success'])
+        mock_bcrypt.generate_password_hash.assert_called_once_with(self.password)
+        query, params = mock_execute_query.call_args[0]
+        self.assertIn("UPDATE user SET user_password", query)
+        self.assertEqual(params, ('new_hash', 1))
+
     @patch('ui.backend.auth.execute_query')
     def test_login_user_invalid_email(self, mock_execute_query):
         """Test login with invalid email"""
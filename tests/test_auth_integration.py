@@ -6,6 +6,8 @@ import os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Backend modules import each other by bare name, as they do when run from ui/backend
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 # Import Flask app first
 from ui.backend.app import app
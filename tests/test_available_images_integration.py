@@ -5,6 +5,8 @@ import os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Backend modules import each other by bare name, as they do when run from ui/backend
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 # Mock modules before importing app
 sys.modules['fgsm'] = MagicMock()
@@ -15,13 +17,15 @@ sys.modules['auth'] = MagicMock()
 sys.modules['dotenv'] = MagicMock()
 sys.modules['dotenv'].load_dotenv = MagicMock()
 
-from ui.backend.app import app
+from ui.backend.app import app, gallery_cache
 
 class AvailableImagesTest(unittest.TestCase):
 
     def setUp(self):
         app.config['TESTING'] = True
         self.client = app.test_client()
+        # Each test starts with an empty gallery cache
+        gallery_cache.clear()
 
     def _print_test_header(self, test_name):
         print("\n" + "="*50)
@@ -93,5 +97,32 @@ class AvailableImagesTest(unittest.TestCase):
             self._print_test_footer(test_name, False)
             raise e
 
+    @patch('ui.backend.app.execute_query')
+    def test_get_images_cached_with_etag(self, mock_execute_query):
+        test_name = "Get Images Cached With ETag"
+        self._print_test_header(test_name)
+
+        mock_execute_query.return_value = [
+            {'image_filename': 'cat.jpg', 'image_label': 'cat', 'image_url': 'http://example.com/cat.jpg'}
+        ]
+
+        try:
+            first = self.client.get('/available-images')
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers['ETag']
+            self.assertTrue(etag)
+
+            # An unchanged gallery is served from memory, and revalidation gets a 304
+            second = self.client.get('/available-images', headers={'If-None-Match': etag})
+            self.assertEqual(second.status_code, 304)
+            self.assertEqual(second.data, b'')
+            third = self.client.get('/available-images')
+            self.assertEqual(third.get_json(), first.get_json())
+            mock_execute_query.assert_called_once()
+            self._print_test_footer(test_name, True)
+        except Exception as e:
+            self._print_test_footer(test_name, False)
+            raise e
+
 if __name__ == '__main__':
     unittest.main(verbosity=2)
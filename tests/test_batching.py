@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import threading
+import numpy as np
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+from concurrent.futures import Future
+from batching import BatchScheduler, BatchSchedulerClosed
+
+class FakeEngine:
+    """Stands in for FGSM.attack_tensors: each output row is derived from its input row"""
+
+    def __init__(self, fail=False):
+        self.batch_sizes = []
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def attack_tensors(self, images, epsilons):
+        self.release.wait()
+        if self.fail:
+            raise RuntimeError("model exploded")
+        self.batch_sizes.append(len(images))
+        epsilons = np.asarray(epsilons).reshape(-1, 1, 1, 1)
+        return images.mean(axis=(1, 2)), np.sign(images), images + epsilons, images.mean(axis=(1, 2)) + 1
+
+class BatchSchedulerTest(unittest.TestCase):
+    """Tests for the per-model micro-batching scheduler"""
+
+    def make_image(self, value):
+        return np.full((1, 4, 4, 3), value, dtype=np.float32)
+
+    def test_single_request(self):
+        """Test that a lone request is served after the wait deadline"""
+        engine = FakeEngine()
+        scheduler = BatchScheduler(engine, max_batch_size=4, max_wait_ms=1)
+
+        image_probs, perturbation, adversarial_image, adv_probs = scheduler.submit(self.make_image(0.5), 0.1).result(timeout=5)
+
+        self.assertEqual(adversarial_image.shape, (1, 4, 4, 3))
+        self.assertAlmostEqual(float(adversarial_image[0, 0, 0, 0]), 0.6, places=5)
+        self.assertEqual(engine.batch_sizes, [1])
+        scheduler.close()
+
+    def test_concurrent_requests_share_a_batch(self):
+        """Test that queued requests are batched and each gets its own row back"""
+        engine = FakeEngine()
+        engine.release.clear()  # Hold the worker so requests pile up
+        scheduler = BatchScheduler(engine, max_batch_size=8, max_wait_ms=50)
+
+        first = scheduler.submit(self.make_image(0), 0.0)
+        futures = [scheduler.submit(self.make_image(i), i / 100) for i in range(1, 6)]
+        engine.release.set()
+
+        first.result(timeout=5)
+        for i, future in enumerate(futures, start=1):
+            _, _, adversarial_image, _ = future.result(timeout=5)
+            self.assertAlmostEqual(float(adversarial_image[0, 0, 0, 0]), i + i / 100, places=5)
+        self.assertEqual(sum(engine.batch_sizes), 6)
+        self.assertLess(len(engine.batch_sizes), 6)
+        self.assertEqual(scheduler.stats()['requests'], 6)
+        scheduler.close()
+
+    def test_batch_size_is_capped(self):
+        """Test that no batch exceeds max_batch_size"""
+        engine = FakeEngine()
+        engine.release.clear()
+        scheduler = BatchScheduler(engine, max_batch_size=3, max_wait_ms=50)
+
+        futures = [scheduler.submit(self.make_image(i), 0.05) for i in range(7)]
+        engine.release.set()
+        for future in futures:
+            future.result(timeout=5)
+
+        self.assertTrue(all(size <= 3 for size in engine.batch_sizes))
+        self.assertEqual(sum(engine.batch_sizes), 7)
+        scheduler.close()
+
+    def test_errors_reach_every_waiting_request(self):
+        """Test that a failed batch fails each of its futures"""
+        scheduler = BatchScheduler(FakeEngine(fail=True), max_batch_size=4, max_wait_ms=1)
+
+        future = scheduler.submit(self.make_image(1), 0.05)
+
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        scheduler.close()
+
+    def test_closed_scheduler_rejects_requests(self):
+        """Test that submitting after close raises instead of hanging"""
+        scheduler = BatchScheduler(FakeEngine(), max_batch_size=4, max_wait_ms=1)
+        scheduler.close()
+
+        with self.assertRaises(RuntimeError):
+            scheduler.submit(self.make_image(1), 0.05)
+
+    def test_requests_behind_stop_are_failed(self):
+        """Test that a request queued behind the stop sentinel fails instead of hanging"""
+        engine = FakeEngine()
+        engine.release.clear()
+        scheduler = BatchScheduler(engine, max_batch_size=1, max_wait_ms=1)
+        first = scheduler.submit(self.make_image(1), 0.05)
+        scheduler.close()
+        # What a submit racing close() used to leave behind
+        late = Future()
+        scheduler._queue.put((self.make_image(2), 0.05, late))
+        engine.release.set()
+
+        self.assertIsNotNone(first.result(timeout=5))
+        with self.assertRaises(BatchSchedulerClosed):
+            late.result(timeout=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+# Other test modules replace db with a mock; this one needs the real module
+sys.modules.pop('db', None)
+
+from mysql.connector import Error
+from db import ConnectionPool
+
+class FakeCursor:
+    """Prepared cursor stand-in that records what the server was asked to prepare"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = None
+        self.lastrowid = 0
+
+    def execute(self, query, params=()):
+        if self.connection.fail_next:
+            self.connection.fail_next = False
+            raise Error("Lost connection to MySQL server")
+        if query is not self.executed:
+            self.connection.prepares.append(query)
+            self.executed = query
+        self.params = params
+        self.lastrowid += 1
+
+    def executemany(self, query, rows):
+        self.connection.batches.append((query, list(rows)))
+        self.rowcount = len(rows)
+
+    def fetchall(self):
+        return [{'value': self.params}]
+
+    def close(self):
+        pass
+
+class FakeConnection:
+    """In-memory stand-in for a MySQL connection"""
+
+    def __init__(self):
+        self.connected = True
+        self.fail_next = False
+        self.prepares = []
+        self.batches = []
+        self.autocommit = False
+        self.closed = False
+
+    def cursor(self, prepared=False, dictionary=False):
+        return FakeCursor(self)
+
+    def is_connected(self):
+        return self.connected
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+class ConnectionPoolTest(unittest.TestCase):
+    """Tests for the pooled connection layer behind execute_query"""
+
+    def setUp(self):
+        self.connections = []
+
+    def connect(self):
+        connection = FakeConnection()
+        self.connections.append(connection)
+        return connection
+
+    def make_pool(self, **kwargs):
+        kwargs.setdefault('size', 2)
+        kwargs.setdefault('timeout', 1)
+        kwargs.setdefault('check_seconds', 30)
+        return ConnectionPool(connect=self.connect, **kwargs)
+
+    def test_connection_and_statement_reused(self):
+        """Test that repeated queries share one connection and one prepared statement"""
+        pool = self.make_pool()
+        query = "SELECT * FROM user WHERE user_email = %s"
+
+        first = pool.execute(query, ('a@example.com',), fetch=True)
+        second = pool.execute(query, ('b@example.com',), fetch=True)
+
+        self.assertEqual(first, [{'value': ('a@example.com',)}])
+        self.assertEqual(second, [{'value': ('b@example.com',)}])
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.connections[0].prepares, [query])
+        self.assertTrue(self.connections[0].autocommit)
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['statements_prepared'], 1)
+        self.assertEqual(stats['statements_reused'], 1)
+        self.assertEqual(stats['idle'], 1)
+
+    def test_write_returns_last_row_id(self):
+        """Test that statements without fetch return the inserted row id"""
+        pool = self.make_pool()
+
+        self.assertEqual(pool.execute("INSERT INTO user (user_email) VALUES (%s)", ('a@example.com',)), 1)
+
+    def test_execute_many_sends_one_batch(self):
+        """Test that batched rows go to the server in one call on a pooled connection"""
+        pool = self.make_pool()
+        rows = [(1, 'a'), (2, 'b')]
+
+        self.assertEqual(pool.execute_many("INSERT INTO t (id, name) VALUES (%s, %s)", rows), 2)
+
+        self.assertEqual(self.connections[0].batches, [("INSERT INTO t (id, name) VALUES (%s, %s)", rows)])
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_stale_connection_replaced_on_checkout(self):
+        """Test that an idle connection the server dropped is replaced"""
+        pool = self.make_pool(check_seconds=0)
+        pool.execute("SELECT 1", fetch=True)
+        self.connections[0].connected = False
+
+        pool.execute("SELECT 1", fetch=True)
+
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(pool.stats()['health_check_failures'], 1)
+        self.assertEqual(pool.stats()['open'], 1)
+
+    def test_lost_connection_not_returned(self):
+        """Test that a query failure on a dropped connection discards it"""
+        pool = self.make_pool()
+        pool.execute("SELECT 1", fetch=True)
+        self.connections[0].fail_next = True
+        self.connections[0].connected = False
+
+        self.assertIsNone(pool.execute("SELECT 1", fetch=True))
+
+        stats = pool.stats()
+        self.assertEqual(stats['open'], 0)
+        self.assertEqual(stats['connections_discarded'], 1)
+
+    def test_checkout_waits_then_times_out(self):
+        """Test that callers wait for a free connection and give up after the timeout"""
+        pool = self.make_pool(size=1, timeout=0.2)
+        held = pool.acquire()
+
+        self.assertIsNone(pool.acquire())
+        released = threading.Timer(0.05, pool.release, args=(held,))
+        released.start()
+        self.assertIs(pool.acquire(), held)
+        released.join()
+
+        stats = pool.stats()
+        self.assertEqual(stats['waits'], 2)
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(len(self.connections), 1)
+
+    def test_failed_connect_frees_slot(self):
+        """Test that a connection that cannot be opened does not use up the pool"""
+        pool = ConnectionPool(connect=lambda: None, size=1, timeout=0.1)
+
+        self.assertIsNone(pool.execute("SELECT 1", fetch=True))
+        self.assertIsNone(pool.execute("SELECT 1", fetch=True))
+        self.assertEqual(pool.stats()['timeouts'], 0)
+        self.assertEqual(pool.stats()['open'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import sys
+import os
+import importlib.util
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+BACKEND_DIR = os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    import tensorflow as tf
+    # Other tests replace sys.modules['fgsm'] with a mock, so load the real module under its own name
+    spec = importlib.util.spec_from_file_location('fgsm_execution_modes', os.path.join(BACKEND_DIR, 'fgsm.py'))
+    fgsm_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fgsm_module)
+except ImportError:
+    tf = None
+
+def make_steps(flip_labels=False, flip_signs=0.0):
+    """Fake predict/gradient steps over a 3-class linear score of the mean pixel"""
+    def predict_step(images):
+        means = tf.reduce_mean(images, axis=[1, 2])
+        probs = tf.nn.softmax(means * 10)
+        return tf.reverse(probs, axis=[-1]) if flip_labels else probs
+
+    def gradient_step(images, labels):
+        gradient = tf.sin(images * 50)
+        if flip_signs:
+            count = int(flip_signs * int(tf.size(gradient)))
+            flat = tf.reshape(gradient, [-1])
+            flat = tf.concat([-flat[:count], flat[count:]], axis=0)
+            gradient = tf.reshape(flat, tf.shape(images))
+        return gradient, predict_step(images)
+
+    return predict_step, gradient_step
+
+@unittest.skipIf(tf is None, "TensorFlow is not installed")
+class ExecutionGuardTest(unittest.TestCase):
+    """Tests for the float32 comparison that gates the XLA and bfloat16 modes"""
+
+    def make_engine(self):
+        engine = fgsm_module.FGSM.__new__(fgsm_module.FGSM)
+        engine.image_size = (16, 16)
+        engine.execution_mode = 'xla'
+        return engine
+
+    def test_identical_steps_pass(self):
+        """Test that a mode matching float32 passes and reports both latencies"""
+        guard = self.make_engine()._guard_execution_mode(make_steps(), make_steps())
+
+        self.assertTrue(guard['passed'])
+        self.assertEqual(guard['label_agreement'], 1.0)
+        self.assertEqual(guard['sign_agreement'], 1.0)
+        self.assertIn('predict', guard['float32_ms'])
+        self.assertIn('gradient', guard['mode_ms'])
+
+    def test_label_change_fails(self):
+        """Test that any top-1 label change rejects the mode"""
+        guard = self.make_engine()._guard_execution_mode(make_steps(), make_steps(flip_labels=True))
+
+        self.assertFalse(guard['passed'])
+        self.assertLess(guard['label_agreement'], 1.0)
+
+    def test_sign_drift_fails(self):
+        """Test that too many flipped gradient signs reject the mode"""
+        engine = self.make_engine()
+
+        self.assertTrue(engine._guard_execution_mode(make_steps(), make_steps(flip_signs=0.01))['passed'])
+        guard = engine._guard_execution_mode(make_steps(), make_steps(flip_signs=0.2))
+        self.assertFalse(guard['passed'])
+        self.assertAlmostEqual(guard['sign_agreement'], 0.8, places=2)
+
+    def test_unknown_mode_is_rejected(self):
+        """Test that unsupported execution modes fail before any model is loaded"""
+        with self.assertRaises(ValueError):
+            fgsm_module.FGSM(execution_mode='float8')
+
+    def test_step_latency(self):
+        """Test that step timings are averaged per step"""
+        latency = fgsm_module.StepLatency()
+        latency.record('predict', 0.010)
+        latency.record('predict', 0.030)
+
+        stats = latency.stats()
+        self.assertEqual(stats['predict']['calls'], 2)
+        self.assertAlmostEqual(stats['predict']['mean_ms'], 20.0)
+        self.assertEqual(stats['gradient']['calls'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from gallery_cache import GalleryCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class GalleryCacheTest(unittest.TestCase):
+    """Tests for the cached /available-images body"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.version_file = os.path.join(self.directory, 'gallery.version')
+        self.clock = FakeClock()
+        self.loads = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def load(self):
+        self.loads += 1
+        return f'{{"images": {self.loads}}}'.encode()
+
+    def make_cache(self, ttl_seconds=60):
+        return GalleryCache(ttl_seconds=ttl_seconds, version_file=self.version_file, clock=self.clock)
+
+    def test_body_cached_until_ttl(self):
+        """Test that the body is reused until it expires"""
+        cache = self.make_cache()
+
+        first = cache.get(self.load)
+        self.clock.now = 59
+        self.assertEqual(cache.get(self.load), first)
+        self.clock.now = 61
+        second = cache.get(self.load)
+
+        self.assertEqual(self.loads, 2)
+        self.assertNotEqual(second[1], first[1])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+    def test_invalidation_reaches_other_processes(self):
+        """Test that invalidating one cache makes every cache sharing the version file reload"""
+        cache = self.make_cache()
+        other = self.make_cache()
+        cache.get(self.load)
+        other.get(self.load)
+
+        cache.invalidate()
+        cache.get(self.load)
+        other.get(self.load)
+
+        self.assertEqual(self.loads, 4)
+
+    def test_failed_load_not_cached(self):
+        """Test that a failing query is retried on the next request"""
+        cache = self.make_cache()
+
+        with self.assertRaises(RuntimeError):
+            cache.get(MagicMock(side_effect=RuntimeError("database down")))
+        cache.get(self.load)
+
+        self.assertEqual(self.loads, 1)
+        self.assertTrue(cache.stats()['cached'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import numpy as np
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from gradient_cache import GradientCache
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def make_entry(value):
+    probs = np.full((1, 10), value, dtype=np.float32)
+    sign = np.full((1, 4, 4, 3), -1.0, dtype=np.float32)
+    return probs, sign
+
+class GradientCacheTest(unittest.TestCase):
+    """Tests for the per-image, per-model sign-gradient cache"""
+
+    def test_round_trip_stores_sign_compactly(self):
+        """Test that the sign gradient comes back unchanged and stored as int8"""
+        cache = GradientCache(max_bytes=1024, ttl_seconds=60)
+        probs, sign = make_entry(0.1)
+
+        cache.put(('abc', 'mobilenet_v2'), probs, sign)
+        cached_probs, cached_sign = cache.get(('abc', 'mobilenet_v2'))
+
+        np.testing.assert_array_equal(cached_probs, probs)
+        np.testing.assert_array_equal(cached_sign, sign)
+        self.assertEqual(cached_sign.dtype, np.int8)
+        self.assertEqual(cache.stats()['bytes'], 40 + 48)
+
+    def test_model_name_is_part_of_the_key(self):
+        """Test that another model's gradient for the same image is not reused"""
+        cache = GradientCache(max_bytes=1024, ttl_seconds=60)
+        cache.put(('abc', 'mobilenet_v2'), *make_entry(0.1))
+
+        self.assertIsNone(cache.get(('abc', 'inception_v3')))
+        self.assertEqual(cache.stats()['misses'], 1)
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are dropped on lookup"""
+        clock = FakeClock()
+        cache = GradientCache(max_bytes=1024, ttl_seconds=60, clock=clock)
+        cache.put(('abc', 'mobilenet_v2'), *make_entry(0.1))
+
+        clock.now = 30
+        self.assertIsNotNone(cache.get(('abc', 'mobilenet_v2')))
+        clock.now = 61
+        self.assertIsNone(cache.get(('abc', 'mobilenet_v2')))
+
+        stats = cache.stats()
+        self.assertEqual(stats['expirations'], 1)
+        self.assertEqual(stats['entries'], 0)
+        self.assertEqual(stats['bytes'], 0)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the byte budget evicts the least recently used entry"""
+        cache = GradientCache(max_bytes=200, ttl_seconds=60)  # Room for two 88-byte entries
+
+        cache.put(('a', 'mobilenet_v2'), *make_entry(0.1))
+        cache.put(('b', 'mobilenet_v2'), *make_entry(0.2))
+        cache.get(('a', 'mobilenet_v2'))  # b is now least recently used
+        cache.put(('c', 'mobilenet_v2'), *make_entry(0.3))
+
+        self.assertIsNone(cache.get(('b', 'mobilenet_v2')))
+        self.assertIsNotNone(cache.get(('a', 'mobilenet_v2')))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,6 +5,8 @@ import os
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+# Backend modules import each other by bare name, as they do when run from ui/backend
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
 
 # Mock dependencies before importing app
 import sys
@@ -97,6 +99,85 @@ class HistoryEndpointTest(unittest.TestCase):
             self._print_test_footer(test_name, False)
             raise e
 
+    @patch('ui.backend.app.verify_token')
+    @patch('ui.backend.app.execute_query')
+    def test_history_pages_with_cursor(self, mock_execute_query, mock_verify_token):
+        test_name = "History Keyset Pagination"
+        self._print_test_header(test_name)
+
+        mock_verify_token.return_value = {"success": True, "user": {"user_id": 1}}
+
+        # Three rows for a page of two: the extra row means there is a next page
+        mock_execute_query.return_value = [
+            {"id": 9, "created_at": "2025-01-03 12:00:00"},
+            {"id": 8, "created_at": "2025-01-02 12:00:00"},
+            {"id": 7, "created_at": "2025-01-01 12:00:00"},
+        ]
+
+        try:
+            headers = {"Authorization": "Bearer valid_token"}
+            response = self.client.get('/history?limit=2', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            self.assertEqual([item['id'] for item in data['history']], [9, 8])
+            self.assertIsNotNone(data['next_cursor'])
+            query, params = mock_execute_query.call_args[0]
+            self.assertNotIn('SELECT *', query)
+            self.assertEqual(params, (1, 3))
+
+            # The cursor resumes after the last row returned
+            mock_execute_query.return_value = [{"id": 7, "created_at": "2025-01-01 12:00:00"}]
+            response = self.client.get(f"/history?limit=2&cursor={data['next_cursor']}", headers=headers)
+            data = response.get_json()
+            self.assertEqual([item['id'] for item in data['history']], [7])
+            self.assertIsNone(data['next_cursor'])
+            query, params = mock_execute_query.call_args[0]
+            self.assertIn('id < %s', query)
+            self.assertEqual(params, (1, "2025-01-02 12:00:00", "2025-01-02 12:00:00", 8, 3))
+            self._print_test_footer(test_name, True)
+        except Exception as e:
+            self._print_test_footer(test_name, False)
+            raise e
+
+    @patch('ui.backend.app.verify_token')
+    @patch('ui.backend.app.execute_query')
+    def test_history_page_size_capped(self, mock_execute_query, mock_verify_token):
+        test_name = "History Page Size Cap"
+        self._print_test_header(test_name)
+
+        mock_verify_token.return_value = {"success": True, "user": {"user_id": 1}}
+        mock_execute_query.return_value = []
+
+        try:
+            headers = {"Authorization": "Bearer valid_token"}
+            response = self.client.get('/history?limit=100000', headers=headers)
+            self.assertEqual(response.status_code, 200)
+            _, params = mock_execute_query.call_args[0]
+            self.assertEqual(params, (1, 201))
+            self._print_test_footer(test_name, True)
+        except Exception as e:
+            self._print_test_footer(test_name, False)
+            raise e
+
+    @patch('ui.backend.app.verify_token')
+    @patch('ui.backend.app.execute_query')
+    def test_history_invalid_cursor(self, mock_execute_query, mock_verify_token):
+        test_name = "History Invalid Cursor"
+        self._print_test_header(test_name)
+
+        mock_verify_token.return_value = {"success": True, "user": {"user_id": 1}}
+
+        try:
+            headers = {"Authorization": "Bearer valid_token"}
+            response = self.client.get('/history?cursor=not-a-cursor', headers=headers)
+            self.assertEqual(response.status_code, 400)
+            self.assertFalse(response.get_json()['success'])
+            mock_execute_query.assert_not_called()
+            self._print_test_footer(test_name, True)
+        except Exception as e:
+            self._print_test_footer(test_name, False)
+            raise e
+
     @patch('ui.backend.app.verify_token')
     def test_history_unauthorized_invalid_token(self, mock_verify_token):
         test_name = "History Unauthorized Invalid Token"
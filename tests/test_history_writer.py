@@ -0,0 +1,110 @@
+import unittest
+import sys
+import os
+import time
+import threading
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from history_writer import HistoryWriter
+
+def make_row(user_id):
+    return (user_id, 'mobilenet_v2', 0.05, 'dog', 0.9, 'cat', 0.6)
+
+class HistoryWriterTest(unittest.TestCase):
+    """Tests for the write-behind attack history queue"""
+
+    def setUp(self):
+        self.batches = []
+        self.writers = []
+
+    def tearDown(self):
+        for writer in self.writers:
+            writer.close()
+
+    def write(self, rows):
+        self.batches.append(list(rows))
+        return len(rows)
+
+    def make_writer(self, **kwargs):
+        kwargs.setdefault('write', self.write)
+        writer = HistoryWriter(**kwargs)
+        self.writers.append(writer)
+        return writer
+
+    def test_full_batch_written_together(self):
+        """Test that reaching flush_rows writes the rows in one batch"""
+        writer = self.make_writer(flush_rows=3, flush_ms=60000)
+
+        for user_id in range(3):
+            writer.record(make_row(user_id))
+        self.assertTrue(writer.flush(timeout=5))
+
+        self.assertEqual(self.batches, [[make_row(0), make_row(1), make_row(2)]])
+        self.assertEqual(writer.stats()['written'], 3)
+
+    def test_partial_batch_written_after_interval(self):
+        """Test that a few rows are written once the oldest has waited flush_ms"""
+        writer = self.make_writer(flush_rows=100, flush_ms=50)
+
+        writer.record(make_row(1))
+        deadline = time.monotonic() + 5
+        while not self.batches and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(self.batches, [[make_row(1)]])
+
+    def test_queue_is_bounded(self):
+        """Test that rows beyond max_pending are dropped rather than buffered"""
+        release = threading.Event()
+
+        def slow_write(rows):
+            release.wait(5)
+            return self.write(rows)
+
+        writer = self.make_writer(write=slow_write, flush_rows=1, flush_ms=0, max_pending=2)
+        writer.record(make_row(0))
+        # Wait until the first row is being written, then fill the queue
+        deadline = time.monotonic() + 5
+        while writer._rows and time.monotonic() < deadline:
+            time.sleep(0.01)
+        results = [writer.record(make_row(user_id)) for user_id in range(1, 5)]
+        release.set()
+        writer.flush(timeout=5)
+
+        self.assertEqual(results, [True, True, False, False])
+        self.assertEqual(writer.stats()['dropped'], 2)
+        self.assertEqual(writer.stats()['written'], 3)
+
+    def test_close_drains_queue(self):
+        """Test that closing writes the rows still queued"""
+        writer = self.make_writer(flush_rows=2, flush_ms=60000)
+        for user_id in range(5):
+            writer.record(make_row(user_id))
+
+        writer.close()
+
+        self.assertEqual(sum(len(batch) for batch in self.batches), 5)
+        self.assertFalse(writer.record(make_row(6)))
+
+    def test_failed_write_counted(self):
+        """Test that a failed insert is reported without stopping the writer"""
+        writer = self.make_writer(write=MagicMock(side_effect=[None, 1]), flush_rows=1, flush_ms=0)
+
+        writer.record(make_row(1))
+        writer.flush(timeout=5)
+        writer.record(make_row(2))
+        writer.flush(timeout=5)
+
+        stats = writer.stats()
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['written'], 1)
+        self.assertEqual(stats['flushes'], 2)
+
+if __name__ == '__main__':
+    unittest.main()
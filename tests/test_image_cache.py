@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import numpy as np
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from image_cache import ImageCache
+
+def make_pixels(value, size=4):
+    return np.full((size, size, 3), value, dtype=np.uint8)
+
+class ImageCacheTest(unittest.TestCase):
+    """Tests for the content-hash cache of decoded images"""
+
+    def test_hit_and_miss_counters(self):
+        """Test that lookups are counted as hits or misses"""
+        cache = ImageCache(max_bytes=1024)
+
+        self.assertIsNone(cache.get(('abc', (4, 4))))
+        cache.put(('abc', (4, 4)), make_pixels(7))
+        pixels = cache.get(('abc', (4, 4)))
+
+        self.assertEqual(int(pixels[0, 0, 0]), 7)
+        stats = cache.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['bytes'], 48)
+
+    def test_input_size_is_part_of_the_key(self):
+        """Test that the same image resized for another model is a separate entry"""
+        cache = ImageCache(max_bytes=1024)
+        cache.put(('abc', (4, 4)), make_pixels(1))
+
+        self.assertIsNone(cache.get(('abc', (5, 5))))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that the byte budget evicts the least recently used image"""
+        cache = ImageCache(max_bytes=100)  # Room for two 48-byte images
+
+        cache.put(('a', (4, 4)), make_pixels(1))
+        cache.put(('b', (4, 4)), make_pixels(2))
+        cache.get(('a', (4, 4)))  # b is now least recently used
+        cache.put(('c', (4, 4)), make_pixels(3))
+
+        self.assertIsNone(cache.get(('b', (4, 4))))
+        self.assertIsNotNone(cache.get(('a', (4, 4))))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertLessEqual(cache.stats()['bytes'], 100)
+
+    def test_oversized_images_are_not_cached(self):
+        """Test that an image larger than the whole budget is skipped"""
+        cache = ImageCache(max_bytes=10)
+        cache.put(('a', (4, 4)), make_pixels(1))
+
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_cached_arrays_are_read_only(self):
+        """Test that a request cannot modify pixels shared with other requests"""
+        cache = ImageCache(max_bytes=1024)
+        cache.put(('a', (4, 4)), make_pixels(1))
+
+        with self.assertRaises(ValueError):
+            cache.get(('a', (4, 4)))[0, 0, 0] = 9
+
+if __name__ == '__main__':
+    unittest.main()
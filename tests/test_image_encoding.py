@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import io
+import base64
+import numpy as np
+from PIL import Image
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from image_encoding import ImageEncoder, encode_timings
+
+def make_image(value):
+    return np.full((8, 8, 3), value, dtype=np.float32)
+
+def decode(b64):
+    return Image.open(io.BytesIO(base64.b64decode(b64)))
+
+class ImageEncoderTest(unittest.TestCase):
+    """Tests for encoding the result images"""
+
+    def test_formats(self):
+        """Test that each output format produces a decodable image of that format"""
+        for image_format, pil_format in [('png', 'PNG'), ('webp', 'WEBP'), ('jpeg', 'JPEG'), ('JPG', 'JPEG')]:
+            encoder = ImageEncoder(image_format)
+            image = decode(encoder.render(make_image(0.5)))
+            self.assertEqual(image.format, pil_format)
+            self.assertEqual(image.size, (8, 8))
+
+    def test_png_is_lossless(self):
+        """Test that PNG keeps the exact pixel values at any compression level"""
+        pixels = np.random.RandomState(0).rand(8, 8, 3).astype(np.float32)
+        expected = np.clip(pixels * 255, 0, 255).astype(np.uint8)
+        for level in (0, 9):
+            image = decode(ImageEncoder('png', level).render(pixels))
+            np.testing.assert_array_equal(np.array(image), expected)
+
+    def test_invalid_options(self):
+        """Test that unknown formats and out-of-range qualities are rejected"""
+        with self.assertRaises(ValueError):
+            ImageEncoder('gif')
+        with self.assertRaises(ValueError):
+            ImageEncoder('png', 10)
+        with self.assertRaises(ValueError):
+            ImageEncoder('jpeg', 0)
+
+    def test_render_all_keeps_order(self):
+        """Test that concurrently encoded images come back in input order"""
+        values = [0.0, 0.5, 1.0]
+        rendered = ImageEncoder('png').render_all([make_image(v) for v in values])
+
+        for value, b64 in zip(values, rendered):
+            self.assertEqual(np.array(decode(b64))[0, 0, 0], int(value * 255))
+
+    def test_timings_are_recorded_per_format(self):
+        """Test that encode counts and times are kept for each format"""
+        before = encode_timings.stats().get('webp', {}).get('images', 0)
+
+        ImageEncoder('webp', 50).render_all([make_image(0.2), make_image(0.4)])
+
+        stats = encode_timings.stats()['webp']
+        self.assertEqual(stats['images'], before + 2)
+        self.assertGreater(stats['bytes'], 0)
+        self.assertIn('mean_ms', stats)
+
+if __name__ == '__main__':
+    unittest.main()
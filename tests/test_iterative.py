@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+try:
+    import tensorflow as tf
+    from iterative import IterativeAttack
+except ImportError:
+    tf = None
+
+class ThresholdEngine:
+    """
+    Two-class stand-in for an FGSM engine. Channel 1 of each image holds its
+    threshold; the image becomes class 1 once the mean of channel 0 passes it.
+    The loss gradient only ever pushes channel 0 upwards.
+    """
+
+    def __init__(self):
+        self.gradient_batches = []
+
+    def predict(self, images):
+        images = np.asarray(images)
+        above = images[..., 0].mean(axis=(1, 2)) > images[..., 1].mean(axis=(1, 2))
+        return np.stack([~above, above], axis=1).astype(np.float32)
+
+    def gradient_and_prediction(self, images, labels):
+        images = np.asarray(images)
+        self.gradient_batches.append(len(images))
+        gradient = np.zeros_like(images)
+        gradient[..., 0] = 1.0
+        return tf.constant(gradient), tf.constant(self.predict(images))
+
+@unittest.skipIf(tf is None, "TensorFlow is not installed")
+class IterativeAttackTest(unittest.TestCase):
+    """Tests for the batched iterative attack engine"""
+
+    def make_images(self, thresholds):
+        images = np.zeros((len(thresholds), 2, 2, 3), dtype=np.float32)
+        images[..., 1] = np.asarray(thresholds, dtype=np.float32)[:, None, None]
+        return images
+
+    def test_fooled_samples_are_dropped_from_later_iterations(self):
+        """Test that early-stopped samples are masked out of the following passes"""
+        engine = ThresholdEngine()
+        images = self.make_images([0.15, 0.35, 0.9])
+
+        outcome = IterativeAttack(engine, 'bim', epsilon=0.6, step_size=0.1, iterations=10).run(images)
+
+        self.assertEqual(outcome["success"].tolist(), [True, True, False])
+        self.assertLess(outcome["stopped_at"][0], outcome["stopped_at"][2])
+        active_counts = [stat["active"] for stat in outcome["iteration_stats"]]
+        self.assertEqual(active_counts[0], 3)
+        self.assertEqual(active_counts[-1], 1)
+        self.assertEqual(engine.gradient_batches, active_counts)
+
+    def test_perturbation_stays_inside_epsilon_ball(self):
+        """Test that every step is projected back into the epsilon ball"""
+        engine = ThresholdEngine()
+        images = self.make_images([0.9, 0.9])
+
+        for method in ('bim', 'pgd', 'mifgsm'):
+            outcome = IterativeAttack(engine, method, epsilon=0.05, step_size=0.02, iterations=5).run(images)
+            delta = np.asarray(outcome["adversarial_images"]) - images
+            self.assertLessEqual(float(np.abs(delta).max()), 0.05 + 1e-6)
+            self.assertEqual(len(outcome["iteration_stats"]), 5)
+
+    def test_unknown_method(self):
+        """Test that unsupported methods are rejected"""
+        with self.assertRaises(ValueError):
+            IterativeAttack(ThresholdEngine(), 'cw')
+
+if __name__ == '__main__':
+    unittest.main()
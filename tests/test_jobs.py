@@ -0,0 +1,126 @@
+import unittest
+import sys
+import os
+import time
+import shutil
+import tempfile
+import threading
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from jobs import JobManager, JobQueueFull
+
+def wait_for(manager, job_id, statuses=('succeeded', 'failed'), timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}")
+
+class JobManagerTest(unittest.TestCase):
+    """Tests for the SQLite-backed background attack jobs"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, 'jobs.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_job_runs_and_stores_result(self):
+        """Test that a submitted job runs in the background and keeps its result"""
+        def runner(params, image_bytes, progress):
+            return {'epsilon_used': 0.01, 'model_used': params['model'], 'size': len(image_bytes)}
+
+        manager = JobManager(runner, db_path=self.db_path, max_workers=1)
+        job_id = manager.submit('auto_tune', {'model': 'mobilenet_v2'}, b'12345')
+
+        job = wait_for(manager, job_id)
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['result'], {'epsilon_used': 0.01, 'model_used': 'mobilenet_v2', 'size': 5})
+        self.assertIsNone(manager.get('missing'))
+
+    def test_progress_is_visible_while_running(self):
+        """Test that progress reported by the runner can be polled before the job ends"""
+        release = threading.Event()
+
+        def runner(params, image_bytes, progress):
+            progress({'epsilon': 0.5, 'forward_passes': 3, 'best_epsilon': 0.5})
+            release.wait(5)
+            return {'epsilon_used': 0.5}
+
+        manager = JobManager(runner, db_path=self.db_path, max_workers=1, progress_interval=0)
+        job_id = manager.submit('auto_tune', {}, b'')
+
+        job = wait_for(manager, job_id, statuses=('running',))
+        deadline = time.time() + 5
+        while job['progress'] is None and time.time() < deadline:
+            time.sleep(0.01)
+            job = manager.get(job_id)
+        self.assertEqual(job['progress']['forward_passes'], 3)
+        release.set()
+        self.assertEqual(wait_for(manager, job_id)['status'], 'succeeded')
+
+    def test_failures_are_recorded(self):
+        """Test that runner errors and empty results mark the job failed"""
+        def runner(params, image_bytes, progress):
+            if params.get('explode'):
+                raise RuntimeError('model exploded')
+            return None
+
+        manager = JobManager(runner, db_path=self.db_path, max_workers=1)
+        exploded = wait_for(manager, manager.submit('auto_tune', {'explode': True}, b''))
+        empty = wait_for(manager, manager.submit('auto_tune', {}, b''))
+
+        self.assertEqual((exploded['status'], exploded['error']), ('failed', 'model exploded'))
+        self.assertEqual(empty['status'], 'failed')
+
+    def test_queue_is_bounded(self):
+        """Test that submissions beyond the pending limit are refused"""
+        release = threading.Event()
+        manager = JobManager(lambda *args: release.wait(5) and {}, db_path=self.db_path,
+                             max_workers=1, max_pending=2)
+
+        manager.submit('auto_tune', {}, b'')
+        manager.submit('auto_tune', {}, b'')
+        with self.assertRaises(JobQueueFull):
+            manager.submit('auto_tune', {}, b'')
+        release.set()
+
+    def test_unfinished_jobs_survive_a_restart(self):
+        """Test that a new manager on the same database reruns queued and stale running jobs"""
+        never = threading.Event()
+        stopped = JobManager(lambda *args: never.wait(), db_path=self.db_path, max_workers=1)
+        running_id = stopped.submit('auto_tune', {'n': 1}, b'a')
+        queued_id = stopped.submit('auto_tune', {'n': 2}, b'b')
+        wait_for(stopped, running_id, statuses=('running',))
+
+        restarted = JobManager(lambda params, image_bytes, progress: {'n': params['n'], 'image': image_bytes.decode()},
+                               db_path=self.db_path, max_workers=2)
+        self.assertEqual(restarted.recover(stale_seconds=0), 2)
+
+        self.assertEqual(wait_for(restarted, running_id)['result'], {'n': 1, 'image': 'a'})
+        self.assertEqual(wait_for(restarted, queued_id)['result'], {'n': 2, 'image': 'b'})
+        never.set()
+
+    def test_owned_jobs_are_hidden_from_other_users(self):
+        """Test that a job submitted by a user can only be read back by that user"""
+        manager = JobManager(lambda *args: {'epsilon_used': 0.1}, db_path=self.db_path, max_workers=1)
+        owned_id = manager.submit('auto_tune', {}, b'', user_id=7)
+        anonymous_id = manager.submit('auto_tune', {}, b'')
+
+        self.assertEqual(wait_for(manager, anonymous_id)['status'], 'succeeded')
+        self.assertIsNone(manager.get(owned_id))
+        self.assertIsNone(manager.get(owned_id, user_id=8))
+        self.assertEqual(manager.get(owned_id, user_id=7)['job_id'], owned_id)
+        self.assertIsNotNone(manager.get(anonymous_id, user_id=8))
+
+if __name__ == '__main__':
+    unittest.main()
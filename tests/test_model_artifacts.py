@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+import numpy as np
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+import model_artifacts
+
+class ModelArtifactsTest(unittest.TestCase):
+    """Tests for the locally exported models and label table"""
+
+    def setUp(self):
+        self.model_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.model_dir)
+
+    def write_labels(self, count=4):
+        index = {str(i): [f"n{i:08d}", f"label_{i}"] for i in range(count)}
+        with open(os.path.join(self.model_dir, model_artifacts.LABELS_FILE), 'w') as f:
+            json.dump(index, f)
+
+    def test_has_model(self):
+        """Test that a model counts as exported only once its file exists"""
+        self.assertFalse(model_artifacts.has_model('mobilenet_v2', self.model_dir))
+
+        open(model_artifacts.model_path('mobilenet_v2', self.model_dir), 'wb').close()
+
+        self.assertTrue(model_artifacts.has_model('mobilenet_v2', self.model_dir))
+        self.assertFalse(model_artifacts.has_model('vgg19', self.model_dir))
+
+    def test_manifest_round_trip(self):
+        """Test that the manifest is written and read back, and missing means empty"""
+        self.assertEqual(model_artifacts.read_manifest(self.model_dir), {})
+
+        manifest = {"models": {"mobilenet_v2": {"load_seconds": 1.5}}}
+        model_artifacts.write_manifest(manifest, self.model_dir)
+
+        self.assertEqual(model_artifacts.read_manifest(self.model_dir), manifest)
+
+    def test_label_table_missing(self):
+        """Test that no table is returned when the labels were not exported"""
+        self.assertIsNone(model_artifacts.label_table(self.model_dir))
+
+    def test_decode_predictions(self):
+        """Test that labels decode like keras, best class first"""
+        self.write_labels()
+        table = model_artifacts.label_table(self.model_dir)
+
+        decoded = table.decode_predictions(np.array([[0.1, 0.6, 0.05, 0.25]]), top=2)
+
+        self.assertEqual(len(decoded), 1)
+        self.assertEqual([entry[:2] for entry in decoded[0]],
+                         [("n00000001", "label_1"), ("n00000003", "label_3")])
+        self.assertAlmostEqual(decoded[0][0][2], 0.6)
+        self.assertIs(model_artifacts.label_table(self.model_dir), table)
+
+if __name__ == '__main__':
+    unittest.main()
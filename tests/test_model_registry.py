@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import threading
+import subprocess
+from unittest.mock import patch, MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+# Mock the TensorFlow-backed FGSM module before importing the registry
+if 'fgsm' not in sys.modules:
+    sys.modules['fgsm'] = MagicMock(SUPPORTED_MODELS=('mobilenet_v2', 'inception_v3', 'vgg19', 'densenet121'))
+sys.modules['dotenv'] = MagicMock()
+
+from model_registry import ModelRegistry
+
+MB = 1024 * 1024
+
+def make_engine(footprint_mb):
+    engine = MagicMock()
+    engine.memory_footprint.return_value = footprint_mb * MB
+    return engine
+
+class ModelRegistryTest(unittest.TestCase):
+    """Tests for the process-wide FGSM engine registry"""
+
+    def setUp(self):
+        self.supported_patcher = patch('model_registry.SUPPORTED_MODELS',
+                                       ('mobilenet_v2', 'inception_v3', 'vgg19', 'densenet121'))
+        self.supported_patcher.start()
+        self.fgsm_patcher = patch('fgsm.FGSM')
+        self.mock_fgsm_class = self.fgsm_patcher.start()
+        self.mock_fgsm_class.side_effect = lambda model_name: make_engine(10)
+
+    def tearDown(self):
+        self.supported_patcher.stop()
+        self.fgsm_patcher.stop()
+
+    def test_engine_loaded_once_and_reused(self):
+        """Test that repeated lookups return the same warmed-up engine"""
+        registry = ModelRegistry(memory_budget_mb=0)
+
+        first = registry.get('mobilenet_v2')
+        second = registry.get('MobileNet_V2')
+
+        self.assertIs(first, second)
+        self.mock_fgsm_class.assert_called_once_with(model_name='mobilenet_v2')
+        first.warm_up.assert_called_once()
+        self.assertEqual(registry.stats()['loads'], 1)
+        self.assertEqual(registry.stats()['hits'], 1)
+
+    def test_unsupported_model(self):
+        """Test that unknown models are rejected before anything is loaded"""
+        registry = ModelRegistry(memory_budget_mb=0)
+
+        with self.assertRaises(ValueError):
+            registry.get('resnet50')
+        self.mock_fgsm_class.assert_not_called()
+
+    def test_least_recently_used_model_is_evicted(self):
+        """Test that the memory budget evicts the least recently used engine"""
+        registry = ModelRegistry(memory_budget_mb=25)
+
+        registry.get('mobilenet_v2')
+        registry.get('inception_v3')
+        registry.get('mobilenet_v2')  # inception_v3 is now least recently used
+        registry.get('vgg19')
+
+        self.assertEqual(registry.loaded_models(), ['mobilenet_v2', 'vgg19'])
+        self.assertEqual(registry.stats()['evictions'], 1)
+        self.assertEqual(registry.stats()['memory_bytes'], 20 * MB)
+
+    def test_concurrent_requests_share_one_load(self):
+        """Test that concurrent first requests for a model build it only once"""
+        registry = ModelRegistry(memory_budget_mb=0)
+        engines = []
+
+        def worker():
+            engines.append(registry.get('densenet121'))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.mock_fgsm_class.assert_called_once()
+        self.assertTrue(all(engine is engines[0] for engine in engines))
+
+    def test_warm_up_skips_failing_models(self):
+        """Test that a model failing to load does not stop the others warming up"""
+        registry = ModelRegistry(memory_budget_mb=0)
+        self.mock_fgsm_class.side_effect = [RuntimeError("no weights"), make_engine(10)]
+
+        registry.warm_up(['mobilenet_v2', 'inception_v3'])
+
+        self.assertEqual(registry.loaded_models(), ['inception_v3'])
+
+    def test_preload_fetches_weights_in_another_process(self):
+        """Test that preloading never builds a model in this process"""
+        registry = ModelRegistry(memory_budget_mb=0)
+
+        with patch('model_registry.multiprocessing.get_context') as get_context:
+            get_context.return_value.Process.return_value.exitcode = 0
+            registry.preload(['vgg19'])
+
+        get_context.assert_called_once_with('spawn')
+        self.assertEqual(get_context.return_value.Process.call_args[1]['args'], (['vgg19'],))
+        self.mock_fgsm_class.assert_not_called()
+        self.assertEqual(registry.loaded_models(), [])
+
+    def test_fetch_weights_reports_failures(self):
+        """Test that the weight-fetching process exits non-zero and names the models it could not fetch"""
+        from model_registry import fetch_weights
+        self.mock_fgsm_class.side_effect = [MagicMock(), RuntimeError("no network")]
+
+        with self.assertRaises(SystemExit) as raised:
+            fetch_weights(['mobilenet_v2', 'vgg19'])
+
+        self.assertIn('vgg19', str(raised.exception.code))
+        self.assertNotIn('mobilenet_v2', str(raised.exception.code))
+        self.mock_fgsm_class.side_effect = None
+        fetch_weights(['mobilenet_v2'])
+
+    def test_import_does_not_load_tensorflow(self):
+        """Test that TensorFlow is only imported once a model is loaded"""
+        backend_dir = os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend')
+        output = subprocess.run(
+            [sys.executable, '-c', "import sys, model_registry; print('tensorflow' in sys.modules)"],
+            cwd=backend_dir, capture_output=True, text=True, check=True
+        ).stdout
+
+        self.assertEqual(output.strip().splitlines()[-1], 'False')
+
+if __name__ == '__main__':
+    unittest.main()
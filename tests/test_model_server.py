@@ -0,0 +1,123 @@
+import unittest
+import sys
+import os
+import time
+import threading
+import numpy as np
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from model_server import ModelServer, parse_cpu_sets, split_cpus
+
+def fake_probs(images):
+    scores = images.mean(axis=(1, 2, 3))[:, None] * np.arange(1000, dtype=np.float32)
+    exp = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+class FakeEngine:
+    """Numpy stand-in for FGSM so the worker processes do not load TensorFlow"""
+
+    def __init__(self, model_name):
+        if model_name == 'broken':
+            raise ValueError("Unsupported model.")
+
+    def predict(self, images):
+        return fake_probs(images)
+
+    def gradient_and_prediction(self, images, labels):
+        return images * 2 + labels.sum(), fake_probs(images)
+
+def fake_engine(model_name, num_threads):
+    return FakeEngine(model_name)
+
+class ModelServerTest(unittest.TestCase):
+    """Tests for the multi-process inference workers"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ModelServer(num_workers=2, cpu_sets=split_cpus(2), block_mb=0.5, engine_factory=fake_engine)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.close()
+
+    def test_predict_and_gradient_round_trip(self):
+        """Test that tensors come back from the workers exactly as computed there"""
+        images = np.random.RandomState(0).uniform(-1, 1, (2, 32, 32, 3)).astype(np.float32)
+        labels = np.eye(1000, dtype=np.float32)[[3, 7]]
+
+        probs = self.server.predict('mobilenet_v2', images)
+        gradient, grad_probs = self.server.gradient_and_prediction('mobilenet_v2', images, labels)
+
+        np.testing.assert_allclose(probs, fake_probs(images), rtol=1e-6)
+        np.testing.assert_allclose(gradient, images * 2 + 2, rtol=1e-6)
+        np.testing.assert_allclose(grad_probs, probs, rtol=1e-6)
+
+    def test_block_grows_for_large_batches(self):
+        """Test that a batch bigger than the shared block is still served"""
+        images = np.random.RandomState(1).uniform(-1, 1, (4, 224, 224, 3)).astype(np.float32)
+        labels = np.eye(1000, dtype=np.float32)[[0, 1, 2, 3]]
+
+        gradient, _ = self.server.gradient_and_prediction('mobilenet_v2', images, labels)
+
+        np.testing.assert_allclose(gradient, images * 2 + 4, rtol=1e-6)
+        self.assertTrue(any(worker['block_bytes'] > 512 * 1024 for worker in self.server.stats()['workers']))
+
+    def test_worker_errors_are_raised(self):
+        """Test that a failure inside a worker is reported and the worker keeps serving"""
+        images = np.zeros((1, 8, 8, 3), dtype=np.float32)
+
+        with self.assertRaises(RuntimeError):
+            self.server.predict('broken', images)
+        self.assertEqual(self.server.predict('mobilenet_v2', images).shape, (1, 1000))
+        self.assertTrue(all(worker['alive'] for worker in self.server.stats()['workers']))
+
+    def test_concurrent_loads_of_different_models(self):
+        """Test that two models loading at once both finish instead of splitting the workers"""
+        server = ModelServer(num_workers=2, cpu_sets=split_cpus(2), block_mb=0.5, engine_factory=fake_engine)
+        server._ensure_started()
+        # Widen the gap between taking one worker and the next, so the loads interleave
+        take = server._idle.get
+
+        def slow_take(*args, **kwargs):
+            slot = take(*args, **kwargs)
+            time.sleep(0.1)
+            return slot
+
+        server._idle.get = slow_take
+        try:
+            threads = [threading.Thread(target=server.load, args=(name,), daemon=True)
+                       for name in ('mobilenet_v2', 'inception_v3')]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=10)
+
+            self.assertFalse(any(thread.is_alive() for thread in threads))
+            self.assertEqual(server.stats()['idle_workers'], 2)
+        finally:
+            server._idle.get = take
+            server.close()
+
+    def test_load_reaches_every_worker(self):
+        """Test that loading a model touches every worker once"""
+        before = [worker['requests'] for worker in self.server.stats()['workers']]
+
+        self.server.load('vgg19')
+
+        after = [worker['requests'] for worker in self.server.stats()['workers']]
+        self.assertEqual([b - a for a, b in zip(before, after)], [1, 1])
+
+    def test_parse_cpu_sets(self):
+        """Test the MODEL_SERVER_CPUS format"""
+        self.assertEqual(parse_cpu_sets("0-1;2,3; 5"), [{0, 1}, {2, 3}, {5}])
+        with self.assertRaises(ValueError):
+            ModelServer(num_workers=3, cpu_sets=[{0}, {1}], engine_factory=fake_engine)
+
+if __name__ == '__main__':
+    unittest.main()
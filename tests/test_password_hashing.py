@@ -0,0 +1,69 @@
+import unittest
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from password_hashing import PasswordHasher, PasswordHasherBusy, hash_rounds
+
+class PasswordHasherTest(unittest.TestCase):
+    """Tests for bcrypt hashing off the request threads"""
+
+    def test_hash_and_check_inline(self):
+        """Test that hashes use the configured cost and verify the right password only"""
+        hasher = PasswordHasher(rounds=4, workers=0)
+
+        pw_hash = hasher.generate_password_hash('secret').decode('utf-8')
+
+        self.assertEqual(hash_rounds(pw_hash), 4)
+        self.assertTrue(hasher.check_password_hash(pw_hash, 'secret'))
+        self.assertFalse(hasher.check_password_hash(pw_hash, 'wrong'))
+        self.assertEqual(hasher.stats()['checks'], 2)
+
+    def test_hash_and_check_in_worker_process(self):
+        """Test that the process pool gives the same results"""
+        hasher = PasswordHasher(rounds=4, workers=1)
+        try:
+            pw_hash = hasher.generate_password_hash('secret')
+            self.assertTrue(hasher.check_password_hash(pw_hash, 'secret'))
+        finally:
+            hasher.close()
+
+    def test_needs_rehash(self):
+        """Test that plaintext and other-cost hashes are flagged for upgrade"""
+        hasher = PasswordHasher(rounds=4, workers=0)
+
+        self.assertTrue(hasher.needs_rehash('plaintext'))
+        self.assertTrue(hasher.needs_rehash('$2b$12$' + 'a' * 53))
+        self.assertFalse(hasher.needs_rehash('$2b$04$' + 'a' * 53))
+
+    def test_concurrency_cap(self):
+        """Test that calls beyond max_pending are rejected once the queue timeout passes"""
+        hasher = PasswordHasher(rounds=4, workers=0, max_pending=1, queue_timeout=0.05)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking(*args):
+            started.set()
+            release.wait(5)
+            return True
+
+        holder = threading.Thread(target=hasher._run, args=('checks', blocking))
+        holder.start()
+        started.wait(5)
+        with self.assertRaises(PasswordHasherBusy):
+            hasher.check_password_hash('$2b$04$' + 'a' * 53, 'secret')
+        release.set()
+        holder.join()
+
+        self.assertEqual(hasher.stats()['rejected'], 1)
+        self.assertEqual(hasher.stats()['in_flight'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
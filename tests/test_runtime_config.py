@@ -0,0 +1,93 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+from unittest.mock import patch, MagicMock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+sys.modules['dotenv'] = MagicMock()
+
+from runtime_config import ThreadingConfig, cgroup_cpu_limit, plan_threads
+
+def write(root, name, content):
+    path = os.path.join(root, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(content)
+
+class RuntimeConfigTest(unittest.TestCase):
+    """Tests for the TensorFlow thread pool sizing"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def test_cgroup_v2_limit(self):
+        """Test that cpu.max quotas are read as cores and 'max' as unlimited"""
+        write(self.root, 'cpu.max', '150000 100000\n')
+        self.assertEqual(cgroup_cpu_limit(self.root), 1.5)
+
+        write(self.root, 'cpu.max', 'max 100000\n')
+        self.assertIsNone(cgroup_cpu_limit(self.root))
+
+    def test_cgroup_v1_limit(self):
+        """Test that the CFS quota is used when there is no cgroup v2 file"""
+        write(self.root, 'cpu,cpuacct/cpu.cfs_quota_us', '400000')
+        write(self.root, 'cpu,cpuacct/cpu.cfs_period_us', '100000')
+        self.assertEqual(cgroup_cpu_limit(self.root), 4.0)
+
+        write(self.root, 'cpu,cpuacct/cpu.cfs_quota_us', '-1')
+        self.assertIsNone(cgroup_cpu_limit(self.root))
+        self.assertIsNone(cgroup_cpu_limit(os.path.join(self.root, 'missing')))
+
+    def test_profiles_split_cores_between_workers(self):
+        """Test that each worker gets its share of the cores under both profiles"""
+        self.assertEqual(plan_threads(8, workers=2, threads=4, profile='latency'), {'intra_op': 4, 'inter_op': 2})
+        self.assertEqual(plan_threads(8, workers=2, threads=4, profile='throughput'), {'intra_op': 1, 'inter_op': 4})
+        # Never below one thread, even with more workers than cores
+        self.assertEqual(plan_threads(2, workers=4, threads=8, profile='throughput'), {'intra_op': 1, 'inter_op': 1})
+        with self.assertRaises(ValueError):
+            plan_threads(8, profile='fastest')
+
+    def test_plan_uses_cgroup_limit_and_overrides(self):
+        """Test that the detected limit drives the plan unless thread counts are set explicitly"""
+        write(self.root, 'cpu.max', '300000 100000\n')
+        with patch('runtime_config.os.sched_getaffinity', return_value=set(range(16)), create=True):
+            plan = ThreadingConfig(profile='latency', cgroup_root=self.root).plan(workers=1, threads=1)
+            pinned = ThreadingConfig(profile='latency', intra_op=6, cgroup_root=self.root).plan(workers=1, threads=1)
+
+        self.assertEqual((plan['cpus'], plan['intra_op'], plan['inter_op']), (3, 3, 2))
+        self.assertEqual((pinned['intra_op'], pinned['inter_op']), (6, 2))
+
+    def test_apply_only_once(self):
+        """Test that the pools are sized on the first call and later calls keep that plan"""
+        fake_tf = MagicMock()
+        config = ThreadingConfig(profile='latency', cgroup_root=self.root)
+
+        with patch.dict(sys.modules, {'tensorflow': fake_tf}):
+            first = config.apply(cpus=4, workers=2, threads=2)
+            second = config.apply(cpus=16, workers=1, threads=1)
+
+        self.assertIs(first, second)
+        self.assertTrue(first['applied'])
+        fake_tf.config.threading.set_intra_op_parallelism_threads.assert_called_once_with(2)
+        fake_tf.config.threading.set_inter_op_parallelism_threads.assert_called_once_with(2)
+
+    def test_apply_after_tensorflow_started(self):
+        """Test that a late call reports the pools as not applied instead of failing"""
+        fake_tf = MagicMock()
+        fake_tf.config.threading.set_intra_op_parallelism_threads.side_effect = RuntimeError("already initialized")
+
+        with patch.dict(sys.modules, {'tensorflow': fake_tf}):
+            plan = ThreadingConfig(profile='throughput', cgroup_root=self.root).apply(cpus=4)
+
+        self.assertFalse(plan['applied'])
+
+if __name__ == '__main__':
+    unittest.main()
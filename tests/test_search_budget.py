@@ -0,0 +1,127 @@
+import unittest
+import sys
+import os
+import io
+import importlib.util
+import numpy as np
+import unittest.mock
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+BACKEND_DIR = os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+try:
+    import tensorflow as tf
+    # Other tests replace sys.modules['fgsm'] with a mock, so load the real module under its own name
+    spec = importlib.util.spec_from_file_location('fgsm_search_budget', os.path.join(BACKEND_DIR, 'fgsm.py'))
+    fgsm_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(fgsm_module)
+except ImportError:
+    tf = None
+
+def never_fooled(images):
+    """Every candidate keeps the original class 0"""
+    return np.tile(np.array([[0.9, 0.1]], dtype=np.float32), (len(images), 1))
+
+def fooled_above(threshold):
+    """Candidates whose mean pixel passes threshold flip to class 1"""
+    def predict(images):
+        above = np.asarray(images).mean(axis=(1, 2, 3)) > threshold
+        return np.stack([np.where(above, 0.1, 0.9), np.where(above, 0.9, 0.1)], axis=1).astype(np.float32)
+    return predict
+
+@unittest.skipIf(tf is None, "TensorFlow is not installed")
+class ForwardPassBudgetTest(unittest.TestCase):
+    """Tests for the forward-pass cap across the epsilon search strategies"""
+
+    def setUp(self):
+        self.engine = fgsm_module.FGSM.__new__(fgsm_module.FGSM)
+        self.engine.decode_predictions = lambda probs, top: [[
+            (f"class_{np.argmax(probs[0])}", f"class_{np.argmax(probs[0])}", float(np.max(probs[0])))
+        ]]
+        self.image = tf.zeros((1, 4, 4, 3))
+        self.perturbations = tf.ones((1, 4, 4, 3))
+        self.epsilons = [0.01 * i for i in range(1, 11)]
+
+    def test_counter_refuses_passes_over_the_limit(self):
+        """Test that predict raises once the budget is spent"""
+        passes = fgsm_module.ForwardPassCounter(never_fooled, limit=1)
+
+        passes.predict(self.image)
+        with self.assertRaises(fgsm_module.ForwardPassBudgetExhausted):
+            passes.predict(self.image)
+        self.assertEqual(passes.count, 1)
+
+    def test_linear_search_stops_at_the_budget(self):
+        """Test that the linear sweep scores no more candidates than the cap allows"""
+        passes = fgsm_module.ForwardPassCounter(never_fooled, limit=3)
+
+        found = self.engine._sequential_search(passes, self.image, self.perturbations, self.epsilons,
+                                               'class_0', 0.001, "Coarse Search")
+
+        self.assertIsNone(found)
+        self.assertEqual(passes.count, 3)
+
+    def test_batched_search_stops_at_the_budget(self):
+        """Test that the batched sweep stops scoring chunks once the cap is reached"""
+        passes = fgsm_module.ForwardPassCounter(never_fooled, limit=2)
+
+        # Room for one candidate per chunk, so each chunk is one forward pass
+        found = self.engine._batched_search(passes, self.image, self.perturbations, self.epsilons,
+                                            'class_0', 0.001, sweep_memory_mb=0)
+
+        self.assertIsNone(found)
+        self.assertEqual(passes.count, 2)
+
+    def test_full_precision_retry_gets_the_remaining_budget(self):
+        """Test that the quantized search and its full-precision retry share one cap"""
+        calls = []
+
+        def counted(predict):
+            def wrapper(images):
+                calls.append(len(images))
+                return predict(images)
+            return wrapper
+
+        engine = self.engine
+        engine.model_name = 'mobilenet_v2'
+        engine.scoring_backend = 'tflite_float16'
+        # The quantized scorer is fooled by large epsilons that the full model resists
+        engine.scorer = unittest.mock.MagicMock(predict=counted(fooled_above(0.3)))
+        engine.predict = counted(never_fooled)
+        engine.load_image = lambda image_input, flatten_alpha: (None, 'digest')
+        engine.preprocess_pixels = lambda pixels: self.image
+        engine.cached_pattern = lambda digest: (never_fooled(self.image), self.perturbations)
+        engine.encode_display_images = lambda *images: {}
+
+        results = engine.auto_tune_attack(b'image', max_forward_passes=4)
+
+        self.assertFalse(results['attack_success'])
+        self.assertEqual(results['forward_passes'], len(calls))
+        self.assertLessEqual(len(calls), 4)
+
+    def test_full_precision_retry_of_an_upload_stream(self):
+        """Test that the fallback search can decode a file-like input the first pass already read"""
+        from PIL import Image
+        upload = io.BytesIO()
+        Image.new('RGB', (8, 8), (40, 80, 120)).save(upload, format='PNG')
+        upload.seek(0)
+
+        engine = self.engine
+        engine.model_name = 'mobilenet_v2'
+        engine.scoring_backend = 'tflite_float16'
+        engine.image_size = (4, 4)
+        engine.scorer = unittest.mock.MagicMock(predict=fooled_above(0.3))
+        engine.predict = never_fooled
+        engine.preprocess_pixels = lambda pixels: self.image
+        engine.cached_pattern = lambda digest: (never_fooled(self.image), self.perturbations)
+        engine.encode_display_images = lambda *images: {}
+
+        results = engine.auto_tune_attack(upload, max_forward_passes=6)
+
+        self.assertIsNotNone(results)
+        self.assertFalse(results['scorer_confirmed'])
+
+if __name__ == '__main__':
+    unittest.main()
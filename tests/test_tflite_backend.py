@@ -0,0 +1,88 @@
+import unittest
+import sys
+import os
+import threading
+import numpy as np
+
+# Add the project root and backend directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
+sys.path.insert(0, os.path.join(os.path.abspath(os.path.dirname(os.path.dirname(__file__))), 'ui', 'backend'))
+
+try:
+    import tensorflow as tf
+    from tflite_backend import TFLiteScorer
+except ImportError:
+    tf = None
+
+def make_model():
+    tf.keras.utils.set_random_seed(0)
+    return tf.keras.Sequential([
+        tf.keras.Input((16, 16, 3)),
+        tf.keras.layers.Conv2D(8, 3, activation='relu'),
+        tf.keras.layers.GlobalAveragePooling2D(),
+        tf.keras.layers.Dense(5, activation='softmax'),
+    ])
+
+@unittest.skipIf(tf is None, "TensorFlow is not installed")
+class TFLiteScorerTest(unittest.TestCase):
+    """Tests for the quantized forward-only scoring backend"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = make_model()
+        cls.images = np.random.RandomState(0).uniform(-1, 1, (6, 16, 16, 3)).astype(np.float32)
+
+    def test_float16_matches_keras(self):
+        """Test that float16 scoring stays close to the Keras probabilities"""
+        scorer = TFLiteScorer(self.model, 'float16')
+
+        probs = scorer.predict(self.images)
+
+        self.assertEqual(probs.shape, (6, 5))
+        np.testing.assert_allclose(probs, self.model(self.images).numpy(), atol=1e-2)
+
+    def test_int8_with_and_without_calibration(self):
+        """Test that both int8 variants build and produce probabilities"""
+        for calibration in (None, list(self.images)):
+            scorer = TFLiteScorer(self.model, 'int8', calibration_images=calibration)
+            probs = scorer.predict(self.images)
+            self.assertEqual(probs.shape, (6, 5))
+            np.testing.assert_allclose(probs.sum(axis=1), 1.0, atol=0.05)
+
+    def test_batch_size_changes(self):
+        """Test that single candidates and candidate batches can be mixed"""
+        scorer = TFLiteScorer(self.model, 'float16')
+
+        single = scorer.predict(self.images[:1])
+        batch = scorer.predict(self.images)
+        again = scorer.predict(self.images[:1])
+
+        np.testing.assert_allclose(single, batch[:1], atol=1e-5)
+        np.testing.assert_allclose(single, again, atol=1e-6)
+
+    def test_concurrent_predictions(self):
+        """Test that concurrent callers each get their own rows back"""
+        scorer = TFLiteScorer(self.model, 'float16')
+        expected = scorer.predict(self.images)
+        results = {}
+
+        def worker(i):
+            for _ in range(20):
+                results[i] = scorer.predict(self.images[i:i + 1])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(self.images))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for i in range(len(self.images)):
+            np.testing.assert_allclose(results[i], expected[i:i + 1], atol=1e-5)
+
+    def test_unsupported_quantization(self):
+        """Test that unknown quantization modes are rejected"""
+        with self.assertRaises(ValueError):
+            TFLiteScorer(self.model, 'int4')
+
+if __name__ == '__main__':
+    unittest.main()
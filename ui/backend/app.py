@@ -1,10 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response
 from flask_cors import CORS
 import os
-from fgsm import FGSM  # your FGSM class
+import json
+import base64
+import binascii
+import zipfile
+from itertools import chain
+from model_registry import model_registry  # shared FGSM engines
+from model_catalog import SEARCH_STRATEGIES, ITERATIVE_METHODS
+from image_cache import image_cache
+from gallery_cache import gallery_cache
+from gradient_cache import gradient_cache
+from image_encoding import ImageEncoder, encode_timings
+from artifact_store import ArtifactEncoder, artifact_store
+from jobs import JobManager, JobQueueFull
+from runtime_config import thread_config
 from auth import register_user, login_user, verify_token
 from flask_bcrypt import Bcrypt
-from db import execute_query, get_connection
+from db import execute_query, get_connection, db_pool
+from password_hashing import password_hasher
+from history_writer import history_writer
 from dotenv import load_dotenv
 from PIL import Image
 from io import BytesIO
@@ -18,6 +33,107 @@ app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 bcrypt = Bcrypt(app)
 
+ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'bmp', 'gif'}
+MAX_BATCH_IMAGES = int(os.getenv('MAX_BATCH_IMAGES', '500'))
+MAX_BATCH_SIZE = int(os.getenv('MAX_BATCH_SIZE', '64'))
+MAX_ZIP_ENTRY_BYTES = int(float(os.getenv('MAX_ZIP_ENTRY_MB', '20')) * 1024 * 1024)
+MAX_ZIP_TOTAL_BYTES = int(float(os.getenv('MAX_ZIP_TOTAL_MB', '500')) * 1024 * 1024)
+HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '50'))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', '200'))
+
+def auto_tune_options(params):
+    """Auto-tune search settings from form or JSON parameters"""
+    max_forward_passes = params.get('maxForwardPasses')
+    if max_forward_passes is not None:
+        max_forward_passes = int(max_forward_passes)
+        if max_forward_passes < 1:
+            raise ValueError("maxForwardPasses must be at least 1")
+    search_strategy = params.get('searchStrategy', 'linear')
+    if search_strategy not in SEARCH_STRATEGIES:
+        raise ValueError(f"Unsupported search strategy: {search_strategy}")
+    return {
+        'search_strategy': search_strategy,
+        'tolerance': float(params.get('tolerance', 0.001)),
+        'max_forward_passes': max_forward_passes,
+    }
+
+def iterative_options(params):
+    """Iterative attack (BIM/PGD/MI-FGSM) settings from form or JSON parameters; rejects unknown methods"""
+    attack_method = str(params.get('attackMethod', 'fgsm')).lower()
+    if attack_method not in ITERATIVE_METHODS:
+        raise ValueError(f"Unsupported attack method: {attack_method}")
+    step_size = params.get('stepSize')
+    return {
+        'iterations': int(params.get('iterations', 10)),
+        'step_size': float(step_size) if step_size else None,
+        'decay': float(params.get('decay', 1.0)),
+    }
+
+# History pages are read newest first by keyset on (created_at, id), served by
+# the (user_id, created_at, id) index in migrations/001_attack_history_keyset_index.sql
+HISTORY_COLUMNS = "id, model_used, epsilon_used, orig_class, orig_conf, adv_class, adv_conf, created_at"
+HISTORY_FIRST_PAGE = f"""
+    SELECT {HISTORY_COLUMNS} FROM attack_history
+    WHERE user_id = %s
+    ORDER BY created_at DESC, id DESC LIMIT %s
+"""
+HISTORY_NEXT_PAGE = f"""
+    SELECT {HISTORY_COLUMNS} FROM attack_history
+    WHERE user_id = %s AND (created_at < %s OR (created_at = %s AND id < %s))
+    ORDER BY created_at DESC, id DESC LIMIT %s
+"""
+
+def encode_history_cursor(row):
+    """Opaque cursor pointing just after row"""
+    created_at = row['created_at']
+    if hasattr(created_at, 'isoformat'):
+        created_at = created_at.isoformat(sep=' ')
+    return base64.urlsafe_b64encode(json.dumps([str(created_at), int(row['id'])]).encode()).decode()
+
+def decode_history_cursor(cursor):
+    """(created_at, id) from a cursor made by encode_history_cursor; raises ValueError if malformed"""
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), int(row_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError("Invalid cursor") from e
+
+RESPONSE_MODES = ('base64', 'urls')
+
+def result_encoder(params):
+    """
+    Encoder for attack result images from form or JSON parameters: outputFormat,
+    outputQuality, and responseMode 'base64' (images inline in the JSON) or
+    'urls' (images stored as artifacts and returned as /artifacts/<hash> URLs)
+    """
+    image_format = params.get('outputFormat', 'png')
+    quality = params.get('outputQuality')
+    response_mode = str(params.get('responseMode', 'base64')).lower()
+    if response_mode not in RESPONSE_MODES:
+        raise ValueError(f"Unsupported response mode: {response_mode}")
+    if response_mode == 'urls':
+        return ArtifactEncoder(artifact_store, image_format, quality)
+    return ImageEncoder(image_format, quality)
+
+def token_user_id():
+    """user_id from a valid Bearer token on the current request, or None"""
+    auth_header = request.headers.get('Authorization')
+    if not auth_header or not auth_header.startswith('Bearer '):
+        return None
+    token_result = verify_token(auth_header.split(' ')[1])
+    return token_result['user']['user_id'] if token_result['success'] else None
+
+def run_auto_tune_job(params, image_bytes, progress):
+    """Runs one queued auto-tune job; params are the form fields it was submitted with"""
+    fgsm = model_registry.get(params['model'])
+    results = fgsm.auto_tune_attack(image_bytes, encoder=result_encoder(params), progress=progress,
+                                    **auto_tune_options(params))
+    if results:
+        results["model_used"] = params['model']
+    return results
+
+job_manager = JobManager(run_auto_tune_job)
+
 # Initialize database connection (without creating tables)
 def init_db():
     connection = get_connection()
@@ -52,6 +168,9 @@ def register():
     
     if result['success']:
         return jsonify(result), 201
+    elif result.get('busy'):
+        # Too many password hashes in progress; the client can retry
+        return jsonify(result), 503
     else:
         return jsonify(result), 400
 
@@ -71,6 +190,9 @@ def login():
     if result['success']:
         print(f"Login successful for user: {email}")
         return jsonify(result), 200
+    elif result.get('busy'):
+        print(f"Login deferred for user: {email}, password checks are saturated")
+        return jsonify(result), 503
     else:
         print(f"Login failed for user: {email}, reason: {result.get('message', 'Unknown')}")
         return jsonify(result), 401
@@ -90,29 +212,39 @@ def verify():
     else:
         return jsonify(result), 401
 
+def load_gallery():
+    """Serialized /available-images body, read from the gallery table"""
+    images = execute_query(
+        "SELECT image_filename, image_label, image_url FROM railway.image",
+        fetch=True
+    )
+    if images is None:
+        raise RuntimeError("Gallery query failed")
+
+    # Format the response
+    image_list = []
+    for image in images:
+        image_list.append({
+            'filename': image['image_filename'],
+            'label': image['image_label'],
+            'url': image['image_url']
+        })
+    return json.dumps({'success': True, 'images': image_list}).encode()
+
 @app.route('/available-images', methods=['GET'])
 def get_available_images():
     try:
-        # Fetch all images from the database
-        images = execute_query(
-            "SELECT image_filename, image_label, image_url FROM railway.image",
-            fetch=True
-        )
-        
-        # Format the response
-        image_list = []
-        for image in images:
-            image_list.append({
-                'filename': image['image_filename'],
-                'label': image['image_label'],
-                'url': image['image_url']
-            })
-        
-        return jsonify({'success': True, 'images': image_list}), 200
+        body, etag = gallery_cache.get(load_gallery)
     except Exception as e:
         print(f"Error fetching images: {str(e)}")
         return jsonify({'success': False, 'message': f'Error fetching images: {str(e)}'}), 500
 
+    # Clients revalidate every time and get a 304 while the gallery is unchanged
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
 @app.route('/attack', methods=['POST'])
 def attack():
     if 'image' not in request.files or 'model' not in request.form:
@@ -121,48 +253,41 @@ def attack():
     model_name = request.form['model']  # e.g. "mobilenet_v2"
     epsilon_value = float(request.form.get('epsilon', 0.05))
     auto_tune = request.form.get('autoTune', 'false').lower() == 'true'
+    attack_method = request.form.get('attackMethod', 'fgsm').lower()
 
-    # Initialize FGSM
-    fgsm = FGSM(epsilon=epsilon_value, model_name=model_name)
+    # Reuse the already loaded engine for this model
+    try:
+        search_options = auto_tune_options(request.form)
+        options = iterative_options(request.form) if attack_method != 'fgsm' else {}
+        fgsm = model_registry.get(model_name)
+        encoder = result_encoder(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     try:
-        # Save uploaded image to temp file with a unique name
         image_file = request.files['image']
-        import uuid
-        import datetime
-        
+
         # File type validation (allow only image extensions)
-        allowed_extensions = {'jpg', 'jpeg', 'png', 'bmp', 'gif'}
         filename = secure_filename(image_file.filename)
-        if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in allowed_extensions:
+        if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
             return jsonify({'error': 'Invalid file type. Only image files (jpg, jpeg, png, bmp, gif) are allowed.'}), 400
 
-        # Create unique filename to avoid conflicts
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"temp_image_{timestamp}_{unique_id}.jpg"
-        
-        image_path = safe_filename
-        print(f"Saving uploaded image to {image_path}")
-        image_file.save(image_path)
+        # The upload is attacked straight from memory, without a temp file
+        image_bytes = image_file.read()
 
         # Attack
-        print(f"Running {'auto-tune' if auto_tune else 'regular'} attack with model {model_name}")
+        print(f"Running {'auto-tune' if auto_tune else attack_method} attack with model {model_name}")
         if auto_tune:
-            results = fgsm.auto_tune_attack(image_path)
+            results = fgsm.auto_tune_attack(image_bytes, encoder=encoder, **search_options)
             print(f"Auto-tune attack completed, results: {'Success' if results else 'Failed'}")
+        elif attack_method != 'fgsm':
+            results = fgsm.iterative_attack(image_bytes, method=attack_method, epsilon=epsilon_value,
+                                            encoder=encoder, **options)
+            print(f"Iterative attack completed, results: {'Success' if results else 'Failed'}")
         else:
-            fgsm.epsilon = epsilon_value
-            results = fgsm.attack(image_path)
+            results = fgsm.attack(image_bytes, epsilon=epsilon_value, encoder=encoder)
             print(f"Regular attack completed, results: {'Success' if results else 'Failed'}")
 
-        # Clean up temp file 
-        try:
-            os.remove(image_path)
-            print(f"Cleaned up temporary file {image_path}")
-        except Exception as e:
-            print(f"Warning: Failed to remove temp file {image_path}: {e}")
-
         if results:
             # Optionally attach the model name used, so it can be displayed
             results["model_used"] = model_name
@@ -188,64 +313,47 @@ def attack_from_url():
     model_name = data['model']
     epsilon_value = float(data.get('epsilon', 0.05))
     auto_tune = data.get('autoTune', False)
+    attack_method = str(data.get('attackMethod', 'fgsm')).lower()
     image_url = data['imageUrl']
     
-    # Initialize FGSM
-    fgsm = FGSM(epsilon=epsilon_value, model_name=model_name)
+    # Reuse the already loaded engine for this model
+    try:
+        search_options = auto_tune_options(data)
+        options = iterative_options(data) if attack_method != 'fgsm' else {}
+        fgsm = model_registry.get(model_name)
+        encoder = result_encoder(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     try:
         # Download image from URL
         import requests
-        from io import BytesIO
-        import uuid
-        import datetime
         
         print(f"Downloading image from URL: {image_url}")
         response = requests.get(image_url)
+        image_bytes = response.content
         
-        # Create unique filename to avoid conflicts
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_filename = f"temp_image_{timestamp}_{unique_id}.jpg"
-        
-        # Opening and saving as JPEG for compatibility
+        # Check that the download is an image; this only reads the header
         try:
-            image = Image.open(BytesIO(response.content))
-            # Handle RGBA images by creating a white background
-            if image.mode == 'RGBA':
-                print(f"Converting RGBA image to RGB with white background")
-                # Create a white background image
-                background = Image.new('RGB', image.size, (255, 255, 255))
-                # Paste the image on the background using alpha channel as mask
-                background.paste(image, mask=image.split()[3])
-                image = background
-            elif image.mode != 'RGB':
-                print(f"Converting image from {image.mode} to RGB")
-                image = image.convert('RGB')
-            image_path = safe_filename
-            print(f"Saving image to {image_path}")
-            image.save(image_path, format='JPEG', quality=95)
+            image = Image.open(BytesIO(image_bytes))
+            print(f"Downloaded {image.format} image, mode {image.mode}")
         except Exception as image_error:
             print(f"Error processing downloaded image: {str(image_error)}")
             return jsonify({'error': f'Error processing image: {str(image_error)}'}), 500
         
-        # Attack
-        print(f"Running {'auto-tune' if auto_tune else 'regular'} attack with model {model_name}")
+        # Attack the downloaded bytes directly; RGBA images are flattened onto white
+        print(f"Running {'auto-tune' if auto_tune else attack_method} attack with model {model_name}")
         if auto_tune:
-            results = fgsm.auto_tune_attack(image_path)
+            results = fgsm.auto_tune_attack(image_bytes, flatten_alpha=True, encoder=encoder, **search_options)
             print(f"Auto-tune attack completed, results: {'Success' if results else 'Failed'}")
+        elif attack_method != 'fgsm':
+            results = fgsm.iterative_attack(image_bytes, method=attack_method, epsilon=epsilon_value,
+                                            flatten_alpha=True, encoder=encoder, **options)
+            print(f"Iterative attack completed, results: {'Success' if results else 'Failed'}")
         else:
-            fgsm.epsilon = epsilon_value
-            results = fgsm.attack(image_path)
+            results = fgsm.attack(image_bytes, epsilon=epsilon_value, flatten_alpha=True, encoder=encoder)
             print(f"Regular attack completed, results: {'Success' if results else 'Failed'}")
 
-        # Clean up temp file 
-        try:
-            os.remove(image_path)
-            print(f"Cleaned up temporary file {image_path}")
-        except Exception as e:
-            print(f"Warning: Failed to remove temp file {image_path}: {e}")
-
         if results:
             # Attach the model name used
             results["model_used"] = model_name
@@ -259,27 +367,16 @@ def attack_from_url():
                 if token_result['success']:
                     user_id = token_result['user']['user_id']
                     
-                    # Save attack to history
-                    try:
-                        execute_query(
-                            """
-                            INSERT INTO attack_history 
-                            (user_id, model_used, epsilon_used, orig_class, orig_conf, adv_class, adv_conf)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            """,
-                            (
-                                user_id, 
-                                model_name, 
-                                results['epsilon_used'],
-                                results['orig_class'],
-                                results['orig_conf'],
-                                results['adv_class'],
-                                results['adv_conf']
-                            )
-                        )
-                    except Exception as e:
-                        print(f"Error saving to history: {str(e)}")
-                        # Continue even if history saving fails
+                    # Queue the history row; it is written in the background
+                    history_writer.record((
+                        user_id,
+                        model_name,
+                        results['epsilon_used'],
+                        results['orig_class'],
+                        results['orig_conf'],
+                        results['adv_class'],
+                        results['adv_conf']
+                    ))
             
             return jsonify(results)
         else:
@@ -294,6 +391,119 @@ def attack_from_url():
         print(f"Detailed traceback: {error_details}")
         return jsonify({'error': f'Error processing attack: {str(e)}'}), 500
 
+@app.route('/attack-jobs', methods=['POST'])
+def create_attack_job():
+    """Queue an auto-tune attack and return its job id without waiting for it"""
+    if 'image' not in request.files or 'model' not in request.form:
+        return jsonify({'error': 'No image or model provided'}), 400
+
+    image_file = request.files['image']
+    filename = secure_filename(image_file.filename)
+    if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
+        return jsonify({'error': 'Invalid file type. Only image files (jpg, jpeg, png, bmp, gif) are allowed.'}), 400
+
+    params = request.form.to_dict()
+    try:
+        # Reject bad options now rather than in the background
+        model_registry.get(params['model'])
+        result_encoder(params)
+        auto_tune_options(params)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        job_id = job_manager.submit('auto_tune', params, image_file.read(), user_id=token_user_id())
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503
+
+    print(f"Queued auto-tune job {job_id} with model {params['model']}")
+    return jsonify({'job_id': job_id, 'status': 'queued', 'status_url': f'/attack-jobs/{job_id}'}), 202
+
+@app.route('/attack-jobs/<job_id>', methods=['GET'])
+def get_attack_job(job_id):
+    """Status and progress of a queued attack, with the result once it has finished"""
+    # Jobs submitted with a token are only visible to the same user
+    job = job_manager.get(job_id, user_id=token_user_id())
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job), 200
+
+@app.route('/attack-batch', methods=['POST'])
+def attack_batch():
+    if 'model' not in request.form or ('images' not in request.files and 'archive' not in request.files):
+        return jsonify({'error': 'No images or model provided'}), 400
+
+    model_name = request.form['model']
+    epsilon_value = float(request.form.get('epsilon', 0.05))
+    attack_method = request.form.get('attackMethod', 'fgsm').lower()
+
+    try:
+        options = iterative_options(request.form) if attack_method != 'fgsm' else {}
+        batch_size = int(request.form.get('batchSize', 16))
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batchSize must be between 1 and {MAX_BATCH_SIZE}")
+        fgsm = model_registry.get(model_name)
+        encoder = result_encoder(request.form)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Uploads are read now because the response body is generated after this handler returns
+    uploaded = []
+    for image_file in request.files.getlist('images'):
+        filename = secure_filename(image_file.filename)
+        if '.' not in filename or filename.rsplit('.', 1)[1].lower() not in ALLOWED_EXTENSIONS:
+            return jsonify({'error': f'Invalid file type for {filename}. Only image files (jpg, jpeg, png, bmp, gif) are allowed.'}), 400
+        uploaded.append((filename, image_file.read()))
+    if len(uploaded) > MAX_BATCH_IMAGES:
+        return jsonify({'error': f'Too many images. At most {MAX_BATCH_IMAGES} can be attacked per request.'}), 400
+
+    images = uploaded
+    if 'archive' in request.files:
+        try:
+            archive = zipfile.ZipFile(BytesIO(request.files['archive'].read()))
+        except zipfile.BadZipFile:
+            return jsonify({'error': 'Archive is not a valid zip file'}), 400
+        # Zip entries are decompressed lazily as the batches are processed
+        try:
+            archived = fgsm.images_from_zip(archive, max_images=MAX_BATCH_IMAGES - len(uploaded),
+                                            max_entry_bytes=MAX_ZIP_ENTRY_BYTES,
+                                            max_total_bytes=MAX_ZIP_TOTAL_BYTES)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        images = chain(uploaded, archived)
+
+    print(f"Running batch attack with model {model_name}")
+
+    def generate():
+        # One JSON object per line, sent as soon as each image's batch is done
+        try:
+            for result in fgsm.attack_batch(images, epsilon=epsilon_value, batch_size=batch_size,
+                                            method=attack_method, encoder=encoder, **options):
+                result["model_used"] = model_name
+                yield json.dumps(result) + '\n'
+        except Exception as e:
+            print(f"Error in attack_batch: {str(e)}")
+            yield json.dumps({'error': f'Batch attack error: {str(e)}'}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.route('/artifacts/<digest>', methods=['GET'])
+def get_artifact(digest):
+    """Serve a stored result image; its URL is its content hash, so it never changes"""
+    etag = f'"{digest}"'
+    # Only a stored artifact can be unchanged; If-None-Match: * or a stale hash must not hide a 404
+    artifact = artifact_store.get(digest)
+    if artifact is None:
+        return jsonify({'error': 'Artifact not found'}), 404
+    if digest in request.if_none_match:
+        response = Response(status=304)
+    else:
+        data, mimetype = artifact
+        response = Response(data, mimetype=mimetype)
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
 @app.route('/history', methods=['GET'])
 def get_history():
     # Get user ID from token
@@ -309,17 +519,30 @@ def get_history():
     
     user_id = token_result['user']['user_id']
     
+    try:
+        limit = int(request.args.get('limit', HISTORY_PAGE_SIZE))
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        limit = min(limit, HISTORY_MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        after = decode_history_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
     # Try to get attack history, but don't fail if table doesn't exist
     try:
-        history = execute_query(
-            "SELECT * FROM attack_history WHERE user_id = %s ORDER BY created_at DESC",
-            (user_id,),
-            fetch=True
-        )
-        return jsonify({'success': True, 'history': history}), 200
+        # One extra row tells whether there is another page
+        if after is None:
+            history = execute_query(HISTORY_FIRST_PAGE, (user_id, limit + 1), fetch=True)
+        else:
+            created_at, row_id = after
+            history = execute_query(HISTORY_NEXT_PAGE, (user_id, created_at, created_at, row_id, limit + 1), fetch=True)
+        history = history or []
+        next_cursor = encode_history_cursor(history[limit - 1]) if len(history) > limit else None
+        return jsonify({'success': True, 'history': history[:limit], 'next_cursor': next_cursor}), 200
     except Exception as e:
         print(f"Error fetching history: {e}")
-        return jsonify({'success': True, 'history': [], 'message': 'History feature unavailable'}), 200
+        return jsonify({'success': True, 'history': [], 'next_cursor': None, 'message': 'History feature unavailable'}), 200
 
 @app.route('/model-info', methods=['GET'])
 def get_model_info():
@@ -353,8 +576,29 @@ def get_model_info():
         print(f"Error fetching model information: {str(e)}")
         return jsonify({'error': f'Failed to retrieve model information: {str(e)}'}), 500
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """Runtime counters for the loaded models and caches"""
+    return jsonify({
+        'models': model_registry.stats(),
+        'image_cache': image_cache.stats(),
+        'gallery_cache': gallery_cache.stats(),
+        'gradient_cache': gradient_cache.stats(),
+        'image_encoding': encode_timings.stats(),
+        'artifacts': artifact_store.stats(),
+        'jobs': job_manager.stats(),
+        'runtime': thread_config.stats(),
+        'database': db_pool.stats(),
+        'history': history_writer.stats(),
+        'passwords': password_hasher.stats(),
+    }), 200
+
 if __name__ == '__main__':
     print("Initializing database...")
     init_db()
+    print("Warming up models...")
+    model_registry.warm_up()
+    print("Recovering unfinished attack jobs...")
+    job_manager.recover()
     print("Starting Flask server...")
     app.run(debug=False, host="0.0.0.0")
\ No newline at end of file
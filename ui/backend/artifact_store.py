@@ -0,0 +1,166 @@
+import os
+import re
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+from image_encoding import ImageEncoder, OUTPUT_FORMATS
+
+# Load environment variables
+load_dotenv()
+
+DIGEST_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+class ArtifactTooLarge(ValueError):
+    pass
+
+class ArtifactStore:
+    """
+    Content-addressed store for encoded result images.
+
+    Each artifact is stored under the SHA-256 of its bytes, so its URL never
+    changes meaning and can be cached by browsers forever. Artifacts are kept
+    in memory, or as files in directory when one is given, and the least
+    recently used ones are dropped to keep the total under max_bytes.
+
+    In-memory artifacts are only visible to the process that stored them. When
+    several server processes share one directory, each serves the files the
+    others wrote as well.
+    """
+
+    def __init__(self, max_bytes=None, directory=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('ARTIFACT_STORE_MB', '256')) * 1024 * 1024)
+        if directory is None:
+            directory = os.getenv('ARTIFACT_DIR') or None
+        self.max_bytes = max_bytes
+        self.directory = directory
+        # digest -> (mimetype, size, data); data is None for artifacts kept on disk
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._load_directory()
+
+    def _path(self, digest, mimetype):
+        return os.path.join(self.directory, f"{digest}.{mimetype.split('/')[-1]}")
+
+    def _load_directory(self):
+        # Artifacts written by an earlier run stay servable, oldest first in LRU order
+        files = []
+        for filename in os.listdir(self.directory):
+            digest, _, extension = filename.partition('.')
+            if DIGEST_PATTERN.match(digest) and extension:
+                path = os.path.join(self.directory, filename)
+                files.append((os.path.getmtime(path), digest, f"image/{extension}", os.path.getsize(path)))
+        for _, digest, mimetype, size in sorted(files):
+            self._entries[digest] = (mimetype, size, None)
+            self.current_bytes += size
+        self._evict()
+
+    def put(self, data, mimetype):
+        """Store data and return its content hash; raises ArtifactTooLarge if it can never fit."""
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if digest in self._entries:
+                self._entries.move_to_end(digest)
+                return digest
+            if len(data) > self.max_bytes:
+                raise ArtifactTooLarge(f"Artifact of {len(data)} bytes exceeds the {self.max_bytes} byte store")
+            if self.directory:
+                path = self._path(digest, mimetype)
+                temp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                self._entries[digest] = (mimetype, len(data), None)
+            else:
+                self._entries[digest] = (mimetype, len(data), data)
+            self.current_bytes += len(data)
+            self._evict()
+        return digest
+
+    def get(self, digest):
+        """Return (data, mimetype) for a stored artifact, or None."""
+        if not DIGEST_PATTERN.match(digest):
+            return None
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None and self.directory:
+                entry = self._adopt(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+        mimetype, _, data = entry
+        if data is None:
+            try:
+                with open(self._path(digest, mimetype), 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+        return data, mimetype
+
+    def _adopt(self, digest):
+        # A file another process sharing the directory wrote after this store started
+        for image_format in OUTPUT_FORMATS:
+            mimetype = f"image/{image_format}"
+            path = self._path(digest, mimetype)
+            if os.path.exists(path):
+                entry = (mimetype, os.path.getsize(path), None)
+                self._entries[digest] = entry
+                self.current_bytes += entry[1]
+                return entry
+        return None
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._entries:
+            digest, (mimetype, size, data) = self._entries.popitem(last=False)
+            self.current_bytes -= size
+            self.evictions += 1
+            if data is None:
+                try:
+                    os.remove(self._path(digest, mimetype))
+                except OSError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "artifacts": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "directory": self.directory,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class ArtifactEncoder(ImageEncoder):
+    """
+    ImageEncoder that stores each encoded image in an ArtifactStore and puts
+    its /artifacts/<hash> URL in the result instead of Base64 data.
+    """
+
+    def __init__(self, store, image_format='png', quality=None, url_prefix='/artifacts/'):
+        super().__init__(image_format, quality)
+        self.store = store
+        self.url_prefix = url_prefix
+
+    def render(self, img_array):
+        data = self.encode(img_array)
+        try:
+            return self.url_prefix + self.store.put(data, self.mimetype)
+        except ArtifactTooLarge:
+            # A URL for an image the store cannot hold would never resolve; send it inline
+            return f"data:{self.mimetype};base64," + base64.b64encode(data).decode('utf-8')
+
+
+# Shared by all requests in this process
+artifact_store = ArtifactStore()
@@ -1,13 +1,14 @@
-from flask_bcrypt import Bcrypt
 import jwt  # Using PyJWT instead of jwt package
 import datetime
 import os
 from dotenv import load_dotenv
 from db import execute_query
+from password_hashing import password_hasher, PasswordHasherBusy
 
 # Load environment variables
 load_dotenv()
-bcrypt = Bcrypt()
+# Flask-Bcrypt compatible, but hashing runs in a bounded process pool
+bcrypt = password_hasher
 JWT_SECRET = os.getenv('JWT_SECRET')
 
 def register_user(email, password, user_fname, user_lname):
@@ -26,6 +27,8 @@ def register_user(email, password, user_fname, user_lname):
     try:
         hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
         print(f"Generated bcrypt hash: {hashed_password[:20]}...")
+    except PasswordHasherBusy:
+        return {"success": False, "busy": True, "message": "Server busy, please try again"}
     except Exception as e:
         print(f"Error hashing password with bcrypt: {str(e)}")
         print("Falling back to plaintext password (not recommended for production)")
@@ -76,89 +79,79 @@ def login_user(email, password):
         # Try direct comparison first (in case passwords are stored as plaintext)
         if user['user_password'] == password:
             print("Login successful with plaintext password match")
-            
+            password_matches = True
+        else:
+            # Then try bcrypt check
             try:
-                # Generate JWT token
-                payload = {
-                    'user_id': user['user_id'],
-                    'email': user['user_email'],
-                    'first_name': user['user_fname'],
-                    'last_name': user['user_lname'],
-                    'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)
-                }
-                token = jwt.encode(payload, JWT_SECRET, algorithm='HS256')
-                
-                # For PyJWT < 2.0.0, token is bytes and needs to be decoded to string
-                if isinstance(token, bytes):
-                    token = token.decode('utf-8')
-                
-                # For debugging
-                print(f"Generated token type: {type(token).__name__}")
-                print(f"JWT encode successful")
-                
-                return {
-                    "success": True,
-                    "message": "Login successful",
-                    "token": token,
-                    "user": {
-                        "id": user['user_id'],
-                        "email": user['user_email'],
-                        "first_name": user['user_fname'],
-                        "last_name": user['user_lname']
-                    }
-                }
-            except Exception as jwt_error:
-                print(f"Error generating JWT token: {str(jwt_error)}")
-                return {"success": False, "message": "Login error, please try again"}
-        
-        # Then try bcrypt check
+                password_matches = bcrypt.check_password_hash(user['user_password'], password)
+                print(f"Bcrypt password check result: {password_matches}")
+            except PasswordHasherBusy:
+                return {"success": False, "busy": True, "message": "Server busy, please try again"}
+            except Exception as bcrypt_error:
+                print(f"Error in bcrypt check: {str(bcrypt_error)}")
+                password_matches = False
+
+        if not password_matches:
+            # If we get here, both password checks failed
+            return {"success": False, "message": "Invalid email or password"}
+
+        rehash_password(user, password)
+
         try:
-            password_matches = bcrypt.check_password_hash(user['user_password'], password)
-            print(f"Bcrypt password check result: {password_matches}")
-            
-            if password_matches:
-                try:
-                    # Generate JWT token
-                    payload = {
-                        'user_id': user['user_id'],
-                        'email': user['user_email'],
-                        'first_name': user['user_fname'],
-                        'last_name': user['user_lname'],
-                        'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)
-                    }
-                    token = jwt.encode(payload, JWT_SECRET, algorithm='HS256')
-                    
-                    # For PyJWT < 2.0.0, token is bytes and needs to be decoded to string
-                    if isinstance(token, bytes):
-                        token = token.decode('utf-8')
-                    
-                    # For debugging
-                    print(f"Generated token type: {type(token).__name__}")
-                    print(f"JWT encode successful")
-                    
-                    return {
-                        "success": True,
-                        "message": "Login successful",
-                        "token": token,
-                        "user": {
-                            "id": user['user_id'],
-                            "email": user['user_email'],
-                            "first_name": user['user_fname'],
-                            "last_name": user['user_lname']
-                        }
-                    }
-                except Exception as jwt_error:
-                    print(f"Error generating JWT token: {str(jwt_error)}")
-                    return {"success": False, "message": "Login error, please try again"}
-        except Exception as bcrypt_error:
-            print(f"Error in bcrypt check: {str(bcrypt_error)}")
-            
-        # If we get here, both password checks failed
-        return {"success": False, "message": "Invalid email or password"}
+            # Generate JWT token
+            payload = {
+                'user_id': user['user_id'],
+                'email': user['user_email'],
+                'first_name': user['user_fname'],
+                'last_name': user['user_lname'],
+                'exp': datetime.datetime.utcnow() + datetime.timedelta(days=1)
+            }
+            token = jwt.encode(payload, JWT_SECRET, algorithm='HS256')
+
+            # For PyJWT < 2.0.0, token is bytes and needs to be decoded to string
+            if isinstance(token, bytes):
+                token = token.decode('utf-8')
+
+            # For debugging
+            print(f"Generated token type: {type(token).__name__}")
+            print(f"JWT encode successful")
+
+            return {
+                "success": True,
+                "message": "Login successful",
+                "token": token,
+                "user": {
+                    "id": user['user_id'],
+                    "email": user['user_email'],
+                    "first_name": user['user_fname'],
+                    "last_name": user['user_lname']
+                }
+            }
+        except Exception as jwt_error:
+            print(f"Error generating JWT token: {str(jwt_error)}")
+            return {"success": False, "message": "Login error, please try again"}
     except Exception as e:
         print(f"Error checking password: {str(e)}")
         return {"success": False, "message": "Login error, please try again"}
 
+def rehash_password(user, password):
+    """
+    After a successful login, re-store the password as a bcrypt hash at the
+    configured cost if it is plaintext or was hashed at another cost. A
+    failure here is logged and does not affect the login.
+    """
+    if not bcrypt.needs_rehash(user['user_password']):
+        return
+    try:
+        hashed_password = bcrypt.generate_password_hash(password).decode('utf-8')
+        execute_query(
+            "UPDATE user SET user_password = %s WHERE user_id = %s",
+            (hashed_password, user['user_id'])
+        )
+        print(f"Upgraded password hash for user {user['user_id']}")
+    except Exception as e:
+        print(f"Error upgrading password hash: {str(e)}")
+
 def verify_token(token):
     """Verify a JWT token and return the user information"""
     try:
@@ -0,0 +1,127 @@
+import threading
+import time
+import queue
+from concurrent.futures import Future
+import numpy as np
+
+class BatchSchedulerClosed(RuntimeError):
+    pass
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching for one FGSM engine.
+
+    Concurrent attack requests are queued and a single worker thread drains
+    the queue into batches of up to max_batch_size images, waiting at most
+    max_wait_ms after the first request for others to arrive. Each batch is
+    attacked with one forward and one gradient pass and the per-image results
+    are handed back through futures.
+    """
+
+    def __init__(self, engine, max_batch_size=8, max_wait_ms=5):
+        self.engine = engine
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        # Orders submit() against close(), so nothing is queued behind the stop sentinel
+        self._submit_lock = threading.Lock()
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="batch-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(self, image, epsilon):
+        """
+        Queue a preprocessed (1, H, W, 3) image. The returned future resolves to
+        (image_probs, perturbation, adversarial_image, adv_probs), each with a
+        batch dimension of one.
+        """
+        future = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise BatchSchedulerClosed("Batch scheduler is closed")
+            self._queue.put((image, epsilon, future))
+        return future
+
+    def close(self):
+        """Stop the worker once the requests already queued have been served."""
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "requests": self.requests,
+                "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "queued": self._queue.qsize(),
+            }
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._fail_queued()
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._process(batch)
+            if stop:
+                self._fail_queued()
+                return
+
+    def _fail_queued(self):
+        # Anything still queued after the sentinel will never be served
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is not None:
+                item[2].set_exception(BatchSchedulerClosed("Batch scheduler is closed"))
+
+    def _process(self, batch):
+        images = np.concatenate([np.asarray(image) for image, _, _ in batch], axis=0)
+        epsilons = [epsilon for _, epsilon, _ in batch]
+        try:
+            image_probs, perturbations, adversarial_images, adv_probs = self.engine.attack_tensors(images, epsilons)
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        with self._stats_lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+
+        # Fan the rows back out to the waiting requests
+        for i, (_, _, future) in enumerate(batch):
+            future.set_result((
+                image_probs[i:i + 1],
+                perturbations[i:i + 1],
+                adversarial_images[i:i + 1],
+                adv_probs[i:i + 1],
+            ))
@@ -0,0 +1,71 @@
+"""
+Measure how long a fresh backend process takes to import and answer its
+first request, with TensorFlow imported lazily (as the app does now) and
+eagerly (importing fgsm up front, as the app used to).
+
+Every run is a new interpreter. For each mode the report gives the median
+import time, the time until the first /model-info response, peak RSS and
+whether TensorFlow ended up loaded. With --attack-model it also times the
+first model load in the lazy process, which is where TensorFlow is paid for.
+
+Usage (from ui/backend):
+    python benchmarks/cold_start.py --runs 5
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+if {eager}:
+    import fgsm
+import app
+imported = time.perf_counter()
+response = app.app.test_client().get('/model-info')
+first_response = time.perf_counter()
+result = {{
+    'import_s': imported - start,
+    'first_response_s': first_response - start,
+    'status': response.status_code,
+    'tensorflow_loaded': 'tensorflow' in sys.modules,
+}}
+if {attack_model!r}:
+    app.model_registry.get({attack_model!r})
+    result['first_model_s'] = time.perf_counter() - start
+result['peak_rss_mb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps(result))
+"""
+
+def run_child(eager, attack_model):
+    env = dict(os.environ, JWT_SECRET=os.getenv('JWT_SECRET', 'benchmark'))
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD.format(eager=eager, attack_model=attack_model)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--attack-model', default=None, help='also time loading this model in the lazy process')
+    args = parser.parse_args()
+
+    print(f"{'mode':6s} {'import s':>9} {'first response s':>17} {'peak RSS MB':>12} {'tensorflow':>11}")
+    for mode, eager in (('lazy', False), ('eager', True)):
+        runs = [run_child(eager, args.attack_model if not eager else None) for _ in range(args.runs)]
+        print(f"{mode:6s} {statistics.median(r['import_s'] for r in runs):9.2f} "
+              f"{statistics.median(r['first_response_s'] for r in runs):17.2f} "
+              f"{statistics.median(r['peak_rss_mb'] for r in runs):12.0f} "
+              f"{str(runs[0]['tensorflow_loaded']):>11}")
+        if 'first_model_s' in runs[0]:
+            print(f"       first {args.attack_model} load ready after "
+                  f"{statistics.median(r['first_model_s'] for r in runs):.2f} s")
+
+if __name__ == '__main__':
+    main()
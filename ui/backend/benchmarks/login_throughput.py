@@ -0,0 +1,110 @@
+"""
+Login throughput with bcrypt on the request threads (as login used to run)
+against bcrypt in the bounded process pool (password_hashing.py).
+
+--concurrency client threads call auth.login_user for --seconds each mode.
+The user lookup is answered from memory, so the numbers measure password
+checking and the login code around it, not MySQL. While they run, a probe
+thread times a small pure-Python task every 10 ms to show how responsive the
+rest of the worker stays. The report gives logins/s, p50/p95 login latency,
+logins rejected as busy and the probe's p95.
+
+Usage (from ui/backend):
+    python benchmarks/login_throughput.py --concurrency 16 --rounds 12 --pool-workers 2
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import contextlib
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('JWT_SECRET', 'login-throughput-benchmark-secret')
+
+import auth
+from password_hashing import PasswordHasher
+
+PASSWORD = 'correct horse battery staple'
+
+def probe(stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(2000))
+        samples.append(time.perf_counter() - start)
+        time.sleep(0.01)
+
+def run_mode(hasher, concurrency, seconds):
+    auth.bcrypt = hasher
+    latencies, outcomes = [], {'ok': 0, 'busy': 0, 'failed': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+    deadline = time.perf_counter() + seconds
+
+    def client():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            result = auth.login_user('bench@example.com', PASSWORD)
+            elapsed = time.perf_counter() - start
+            outcome = 'ok' if result['success'] else 'busy' if result.get('busy') else 'failed'
+            with lock:
+                outcomes[outcome] += 1
+                if outcome == 'ok':
+                    latencies.append(elapsed)
+
+    probe_samples = []
+    prober = threading.Thread(target=probe, args=(stop, probe_samples))
+    prober.start()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    start = time.perf_counter()
+    # login_user logs every attempt; keep that out of the report
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for thread in clients:
+            thread.start()
+        for thread in clients:
+            thread.join()
+    wall = time.perf_counter() - start
+    stop.set()
+    prober.join()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'logins_per_s': outcomes['ok'] / wall,
+        'p50_ms': float(np.percentile(latencies_ms, 50)) if len(latencies_ms) else 0.0,
+        'p95_ms': float(np.percentile(latencies_ms, 95)) if len(latencies_ms) else 0.0,
+        'busy': outcomes['busy'],
+        'failed': outcomes['failed'],
+        'probe_p95_ms': float(np.percentile(np.array(probe_samples) * 1000, 95)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost factor')
+    parser.add_argument('--pool-workers', type=int, default=2)
+    parser.add_argument('--max-pending', type=int, default=None)
+    args = parser.parse_args()
+
+    # Inline runs bcrypt on the calling thread with no cap, as login used to
+    inline = PasswordHasher(rounds=args.rounds, workers=0, max_pending=args.concurrency)
+    pw_hash = inline.generate_password_hash(PASSWORD).decode('utf-8')
+    user = {'user_id': 1, 'user_email': 'bench@example.com', 'user_password': pw_hash,
+            'user_fname': 'Bench', 'user_lname': 'User'}
+    auth.execute_query = lambda *args, **kwargs: [user]
+
+    pool = PasswordHasher(rounds=args.rounds, workers=args.pool_workers, max_pending=args.max_pending)
+    pool.check_password_hash(pw_hash, PASSWORD)  # start the worker processes
+    modes = (('inline', inline), (f'pool x{args.pool_workers}', pool))
+
+    print(f"{args.concurrency} clients, bcrypt cost {args.rounds}, {os.cpu_count()} CPUs, {args.seconds:.0f} s per mode")
+    print(f"{'mode':10s} {'logins/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'busy':>6} {'probe p95 ms':>13}")
+    for name, hasher in modes:
+        result = run_mode(hasher, args.concurrency, args.seconds)
+        print(f"{name:10s} {result['logins_per_s']:9.1f} {result['p50_ms']:8.0f} {result['p95_ms']:8.0f} "
+              f"{result['busy']:6d} {result['probe_p95_ms']:13.2f}")
+    pool.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Find the TensorFlow intra-op / inter-op thread split that serves FGSM attacks
+best on this host.
+
+TensorFlow fixes its pool sizes when it starts, so every candidate split runs
+in a fresh process. Each one loads the model, then --concurrency threads fire
+--requests single-image attacks each, the way concurrent requests would reach
+one server worker. The report lists the p50/p95 attack latency and the
+throughput of every split next to the one runtime_config would pick.
+
+Usage (from ui/backend):
+    python benchmarks/tf_threading.py --model mobilenet_v2 --workers 2 --concurrency 4
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import multiprocessing
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from runtime_config import THREAD_PROFILES, available_cpus, plan_threads
+
+def run_candidate(model_name, intra_op, inter_op, cpus, workers, concurrency, requests, results):
+    from runtime_config import thread_config
+    thread_config.intra_op, thread_config.inter_op = intra_op, inter_op
+    thread_config.apply(cpus=cpus, workers=workers, threads=concurrency)
+    from fgsm import FGSM
+
+    engine = FGSM(model_name=model_name)
+    engine.warm_up()
+    image = np.random.RandomState(0).uniform(-1, 1, (1, *engine.image_size, 3)).astype(np.float32)
+    engine.attack_tensors(image, [0.01])
+    latencies = []
+    lock = threading.Lock()
+
+    def client():
+        for _ in range(requests):
+            start_time = time.perf_counter()
+            engine.attack_tensors(image, [0.01])
+            with lock:
+                latencies.append(time.perf_counter() - start_time)
+
+    start_time = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start_time
+    results.put({
+        "p50_ms": 1000 * float(np.percentile(latencies, 50)),
+        "p95_ms": 1000 * float(np.percentile(latencies, 95)),
+        "attacks_per_second": len(latencies) / elapsed,
+    })
+
+def candidate_splits(cpus, workers, concurrency):
+    share = max(1, cpus // workers)
+    splits = {(plan["intra_op"], plan["inter_op"])
+              for plan in (plan_threads(cpus, workers, concurrency, profile) for profile in THREAD_PROFILES)}
+    intra = 1
+    while intra <= share:
+        for inter in {1, 2, min(concurrency, share)}:
+            splits.add((intra, inter))
+        intra *= 2
+    splits.add((share, 1))
+    return sorted(splits)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', default='mobilenet_v2')
+    parser.add_argument('--cpus', type=int, default=None, help='cores to plan for (default: detected limit)')
+    parser.add_argument('--workers', type=int, default=1, help='server worker processes sharing the cores')
+    parser.add_argument('--concurrency', type=int, default=4, help='concurrent requests per worker')
+    parser.add_argument('--requests', type=int, default=10, help='attacks per concurrent request thread')
+    args = parser.parse_args()
+
+    cpus = args.cpus or available_cpus()
+    print(f"{cpus} CPUs, {args.workers} workers, {args.concurrency} concurrent requests per worker")
+    recommended = {profile: plan_threads(cpus, args.workers, args.concurrency, profile) for profile in THREAD_PROFILES}
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    for intra_op, inter_op in candidate_splits(cpus, args.workers, args.concurrency):
+        results = context.Queue()
+        process = context.Process(target=run_candidate, args=(args.model, intra_op, inter_op, cpus, args.workers,
+                                                              args.concurrency, args.requests, results))
+        process.start()
+        result = results.get()
+        process.join()
+        profiles = [profile for profile, plan in recommended.items()
+                    if (plan["intra_op"], plan["inter_op"]) == (intra_op, inter_op)]
+        rows.append((intra_op, inter_op, result, profiles))
+
+    print(f"\n{'intra':>5} {'inter':>5} {'p50 ms':>9} {'p95 ms':>9} {'attacks/s':>10}")
+    for intra_op, inter_op, result, profiles in rows:
+        print(f"{intra_op:5d} {inter_op:5d} {result['p50_ms']:9.1f} {result['p95_ms']:9.1f} "
+              f"{result['attacks_per_second']:10.2f}  {', '.join(profiles)}")
+    best_latency = min(rows, key=lambda row: row[2]['p95_ms'])
+    best_throughput = max(rows, key=lambda row: row[2]['attacks_per_second'])
+    print(f"\nLowest p95 latency: TF_INTRA_OP_THREADS={best_latency[0]} TF_INTER_OP_THREADS={best_latency[1]}")
+    print(f"Highest throughput: TF_INTRA_OP_THREADS={best_throughput[0]} TF_INTER_OP_THREADS={best_throughput[1]}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Compare Keras and quantized TFLite scoring of auto-tune candidate epsilons.
+
+For each model and quantization this reports the per-candidate scoring time
+on both paths (one candidate per call, as the linear search does, and all
+candidates in one batch), how often the TFLite top-1 label disagrees with
+Keras, and the end-to-end auto-tune time and chosen epsilon with each backend.
+
+Usage (from ui/backend):
+    python benchmarks/tflite_scoring.py --models mobilenet_v2 --images ../../software_demo_img/*.png
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+import tensorflow as tf
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fgsm import FGSM, SUPPORTED_MODELS
+from tflite_backend import TFLiteScorer, TFLITE_QUANTIZATIONS
+from gradient_cache import gradient_cache
+
+DEFAULT_IMAGES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'software_demo_img', '*')
+
+def time_calls(fn, inputs, repeats):
+    fn(inputs[0])  # Warm up
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        outputs = [fn(x) for x in inputs]
+    return (time.perf_counter() - start_time) / repeats, outputs
+
+def candidates_for(engine, image, epsilons):
+    probs = engine.predict(image)
+    target = tf.one_hot([np.argmax(probs[0])], probs.shape[-1])
+    pattern = engine.create_adversarial_pattern(image, target)
+    eps = tf.reshape(tf.constant(epsilons, dtype=tf.float32), (-1, 1, 1, 1))
+    return tf.clip_by_value(image + eps * pattern, -1, 1).numpy()
+
+def benchmark_model(model_name, quantizations, image_paths, epsilons, repeats, calibrate=False):
+    engine = FGSM(model_name=model_name, scoring_backend='keras')
+    engine.warm_up()
+    images = [engine.preprocess(path) for path in image_paths]
+    candidates = [candidates_for(engine, image, epsilons) for image in images]
+    singles = [c[i:i + 1] for c in candidates for i in range(len(c))]
+
+    keras_single, keras_single_out = time_calls(engine.predict, singles, repeats)
+    keras_batch, keras_batch_out = time_calls(engine.predict, candidates, repeats)
+    keras_labels = np.concatenate([np.argmax(p, axis=-1) for p in keras_batch_out])
+    print(f"\n{model_name}: {len(images)} images x {len(epsilons)} candidate epsilons")
+    print(f"  keras           single {1000 * keras_single / len(singles):7.2f} ms/candidate   "
+          f"batched {1000 * keras_batch / len(singles):7.2f} ms/candidate")
+
+    keras_tune = []
+    for path in image_paths:
+        gradient_cache.clear()
+        start_time = time.perf_counter()
+        keras_tune.append((engine.auto_tune_attack(path, search_strategy='bisect', use_scorer=False),
+                           time.perf_counter() - start_time))
+
+    for quantization in quantizations:
+        calibration = [image[0].numpy() for image in images] if quantization == 'int8' and calibrate else None
+        engine.scorer = TFLiteScorer(engine.model, quantization, calibration_images=calibration)
+        engine.scoring_backend = f"tflite_{quantization}"
+        tflite_single, _ = time_calls(engine.scorer.predict, singles, repeats)
+        tflite_batch, tflite_batch_out = time_calls(engine.scorer.predict, candidates, repeats)
+        tflite_labels = np.concatenate([np.argmax(p, axis=-1) for p in tflite_batch_out])
+        disagreement = float(np.mean(tflite_labels != keras_labels))
+        print(f"  tflite {quantization:8s} single {1000 * tflite_single / len(singles):7.2f} ms/candidate   "
+              f"batched {1000 * tflite_batch / len(singles):7.2f} ms/candidate   "
+              f"speedup x{keras_single / tflite_single:.2f} / x{keras_batch / tflite_batch:.2f}   "
+              f"label disagreement {100 * disagreement:.1f}%   "
+              f"size {len(engine.scorer.model_content) / 1024 / 1024:.1f} MB")
+
+        for path, (keras_result, keras_seconds) in zip(image_paths, keras_tune):
+            gradient_cache.clear()
+            start_time = time.perf_counter()
+            result = engine.auto_tune_attack(path, search_strategy='bisect')
+            seconds = time.perf_counter() - start_time
+            print(f"    auto-tune {os.path.basename(path)}: keras ε={keras_result['epsilon_used']:.5f} "
+                  f"({keras_seconds:.2f}s)  tflite ε={result['epsilon_used']:.5f} ({seconds:.2f}s, "
+                  f"confirmed={result.get('scorer_confirmed')})")
+    engine.scorer = None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--models', nargs='+', default=['mobilenet_v2'], choices=SUPPORTED_MODELS)
+    parser.add_argument('--quantizations', nargs='+', default=list(TFLITE_QUANTIZATIONS), choices=TFLITE_QUANTIZATIONS)
+    parser.add_argument('--images', nargs='+', default=sorted(glob.glob(DEFAULT_IMAGES)))
+    parser.add_argument('--candidates', type=int, default=16, help='candidate epsilons per image')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--calibrate', action='store_true',
+                        help='quantize int8 activations too, calibrated on the benchmark images '
+                             '(the server uses weight-only int8)')
+    args = parser.parse_args()
+
+    epsilons = list(np.linspace(0.001, 0.1, args.candidates))
+    for model_name in args.models:
+        benchmark_model(model_name, args.quantizations, args.images, epsilons, args.repeats, args.calibrate)
+
+if __name__ == '__main__':
+    main()
@@ -1,36 +1,294 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
+from dotenv import load_dotenv
 from db_connect import get_db_connection
 
+# Load environment variables
+load_dotenv()
+
 def get_connection():
     """Create and return a connection to the MySQL database"""
     return get_db_connection()
 
+class PooledConnection:
+    """
+    A pooled MySQL connection together with its prepared statements.
+
+    Each query string gets its own prepared cursor the first time it runs on
+    this connection; later executions reuse the server-side statement and only
+    send the parameters. At most statement_cache_size statements are kept,
+    least recently used first out.
+    """
+
+    def __init__(self, connection, statement_cache_size):
+        self.connection = connection
+        self.statement_cache_size = statement_cache_size
+        self.statements = OrderedDict()
+        self.last_used = time.monotonic()
+        # Set when a query fails, so the connection is checked before reuse
+        self.failed = False
+
+    def statement(self, query):
+        """Returns (query, cursor, reused) for query, preparing it if needed"""
+        entry = self.statements.get(query)
+        if entry is not None:
+            self.statements.move_to_end(query)
+            return entry[0], entry[1], True
+        cursor = self.connection.cursor(prepared=True, dictionary=True)
+        # The cursor only re-prepares when it is given a different string
+        # object, so the string stored here is the one passed on every reuse
+        self.statements[query] = (query, cursor)
+        while len(self.statements) > self.statement_cache_size:
+            _, (_, evicted) = self.statements.popitem(last=False)
+            self._close_cursor(evicted)
+        return query, cursor, False
+
+    def forget(self, query):
+        entry = self.statements.pop(query, None)
+        if entry is not None:
+            self._close_cursor(entry[1])
+
+    def close(self):
+        for _, cursor in self.statements.values():
+            self._close_cursor(cursor)
+        self.statements.clear()
+        try:
+            self.connection.close()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+class ConnectionPool:
+    """
+    Fixed-size pool of MySQL connections shared by every request thread.
+
+    Connections are opened on demand up to size and returned to the pool after
+    each query instead of being closed. A connection that has been idle for
+    longer than check_seconds is pinged on checkout and replaced if the server
+    dropped it. When every connection is in use, callers wait up to timeout
+    seconds for one to be returned. The pool belongs to the process that
+    created its connections; after a fork it starts over with new ones.
+    """
+
+    def __init__(self, connect=None, size=None, timeout=None, check_seconds=None, statement_cache_size=None):
+        self.connect = connect or get_db_connection
+        self.size = size or int(os.getenv('DB_POOL_SIZE', '5'))
+        if timeout is None:
+            timeout = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+        self.timeout = timeout
+        if check_seconds is None:
+            check_seconds = float(os.getenv('DB_POOL_CHECK_SECONDS', '30'))
+        self.check_seconds = check_seconds
+        self.statement_cache_size = statement_cache_size or int(os.getenv('DB_STATEMENT_CACHE', '32'))
+        self._idle = []
+        self._open = 0
+        self._pid = os.getpid()
+        self._condition = threading.Condition()
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.timeouts = 0
+        self.connections_created = 0
+        self.connections_discarded = 0
+        self.health_check_failures = 0
+        self.statements_prepared = 0
+        self.statements_reused = 0
+
+    def _reset_after_fork(self):
+        # The connections belong to the parent; closing them here would shut
+        # the parent's sessions, so they are just dropped
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._idle = []
+            self._open = 0
+
+    def _create(self):
+        connection = self.connect()
+        if not connection:
+            return None
+        # One statement per checkout, so autocommit keeps reads from holding
+        # a stale snapshot on a long-lived connection
+        connection.autocommit = True
+        with self._condition:
+            self.connections_created += 1
+        return PooledConnection(connection, self.statement_cache_size)
+
+    @staticmethod
+    def _ping(pooled):
+        try:
+            return pooled.connection.is_connected()
+        except Exception:
+            return False
+
+    def _healthy(self, pooled):
+        return time.monotonic() - pooled.last_used < self.check_seconds or self._ping(pooled)
+
+    def acquire(self):
+        """Checks out a connection, or returns None if none could be had"""
+        start_time = time.monotonic()
+        with self._condition:
+            self._reset_after_fork()
+            waited = False
+            while not self._idle and self._open >= self.size:
+                remaining = self.timeout - (time.monotonic() - start_time)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    print(f"Timed out after {self.timeout:.1f}s waiting for a database connection")
+                    return None
+                if not waited:
+                    self.waits += 1
+                    waited = True
+                self._condition.wait(remaining)
+            if waited:
+                self.wait_seconds += time.monotonic() - start_time
+            self.checkouts += 1
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                self._open += 1
+
+        if pooled is not None:
+            if self._healthy(pooled):
+                return pooled
+            with self._condition:
+                self.health_check_failures += 1
+                self.connections_discarded += 1
+            pooled.close()
+
+        try:
+            pooled = self._create()
+        except Exception as e:
+            print(f"Error opening database connection: {e}")
+            pooled = None
+        if pooled is None:
+            with self._condition:
+                self._open -= 1
+                self._condition.notify()
+        return pooled
+
+    def release(self, pooled, broken=False):
+        with self._condition:
+            if self._pid != os.getpid():
+                return
+            if broken:
+                self._open -= 1
+                self.connections_discarded += 1
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._condition.notify()
+        if broken:
+            pooled.close()
+
+    @contextmanager
+    def connection(self):
+        """Context manager around acquire/release; yields None if no connection is available"""
+        pooled = self.acquire()
+        if pooled is None:
+            yield None
+            return
+        broken = False
+        try:
+            yield pooled
+        except Exception:
+            broken = True
+            raise
+        finally:
+            if pooled.failed and not broken:
+                broken = not self._ping(pooled)
+            pooled.failed = False
+            self.release(pooled, broken)
+
+    def execute(self, query, params=None, fetch=False):
+        with self.connection() as pooled:
+            if pooled is None:
+                return None
+            statement, cursor, reused = pooled.statement(query)
+            with self._condition:
+                if reused:
+                    self.statements_reused += 1
+                else:
+                    self.statements_prepared += 1
+            try:
+                cursor.execute(statement, params or ())
+                if fetch:
+                    return cursor.fetchall()
+                pooled.connection.commit()
+                return cursor.lastrowid
+            except Error as e:
+                print(f"Error executing query: {e}")
+                pooled.forget(query)
+                try:
+                    pooled.connection.rollback()
+                except Error:
+                    pass
+                pooled.failed = True
+                return None
+
+    def execute_many(self, query, rows):
+        """Runs query once per row in a single round trip; returns the row count or None on error"""
+        with self.connection() as pooled:
+            if pooled is None:
+                return None
+            # A plain cursor rewrites an INSERT ... VALUES into one multi-row INSERT
+            cursor = pooled.connection.cursor()
+            try:
+                cursor.executemany(query, rows)
+                pooled.connection.commit()
+                return cursor.rowcount
+            except Error as e:
+                print(f"Error executing batch: {e}")
+                try:
+                    pooled.connection.rollback()
+                except Error:
+                    pass
+                pooled.failed = True
+                return None
+            finally:
+                cursor.close()
+
+    def close(self):
+        with self._condition:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+        for pooled in idle:
+            pooled.close()
+
+    def stats(self):
+        with self._condition:
+            return {
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._open - len(self._idle),
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "mean_wait_ms": round(self.wait_seconds / self.waits * 1000, 2) if self.waits else 0.0,
+                "timeouts": self.timeouts,
+                "connections_created": self.connections_created,
+                "connections_discarded": self.connections_discarded,
+                "health_check_failures": self.health_check_failures,
+                "statements_prepared": self.statements_prepared,
+                "statements_reused": self.statements_reused,
+            }
+
+# Shared by every request thread in this process
+db_pool = ConnectionPool()
+
 def execute_query(query, params=None, fetch=False):
-    """Execute a query and optionally return results"""
-    connection = get_connection()
-    if not connection:
-        return None
-    
-    cursor = connection.cursor(dictionary=True)
-    result = None
-    
-    try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        
-        if fetch:
-            result = cursor.fetchall()
-        else:
-            connection.commit()
-            result = cursor.lastrowid
-    except Error as e:
-        print(f"Error executing query: {e}")
-        connection.rollback()
-    finally:
-        cursor.close()
-        connection.close()
-    
-    return result 
\ No newline at end of file
+    """Execute a query on a pooled connection and optionally return results"""
+    return db_pool.execute(query, params, fetch)
+
+def execute_many(query, rows):
+    """Execute a query for each row in one batch and return the number of rows affected"""
+    return db_pool.execute_many(query, rows)
@@ -0,0 +1,93 @@
+"""
+Build-time export of the supported models for offline loading.
+
+Downloads each model's ImageNet weights once and saves the model as
+<output>/<model_name>.keras, copies the ImageNet class index next to them and
+records what was exported in manifest.json. The backend then loads these
+files with no network access. After saving, each model is loaded back from
+its artifact and the cold-start time (load and first forward pass) is
+recorded in the manifest.
+
+Usage (from ui/backend):
+    python export_models.py                        # every supported model into MODEL_DIR
+    python export_models.py mobilenet_v2 --output models
+"""
+import os
+import sys
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import keras
+import tensorflow as tf
+from model_catalog import SUPPORTED_MODELS, MODEL_APPLICATIONS
+import model_artifacts
+
+CLASS_INDEX_URL = 'https://storage.googleapis.com/download.tensorflow.org/data/imagenet_class_index.json'
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def export_labels(output_dir):
+    cached = tf.keras.utils.get_file(model_artifacts.LABELS_FILE, CLASS_INDEX_URL, cache_subdir='models')
+    target = os.path.join(output_dir, model_artifacts.LABELS_FILE)
+    shutil.copyfile(cached, target)
+    return target
+
+def export_model(model_name, output_dir):
+    application, _, image_size = MODEL_APPLICATIONS[model_name]
+    start_time = time.time()
+    model = getattr(tf.keras.applications, application)(include_top=True, weights='imagenet')
+    path = model_artifacts.model_path(model_name, output_dir)
+    model.save(path)
+    export_seconds = time.time() - start_time
+
+    # Load the artifact back the way the server will, to check it and time it
+    start_time = time.time()
+    loaded = tf.keras.models.load_model(path, compile=False)
+    load_seconds = time.time() - start_time
+    dummy = np.zeros((1, *image_size, 3), dtype=np.float32)
+    np.testing.assert_allclose(loaded(dummy, training=False), model(dummy, training=False), atol=1e-5)
+    first_call_seconds = time.time() - start_time - load_seconds
+
+    return {
+        "file": os.path.basename(path),
+        "sha256": file_digest(path),
+        "bytes": os.path.getsize(path),
+        "export_seconds": round(export_seconds, 3),
+        "load_seconds": round(load_seconds, 3),
+        "first_call_seconds": round(first_call_seconds, 3),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('models', nargs='*', default=list(SUPPORTED_MODELS), choices=SUPPORTED_MODELS)
+    parser.add_argument('--output', default=model_artifacts.MODEL_DIR)
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    manifest = model_artifacts.read_manifest(args.output)
+    manifest["tensorflow"] = tf.__version__
+    manifest["keras"] = keras.__version__
+    manifest["labels"] = os.path.basename(export_labels(args.output))
+    models = manifest.setdefault("models", {})
+
+    for model_name in args.models:
+        try:
+            models[model_name] = export_model(model_name, args.output)
+        except Exception as e:
+            print(f"Error exporting {model_name}: {e}")
+            return 1
+        record = models[model_name]
+        print(f"Exported {model_name}: {record['bytes'] / 1024 / 1024:.1f} MB, "
+              f"loads in {record['load_seconds']:.2f} s, first call {record['first_call_seconds']:.2f} s")
+        model_artifacts.write_manifest(manifest, args.output)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
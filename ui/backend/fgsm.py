@@ -4,74 +4,428 @@ from PIL import Image
 import numpy as np
 import time
 import io
-import base64
+import zipfile
+import hashlib
+import threading
+from iterative import IterativeAttack, ITERATIVE_METHODS
+from image_cache import image_cache
+from gradient_cache import gradient_cache
+from image_encoding import ImageEncoder
+from tflite_backend import TFLiteScorer
+from runtime_config import thread_config
+from batching import BatchSchedulerClosed
+from model_catalog import SUPPORTED_MODELS, MODEL_APPLICATIONS, SEARCH_STRATEGIES
+import model_artifacts
+
+IMAGE_EXTENSIONS = ('jpg', 'jpeg', 'png', 'bmp', 'gif')
+SCORING_BACKENDS = ('keras', 'tflite_float16', 'tflite_int8')
+EXECUTION_MODES = ('float32', 'mixed_bfloat16', 'xla')
+# Longest a request waits for its batched attack before failing instead of hanging
+BATCH_RESULT_TIMEOUT = float(os.getenv('BATCH_RESULT_TIMEOUT_SECONDS', '120'))
+
+def bfloat16_supported():
+    """
+    True when bfloat16 math is done in hardware: on a GPU, or on a CPU with
+    AVX512-BF16 or AMX. Elsewhere it is emulated and slower than float32.
+    """
+    if tf.config.list_physical_devices('GPU'):
+        return True
+    try:
+        with open('/proc/cpuinfo') as f:
+            flags = f.read()
+    except OSError:
+        return False
+    return 'avx512_bf16' in flags or 'amx_bf16' in flags
+
+class StepLatency:
+    """
+    Call count and total time of the engine's forward and gradient steps.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._steps = {'predict': [0, 0.0], 'gradient': [0, 0.0]}
+
+    def record(self, step_name, seconds):
+        with self._lock:
+            entry = self._steps[step_name]
+            entry[0] += 1
+            entry[1] += seconds
+
+    def stats(self):
+        with self._lock:
+            return {
+                step_name: {"calls": calls, "mean_ms": 1000 * total / calls if calls else 0.0}
+                for step_name, (calls, total) in self._steps.items()
+            }
+
+class ForwardPassBudgetExhausted(RuntimeError):
+    pass
+
+class ForwardPassCounter:
+    """
+    Counts the model evaluations made for one request, with an optional cap:
+    once limit passes have been spent, predict() raises ForwardPassBudgetExhausted.
+    When a progress callback is given, report() passes it the epsilon just
+    scored, the passes spent so far and the best successful epsilon.
+    """
+    def __init__(self, predict_fn, limit=None, progress=None):
+        self.predict_fn = predict_fn
+        self.limit = limit
+        self.count = 0
+        self.progress = progress
+        self.best_epsilon = None
+
+    def exhausted(self):
+        return self.limit is not None and self.count >= self.limit
+
+    def predict(self, images):
+        if self.exhausted():
+            raise ForwardPassBudgetExhausted(f"Forward-pass budget of {self.limit} spent")
+        self.count += 1
+        return self.predict_fn(images)
+
+    def report(self, epsilon, succeeded):
+        if succeeded and (self.best_epsilon is None or epsilon < self.best_epsilon):
+            self.best_epsilon = epsilon
+        if self.progress is not None:
+            self.progress({
+                "epsilon": float(epsilon),
+                "forward_passes": self.count,
+                "best_epsilon": None if self.best_epsilon is None else float(self.best_epsilon),
+            })
 
 class FGSM:
-    def __init__(self, epsilon=0.05, model_name='mobilenet_v2'):
+    def __init__(self, epsilon=0.05, model_name='mobilenet_v2', jit_compile=None, scoring_backend=None,
+                 execution_mode=None, defer_build=False):
         self.epsilon = epsilon
         self.model_name = model_name.lower()
         self.model = None
         self.image_size = (0, 0)
+        if execution_mode is None:
+            execution_mode = os.getenv('FGSM_EXECUTION_MODE', '').lower()
+        if not execution_mode:
+            # FGSM_JIT_COMPILE predates execution modes and still selects XLA
+            if jit_compile is None:
+                jit_compile = os.getenv('FGSM_JIT_COMPILE', 'false').lower() == 'true'
+            execution_mode = 'xla' if jit_compile else 'float32'
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(f"Unsupported execution mode: {execution_mode}")
+        self.requested_execution_mode = execution_mode
+        self.execution_mode = execution_mode
+        self.jit_compile = execution_mode == 'xla'
+        # Result of comparing the execution mode against float32 when the engine was built
+        self.execution_guard = None
+        self.latency = StepLatency()
+        if scoring_backend is None:
+            scoring_backend = os.getenv('FGSM_SCORING_BACKEND', 'keras').lower()
+        if scoring_backend not in SCORING_BACKENDS:
+            raise ValueError(f"Unsupported scoring backend: {scoring_backend}")
+        self.scoring_backend = scoring_backend
+        # Quantized forward-only model for auto-tune candidates; None scores with Keras
+        self.scorer = None
+        self.trace_counts = {'predict': 0, 'gradient': 0}
+        # Where the model came from and how long loading and warming up took
+        self.cold_start = {}
+        # Optional BatchScheduler attached by the model registry
+        self.scheduler = None
         print("Loading pretrained model...")
         
+        # Thread pools must be sized before the first TensorFlow op in the process
+        thread_config.apply()
         self.load_model()
-        self.model.trainable = False
+        # With defer_build the weights are loaded but nothing is compiled or run
+        # until build() or warm_up()
+        self.built = False
+        if not defer_build:
+            self.build()
+
+    def build(self):
+        """
+        Compile the attack steps and the scoring backend. This runs the model
+        when the execution mode has to be checked against float32.
+        """
+        self.build_compiled_steps()
+        if self.scoring_backend != 'keras':
+            self.build_scorer()
+        self.built = True
         
     def np_to_base64(self, img_array: np.ndarray):
         """
         Convert a float32 [0..1] image array to a PNG Base64 string.
         """
-        # Ensure array is in [0, 255] range
-        img_array_255 = np.clip(img_array * 255, 0, 255).astype(np.uint8)
-        pil_img = Image.fromarray(img_array_255)
-        buffer = io.BytesIO()
-        pil_img.save(buffer, format='PNG')
-        buffer.seek(0)
-        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+        return ImageEncoder().render(img_array)
         
     def load_model(self):
-        if self.model_name == 'mobilenet_v2':  # Load MobileNetV2
-            self.model = tf.keras.applications.MobileNetV2(include_top=True, weights='imagenet')
-            self.decode_predictions = tf.keras.applications.mobilenet_v2.decode_predictions
-            self.preprocess_input = tf.keras.applications.mobilenet_v2.preprocess_input
-            self.image_size = (224, 224)
-        elif self.model_name == 'inception_v3':
-            self.model = tf.keras.applications.InceptionV3(include_top=True, weights='imagenet')
-            self.decode_predictions = tf.keras.applications.inception_v3.decode_predictions
-            self.preprocess_input = tf.keras.applications.inception_v3.preprocess_input
-            self.image_size = (299, 299)
-        elif self.model_name == 'vgg19':  # Load VGG19
-            self.model = tf.keras.applications.VGG19(include_top=True, weights='imagenet')
-            self.decode_predictions = tf.keras.applications.vgg19.decode_predictions
-            self.preprocess_input = tf.keras.applications.vgg19.preprocess_input
-            self.image_size = (224, 224)
-        elif self.model_name == 'densenet121':  # Load DenseNet121
-            self.model = tf.keras.applications.DenseNet121(include_top=True, weights='imagenet')
-            self.decode_predictions = tf.keras.applications.densenet.decode_predictions
-            self.preprocess_input = tf.keras.applications.densenet.preprocess_input
-            self.image_size = (224, 224)
+        """
+        Load the model from its exported artifact (see export_models.py) when
+        there is one, otherwise build it and download the ImageNet weights.
+        """
+        self.load_preprocessing()
+        start_time = time.time()
+        if model_artifacts.has_model(self.model_name):
+            self.model = tf.keras.models.load_model(model_artifacts.model_path(self.model_name), compile=False)
+            self.cold_start["source"] = "artifact"
         else:
+            application, _, _ = MODEL_APPLICATIONS[self.model_name]
+            self.model = getattr(tf.keras.applications, application)(include_top=True, weights='imagenet')
+            self.cold_start["source"] = "keras_applications"
+        self.model.trainable = False
+        self.cold_start["load_seconds"] = time.time() - start_time
+
+    def load_preprocessing(self):
+        """
+        Set the label decoder, input preprocessing and input size for the model,
+        without loading its weights.
+        """
+        if self.model_name not in MODEL_APPLICATIONS:
             raise ValueError("Unsupported model.")
+        _, module_name, image_size = MODEL_APPLICATIONS[self.model_name]
+        module = getattr(tf.keras.applications, module_name)
+        # The exported label table avoids fetching the class index on first use
+        labels = model_artifacts.label_table()
+        self.decode_predictions = labels.decode_predictions if labels is not None else module.decode_predictions
+        self.preprocess_input = module.preprocess_input
+        self.image_size = image_size
 
-    def preprocess(self, image_input):
-        if isinstance(image_input, tf.Tensor):
-            try:
-                image = tf.image.decode_image(image_input, channels=3)
-                image.set_shape([None, None, 3])
-            except:
-                image = image_input
-            image_np = image.numpy() if hasattr(image, 'numpy') else np.array(image)
-            pil_image = Image.fromarray(np.uint8(image_np))
+    def build_compiled_steps(self):
+        """
+        Compile the forward and loss-gradient steps for the execution mode.
+
+        'float32' runs the model as loaded, 'xla' compiles both steps with XLA
+        and 'mixed_bfloat16' runs a copy of the model that computes in bfloat16
+        with float32 weights. Any mode other than float32 is checked against
+        float32 on a fixed batch first (see _guard_execution_mode) and the
+        engine falls back to float32 if top-1 labels or gradient signs drift.
+        """
+        reference = self._make_steps(self.model, jit_compile=False)
+        if self.execution_mode == 'float32':
+            self._predict_step, self._gradient_step = reference
+            return
+
+        model = self.model
+        if self.execution_mode == 'mixed_bfloat16':
+            if not bfloat16_supported():
+                print(f"bfloat16 is not supported in hardware here, running {self.model_name} in float32")
+                self.execution_mode, self.jit_compile = 'float32', False
+                self._predict_step, self._gradient_step = reference
+                return
+            model = self._mixed_precision_copy()
+        candidate = self._make_steps(model, jit_compile=self.execution_mode == 'xla')
+
+        self.execution_guard = self._guard_execution_mode(reference, candidate)
+        if self.execution_guard["passed"]:
+            self.model = model
+            self._predict_step, self._gradient_step = candidate
+        else:
+            print(f"{self.execution_mode} changed the results of {self.model_name} "
+                  f"({self.execution_guard}), running in float32")
+            self.execution_mode, self.jit_compile = 'float32', False
+            self._predict_step, self._gradient_step = reference
+
+    def _make_steps(self, model, jit_compile):
+        """
+        Forward and loss-gradient tf.functions with a fixed input signature for
+        this model's image size, so calls skip Keras' per-call predict() setup
+        and do not retrace for new batch sizes. Outputs are always float32.
+        """
+        image_spec = tf.TensorSpec(shape=(None, *self.image_size, 3), dtype=tf.float32)
+        label_spec = tf.TensorSpec(shape=(None, model.output_shape[-1]), dtype=tf.float32)
+        loss_object = tf.keras.losses.CategoricalCrossentropy()
+
+        def predict_step(images):
+            self._record_trace('predict', images)
+            return tf.cast(model(images, training=False), tf.float32)
+
+        def gradient_step(images, labels):
+            self._record_trace('gradient', images)
+            with tf.GradientTape() as tape:
+                tape.watch(images)
+                prediction = tf.cast(model(images, training=False), tf.float32)
+                loss = loss_object(labels, prediction)
+            return tape.gradient(loss, images), prediction
+
+        return (
+            tf.function(predict_step, input_signature=[image_spec], jit_compile=jit_compile),
+            tf.function(gradient_step, input_signature=[image_spec, label_spec], jit_compile=jit_compile),
+        )
+
+    def _mixed_precision_copy(self):
+        """
+        A copy of the model whose layers compute in bfloat16, sharing nothing
+        with the float32 model but its weight values.
+        """
+        def clone_layer(layer):
+            config = layer.get_config()
+            config['dtype'] = 'mixed_bfloat16'
+            return layer.__class__.from_config(config)
+
+        model = tf.keras.models.clone_model(self.model, clone_function=clone_layer)
+        model.set_weights(self.model.get_weights())
+        model.trainable = False
+        return model
+
+    def _guard_execution_mode(self, reference, candidate, num_images=4):
+        """
+        Run a fixed batch of smooth random images through the float32 reference
+        steps and the candidate steps. The candidate passes when every top-1
+        label matches and the share of matching gradient signs is at least
+        FGSM_GUARD_SIGN_AGREEMENT. Also times both, so the speedup is visible in stats().
+        """
+        rng = np.random.RandomState(0)
+        # Upsampled low-resolution noise is closer to a photo than per-pixel noise
+        images = tf.image.resize(rng.uniform(-1, 1, (num_images, 8, 8, 3)).astype(np.float32), self.image_size)
+        min_sign_agreement = float(os.getenv('FGSM_GUARD_SIGN_AGREEMENT', '0.95'))
+
+        outputs = {}
+        for name, (predict_step, gradient_step) in (('reference', reference), ('candidate', candidate)):
+            probs = predict_step(images)
+            targets = tf.one_hot(tf.argmax(outputs['reference'][0] if outputs else probs, axis=-1), probs.shape[-1])
+            gradient, _ = gradient_step(images, targets)
+            # Time a second call so tracing and compilation are not included
+            start_time = time.perf_counter()
+            probs = predict_step(images).numpy()
+            predict_seconds = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            gradient = gradient_step(images, targets)[0].numpy()
+            gradient_seconds = time.perf_counter() - start_time
+            outputs[name] = (probs, gradient, predict_seconds, gradient_seconds)
+
+        ref_probs, ref_gradient, ref_predict, ref_grad_time = outputs['reference']
+        probs, gradient, predict_seconds, gradient_seconds = outputs['candidate']
+        label_agreement = float(np.mean(np.argmax(ref_probs, axis=-1) == np.argmax(probs, axis=-1)))
+        nonzero = ref_gradient != 0
+        sign_agreement = float(np.mean(np.sign(ref_gradient[nonzero]) == np.sign(gradient[nonzero]))) if nonzero.any() else 1.0
+        return {
+            "mode": self.execution_mode,
+            "label_agreement": label_agreement,
+            "sign_agreement": sign_agreement,
+            "passed": label_agreement == 1.0 and sign_agreement >= min_sign_agreement,
+            "float32_ms": {"predict": 1000 * ref_predict, "gradient": 1000 * ref_grad_time},
+            "mode_ms": {"predict": 1000 * predict_seconds, "gradient": 1000 * gradient_seconds},
+        }
+
+    def build_scorer(self):
+        """
+        Convert the model to TFLite for forward-only candidate scoring. If the
+        conversion fails, candidates are scored with the Keras model instead.
+        """
+        quantization = self.scoring_backend.split('_', 1)[1]
+        try:
+            self.scorer = TFLiteScorer(self.model, quantization)
+        except Exception as e:
+            print(f"TFLite conversion of {self.model_name} failed, scoring with Keras: {e}")
+            self.scorer = None
+
+    def _record_trace(self, step_name, images):
+        # Python side effects only run while tf.function traces, so this counts retraces
+        self.trace_counts[step_name] += 1
+        print(f"Tracing {step_name} step for {self.model_name} (trace #{self.trace_counts[step_name]}, "
+              f"input {images.shape}, jit_compile={self.jit_compile})")
+
+    def predict(self, images):
+        """
+        Class probabilities for a batch of preprocessed images, as a numpy array.
+        """
+        start_time = time.perf_counter()
+        probs = self._predict_step(tf.convert_to_tensor(images, dtype=tf.float32)).numpy()
+        self.latency.record('predict', time.perf_counter() - start_time)
+        return probs
+
+    def stats(self):
+        return {
+            "model_name": self.model_name,
+            "execution_mode": self.execution_mode,
+            "requested_execution_mode": self.requested_execution_mode,
+            "execution_guard": self.execution_guard,
+            "latency": self.latency.stats(),
+            "cold_start": dict(self.cold_start),
+            "jit_compile": self.jit_compile,
+            "trace_counts": dict(self.trace_counts),
+            "batching": self.scheduler.stats() if self.scheduler is not None else None,
+            "scoring_backend": self.scoring_backend,
+            "scorer": self.scorer.stats() if self.scorer is not None else None,
+        }
+
+    def memory_footprint(self):
+        """
+        Approximate number of bytes held by the model weights, including the TFLite copy.
+        """
+        weights = sum(int(np.prod(w.shape)) * tf.as_dtype(w.dtype).size for w in self.model.weights)
+        return weights + (len(self.scorer.model_content) if self.scorer is not None else 0)
+
+    def warm_up(self):
+        """
+        Run a dummy batch through the forward and gradient paths so the first
+        real request does not pay for graph construction.
+        """
+        start_time = time.time()
+        if not self.built:
+            self.build()
+        dummy = tf.zeros((1, *self.image_size, 3), dtype=tf.float32)
+        probs = self.predict(dummy)
+        target = tf.one_hot([tf.argmax(probs[0])], probs.shape[-1])
+        self.create_adversarial_pattern(dummy, target)
+        if self.scorer is not None:
+            self.scorer.predict(dummy)
+        # Latency stats should describe real requests, not tracing and compilation
+        self.latency = StepLatency()
+        self.cold_start["warm_up_seconds"] = time.time() - start_time
+        print(f"Warmed up {self.model_name} in {time.time() - start_time:.2f} seconds")
+
+    def load_image(self, image_input, flatten_alpha=False):
+        """
+        Decode and resize an image to the model input size as a uint8 RGB array.
+
+        image_input may be a file path, raw image bytes, a binary file-like
+        object (such as an uploaded file) or a tensor. Encoded images are cached
+        by the SHA-256 of their bytes plus the input size, so a repeat request
+        skips decoding and resizing. With flatten_alpha, RGBA images are composited
+        onto a white background instead of dropping the alpha channel.
+        Returns (pixels, digest); digest is None for already-decoded tensors,
+        which are not cached.
+        """
+        if isinstance(image_input, tf.Tensor) and image_input.dtype == tf.string:
+            raw = image_input.numpy()
+        elif isinstance(image_input, tf.Tensor):
+            pil_image = Image.fromarray(np.uint8(image_input.numpy()))
+            return self._resize(pil_image), None
+        elif isinstance(image_input, (bytes, bytearray, memoryview)):
+            raw = bytes(image_input)
         elif isinstance(image_input, str):
-            pil_image = Image.open(image_input)
+            with open(image_input, 'rb') as f:
+                raw = f.read()
+        elif hasattr(image_input, 'read'):
+            raw = image_input.read()
         else:
-            raise TypeError("Image input must be a file path or a tensor")
-        
-        if pil_image.mode != 'RGB':
+            raise TypeError("Image input must be a file path, bytes, a file-like object or a tensor")
+
+        digest = hashlib.sha256(raw).hexdigest()
+        if flatten_alpha:
+            # Flattening changes the pixels, so keep it apart from the plain decode
+            digest += '-flat'
+        key = (digest, tuple(self.image_size))
+        pixels = image_cache.get(key)
+        if pixels is None:
+            pixels = self._resize(Image.open(io.BytesIO(raw)), flatten_alpha)
+            image_cache.put(key, pixels)
+        return pixels, digest
+
+    def _resize(self, pil_image, flatten_alpha=False):
+        if flatten_alpha and pil_image.mode == 'RGBA':
+            background = Image.new('RGB', pil_image.size, (255, 255, 255))
+            background.paste(pil_image, mask=pil_image.split()[3])
+            pil_image = background
+        elif pil_image.mode != 'RGB':
             pil_image = pil_image.convert('RGB')
         pil_image = pil_image.resize(self.image_size, Image.Resampling.LANCZOS)
-        image_array = np.array(pil_image)
-        image = tf.convert_to_tensor(image_array)
+        return np.array(pil_image, dtype=np.uint8)
+
+    def preprocess(self, image_input, flatten_alpha=False):
+        pixels, _ = self.load_image(image_input, flatten_alpha)
+        return self.preprocess_pixels(pixels)
+
+    def preprocess_pixels(self, pixels):
+        image = tf.convert_to_tensor(pixels)
         image = tf.cast(image, tf.float32)
         image = self.preprocess_input(image)
         image = image[None, ...]  # Add batch dimension
@@ -91,68 +445,316 @@ class FGSM:
             confidence = float(probs[0][predicted_class_idx])
             return (f"class_{predicted_class_idx}", f"class_{predicted_class_idx}", confidence)
 
+    def gradient_and_prediction(self, images, labels):
+        """
+        Loss gradient with respect to the images, plus the prediction from the same forward pass.
+        """
+        start_time = time.perf_counter()
+        gradient, prediction = self._gradient_step(tf.convert_to_tensor(images, dtype=tf.float32), tf.cast(labels, tf.float32))
+        self.latency.record('gradient', time.perf_counter() - start_time)
+        return gradient, prediction
+
     def create_adversarial_pattern(self, input_image, input_label):
-        loss_object = tf.keras.losses.CategoricalCrossentropy()
-        with tf.GradientTape() as tape:
-            tape.watch(input_image)
-            prediction = self.model(input_image)
-            loss = loss_object(input_label, prediction)
-        gradient = tape.gradient(loss, input_image)
+        gradient, _ = self.gradient_and_prediction(input_image, input_label)
         return tf.sign(gradient)
 
-    def attack(self, image_path):
+    def cached_pattern(self, digest):
+        """
+        (image_probs, sign gradient) cached for this image and model, or None.
+        The sign gradient does not depend on epsilon, so an epsilon sweep over
+        one image only needs one forward pass per new value.
+        """
+        if digest is None:
+            return None
+        cached = gradient_cache.get((digest, self.model_name))
+        if cached is None:
+            return None
+        image_probs, sign_gradient = cached
+        return image_probs, tf.cast(sign_gradient, tf.float32)
+
+    def cache_pattern(self, digest, image_probs, perturbations):
+        if digest is not None:
+            gradient_cache.put((digest, self.model_name), image_probs, perturbations)
+
+    def attack_tensors(self, images, epsilons):
+        """
+        Single-step attack on a batch of preprocessed images, one epsilon per image.
+        Returns (image_probs, perturbations, adversarial_images, adv_probs).
+        """
+        images = tf.convert_to_tensor(images, dtype=tf.float32)
+
+        # Original prediction and one-hot targets
+        image_probs = self.predict(images)
+        targets = tf.one_hot(np.argmax(image_probs, axis=-1), image_probs.shape[-1])
+
+        # The batch loss is a mean, which scales each gradient but leaves its sign alone
+        perturbations = self.create_adversarial_pattern(images, targets)
+        epsilons = tf.reshape(tf.constant(epsilons, dtype=tf.float32), (-1, 1, 1, 1))
+        adversarial_images = tf.clip_by_value(images + epsilons * perturbations, -1, 1)
+
+        adv_probs = self.predict(adversarial_images)
+        return image_probs, perturbations, adversarial_images, adv_probs
+
+    def attack(self, image_input, epsilon=None, flatten_alpha=False, encoder=None):
+        # Engines are shared between requests, so the per-request epsilon is
+        # passed in rather than written to self.epsilon
+        epsilon = self.epsilon if epsilon is None else epsilon
         start_time = time.time()
         try:
-            image = self.preprocess(image_path)
+            pixels, digest = self.load_image(image_input, flatten_alpha)
+            image = self.preprocess_pixels(pixels)
         except Exception as e:
             print(f"Error preprocessing image: {e}")
             return None
 
-        # Original prediction
-        image_probs = self.model.predict(image, verbose=0)
-        _, orig_class, orig_conf = self.get_imagenet_label(image_probs)
-
-        # Prepare one-hot target
-        predicted_class_idx = tf.argmax(image_probs[0]).numpy()
-        target = tf.one_hot(predicted_class_idx, image_probs.shape[-1])
-        target = tf.reshape(target, (1, image_probs.shape[-1]))
-
-        # Create adversarial image
-        perturbations = self.create_adversarial_pattern(image, target)
-        adversarial_image = image + self.epsilon * perturbations
-
-        if self.model_name in ['mobilenet_v2', 'inception_v3', 'vgg19', 'densenet121']:
-            adversarial_image = tf.clip_by_value(adversarial_image, -1, 1)
+        cached = self.cached_pattern(digest)
+        if cached is not None:
+            # Seen this image before: only the adversarial image needs a forward pass
+            image_probs, perturbations = cached
+            adversarial_image = tf.clip_by_value(image + epsilon * perturbations, -1, 1)
+            adv_probs = self.predict(adversarial_image)
         else:
-            raise NotImplementedError("Model not supported for clipping.")
-
-        # Adversarial prediction
-        adv_probs = self.model.predict(adversarial_image, verbose=0)
+            # Concurrent requests for this model share one batched pass when a scheduler is attached;
+            # read it once, since evicting the model detaches and closes it
+            scheduler = self.scheduler
+            batched = None
+            if scheduler is not None:
+                try:
+                    batched = scheduler.submit(image, epsilon).result(timeout=BATCH_RESULT_TIMEOUT)
+                except BatchSchedulerClosed:
+                    batched = None
+            if batched is not None:
+                image_probs, perturbations, adversarial_image, adv_probs = batched
+            else:
+                image_probs, perturbations, adversarial_image, adv_probs = self.attack_tensors(image, [epsilon])
+            self.cache_pattern(digest, image_probs, perturbations)
+        _, orig_class, orig_conf = self.get_imagenet_label(image_probs)
         _, adv_class, adv_conf = self.get_imagenet_label(adv_probs)
 
         # Return separate images + info
         results = self.display_attack_results(
             image, perturbations, adversarial_image,
-            orig_class, adv_class, orig_conf, adv_conf
+            orig_class, adv_class, orig_conf, adv_conf, encoder=encoder
         )
         end_time = time.time()
         print(f"Attack completed in {end_time - start_time:.2f} seconds")
         print("Model Name:", self.model_name)
         # We can also attach epsilon or other info
-        results["epsilon_used"] = self.epsilon
+        results["epsilon_used"] = epsilon
         return results
 
-    def auto_tune_attack(self, image_path, epsilon_min=0.0001, epsilon_max=1, coarse_step=0.05, fine_step=0.001, min_confidence=0.001):
+    def iterative_attack(self, image_input, method='bim', epsilon=None, step_size=None, iterations=10, decay=1.0,
+                         flatten_alpha=False, encoder=None):
+        """
+        Multi-step attack (BIM, PGD or MI-FGSM) on a single image; see IterativeAttack.
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        start_time = time.time()
+        try:
+            image = self.preprocess(image_input, flatten_alpha)
+        except Exception as e:
+            print(f"Error preprocessing image: {e}")
+            return None
+
+        attack = IterativeAttack(self, method, epsilon, step_size, iterations, decay)
+        results = self._iterative_results(image, attack.run(image), 0, epsilon, encoder)
+        print(f"{method.upper()} attack completed in {time.time() - start_time:.2f} seconds "
+              f"after {len(results['iteration_stats'])} iterations")
+        return results
+
+    def _iterative_results(self, images, outcome, i, epsilon, encoder=None):
+        """
+        Result dict for row i of an IterativeAttack.run() outcome.
+        """
+        image = images[i:i + 1]
+        adversarial_image = outcome["adversarial_images"][i:i + 1]
+        _, orig_class, orig_conf = self.get_imagenet_label(outcome["image_probs"][i:i + 1])
+        _, adv_class, adv_conf = self.get_imagenet_label(outcome["adv_probs"][i:i + 1])
+        # Scale the accumulated perturbation to [-1, 1] so it is visible like the FGSM sign pattern
+        perturbation = (adversarial_image - image) / epsilon if epsilon else adversarial_image - image
+        results = self.display_attack_results(
+            image, perturbation, adversarial_image,
+            orig_class, adv_class, orig_conf, adv_conf, encoder=encoder
+        )
+        results["epsilon_used"] = epsilon
+        results["attack_success"] = bool(outcome["success"][i])
+        results["iterations_run"] = int(outcome["stopped_at"][i])
+        results["iteration_stats"] = outcome["iteration_stats"]
+        return results
+
+    def attack_batch(self, images, epsilon=None, batch_size=16, method='fgsm', encoder=None, **iterative_options):
+        """
+        Attack many images, yielding one result dict per image as each batch finishes.
+
+        images is a list of file paths, raw image bytes or (name, bytes) pairs,
+        or an open zipfile.ZipFile whose image entries are attacked. Images are
+        preprocessed and attacked batch_size at a time, with the single-step
+        attack or, for method 'bim', 'pgd' or 'mifgsm', an IterativeAttack
+        built from iterative_options.
+        """
+        epsilon = self.epsilon if epsilon is None else epsilon
+        if method != 'fgsm' and method not in ITERATIVE_METHODS:
+            raise ValueError(f"Unsupported attack method: {method}")
+        if isinstance(images, zipfile.ZipFile):
+            images = self.images_from_zip(images)
+
+        batch = []
+        for index, item in enumerate(images):
+            if isinstance(item, tuple):
+                name, data = item
+            else:
+                name, data = (item if isinstance(item, str) else f"image_{index}"), item
+            try:
+                image = self.preprocess(data)
+            except Exception as e:
+                print(f"Error preprocessing {name}: {e}")
+                yield {"index": index, "name": name, "error": f"Error preprocessing image: {str(e)}"}
+                continue
+            batch.append((index, name, image))
+            if len(batch) >= batch_size:
+                yield from self._attack_batch_chunk(batch, epsilon, method, iterative_options, encoder)
+                batch = []
+        if batch:
+            yield from self._attack_batch_chunk(batch, epsilon, method, iterative_options, encoder)
+
+    def _attack_batch_chunk(self, batch, epsilon, method, iterative_options, encoder=None):
+        start_time = time.time()
+        images = tf.concat([image for _, _, image in batch], axis=0)
+        try:
+            if method != 'fgsm':
+                outcome = IterativeAttack(self, method, epsilon, **iterative_options).run(images)
+            else:
+                image_probs, perturbations, adversarial_images, adv_probs = self.attack_tensors(images, [epsilon] * len(batch))
+        except Exception as e:
+            print(f"Error attacking batch: {e}")
+            for index, name, _ in batch:
+                yield {"index": index, "name": name, "error": f"Attack error: {str(e)}"}
+            return
+        print(f"Batch of {len(batch)} attacked in {time.time() - start_time:.2f} seconds")
+
+        if method != 'fgsm':
+            for i, (index, name, _) in enumerate(batch):
+                results = self._iterative_results(images, outcome, i, epsilon, encoder)
+                results["index"] = index
+                results["name"] = name
+                yield results
+            return
+
+        for i, (index, name, _) in enumerate(batch):
+            _, orig_class, orig_conf = self.get_imagenet_label(image_probs[i:i + 1])
+            _, adv_class, adv_conf = self.get_imagenet_label(adv_probs[i:i + 1])
+            results = self.display_attack_results(
+                images[i:i + 1], perturbations[i:i + 1], adversarial_images[i:i + 1],
+                orig_class, adv_class, orig_conf, adv_conf, encoder=encoder
+            )
+            results["index"] = index
+            results["name"] = name
+            results["epsilon_used"] = epsilon
+            yield results
+
+    @staticmethod
+    def images_from_zip(archive, max_images=None, max_entry_bytes=None, max_total_bytes=None):
+        """
+        (name, bytes) for the image entries of a zip archive, in archive order,
+        reading each entry only when it is needed. The declared uncompressed
+        sizes are checked up front, so an oversized entry or archive raises
+        ValueError before anything is decompressed.
+        """
+        entries = []
+        total_bytes = 0
+        for info in archive.infolist():
+            if info.is_dir() or '.' not in info.filename:
+                continue
+            if info.filename.rsplit('.', 1)[1].lower() not in IMAGE_EXTENSIONS:
+                continue
+            if max_images is not None and len(entries) >= max_images:
+                break
+            if max_entry_bytes is not None and info.file_size > max_entry_bytes:
+                raise ValueError(f"Archive entry {info.filename} is larger than {max_entry_bytes} bytes uncompressed")
+            total_bytes += info.file_size
+            if max_total_bytes is not None and total_bytes > max_total_bytes:
+                raise ValueError(f"Archive is larger than {max_total_bytes} bytes uncompressed")
+            entries.append(info)
+        # zipfile stops reading an entry at its declared size, so the checks above hold
+        return ((info.filename, archive.read(info)) for info in entries)
+
+    def auto_tune_attack(self, image_input, epsilon_min=0.0001, epsilon_max=1, coarse_step=0.05, fine_step=0.001, min_confidence=0.001,
+                         search_strategy='linear', sweep_memory_mb=16, tolerance=0.001, max_forward_passes=None,
+                         flatten_alpha=False, encoder=None, use_scorer=True, progress=None):
+        """
+        Find the smallest epsilon that changes the predicted class.
+
+        search_strategy 'linear' scores one candidate epsilon per forward pass;
+        'batched' stacks the candidates of each grid into batches of at most
+        sweep_memory_mb and scores them together, returning the same epsilon.
+        'bisect' halves the bracket between epsilon_min and a known successful
+        epsilon until it is narrower than tolerance and reports the final bracket.
+
+        max_forward_passes, if given, caps the model evaluations of the whole
+        search for every strategy. The original prediction and the gradient
+        are always made; once the cap is reached no further candidate is scored
+        and the best epsilon found so far is returned.
+
+        When the engine has a TFLite scorer (and use_scorer is set) the candidate
+        epsilons are scored with it, while the original prediction and the
+        gradient come from the Keras model. The chosen epsilon is then confirmed
+        with the Keras model; if the quantized model was wrong, the search is
+        repeated at full precision.
+
+        progress, if given, is called after every scored candidate with the
+        candidate epsilon, the forward passes so far and the best epsilon yet.
+        """
+        if search_strategy not in SEARCH_STRATEGIES:
+            raise ValueError(f"Unsupported search strategy: {search_strategy}")
+        if max_forward_passes is not None and max_forward_passes < 1:
+            raise ValueError("max_forward_passes must be at least 1")
         start_time = time.time()
 
         print(f"AUTO-TUNE ATTACK: Running with {self.model_name.upper()}")
         try:
-            image = self.preprocess(image_path)
+            if hasattr(image_input, 'read'):
+                # A full-precision retry needs the bytes again, and a stream can only be read once
+                image_input = image_input.read()
+            pixels, digest = self.load_image(image_input, flatten_alpha)
+            image = self.preprocess_pixels(pixels)
         except Exception as e:
             print(f"ERROR in auto_tune_attack preprocessing: {e}")
             return None
 
-        image_probs = self.model.predict(image, verbose=0)
+        scorer = self.scorer if use_scorer else None
+        limit = max_forward_passes
+        if scorer is not None and limit is not None:
+            limit -= 1  # Keep one pass for the full-precision confirmation
+        passes = ForwardPassCounter(scorer.predict if scorer else self.predict, limit=limit,
+                                    progress=progress)
+
+        def full_precision_search(reason):
+            # The quantized model only proposes; when it finds nothing or the
+            # full-precision model rejects its answer, search again without it
+            remaining = None
+            if max_forward_passes is not None:
+                # The retry only gets what the quantized search left of the budget
+                remaining = max_forward_passes - passes.count
+                if remaining <= 0:
+                    print(f"{reason}, and the forward-pass budget is spent")
+                    return self._budget_spent_result(image, perturbations, orig_class, orig_conf, passes.count, encoder)
+            print(f"{reason}, repeating the search at full precision")
+            results = self.auto_tune_attack(
+                image_input, epsilon_min, epsilon_max, coarse_step, fine_step, min_confidence,
+                search_strategy, sweep_memory_mb, tolerance, remaining,
+                flatten_alpha, encoder, use_scorer=False, progress=progress
+            )
+            if results is not None:
+                results["forward_passes"] += passes.count
+                results["scoring_backend"] = self.scoring_backend
+                results["scorer_confirmed"] = False
+            return results
+        cached = self.cached_pattern(digest)
+        if cached is not None:
+            image_probs, perturbations = cached
+        else:
+            image_probs = self.predict(image)
+            passes.count += 1
         _, orig_class, orig_conf = self.get_imagenet_label(image_probs)
         print(f"Original Prediction: {orig_class} ({orig_conf * 100:.2f}%)")
 
@@ -165,20 +767,27 @@ class FGSM:
         target = tf.reshape(target, (1, image_probs.shape[-1]))
 
         try:
-            perturbations = self.create_adversarial_pattern(image, target)
+            if cached is None:
+                perturbations = self.create_adversarial_pattern(image, target)
+                passes.count += 1  # The gradient step evaluates the model too
+                self.cache_pattern(digest, image_probs, perturbations)
         except Exception as e:
             print(f"ERROR creating adversarial pattern: {e}")
             # Return a basic "attack failed" result instead of None
             return {
-                "original_image": self.np_to_base64(np.clip(image[0] * 0.5 + 0.5, 0, 1)),
-                "perturbation_image": self.np_to_base64(np.zeros_like(image[0])),
-                "adversarial_image": self.np_to_base64(np.clip(image[0] * 0.5 + 0.5, 0, 1)),
+                **self.encode_display_images(
+                    np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                    np.zeros_like(image[0]),
+                    np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                    encoder
+                ),
                 "orig_class": orig_class,
                 "adv_class": orig_class,  # Same as original since attack failed
                 "orig_conf": float(orig_conf),
                 "adv_conf": float(orig_conf),  # Same as original since attack failed
                 "epsilon_used": 0.0,
                 "attack_success": False,
+                "forward_passes": passes.count,
                 "error": f"Failed to create perturbation: {str(e)}"
             }
 
@@ -186,12 +795,16 @@ class FGSM:
         best_adv_image = None
         best_adv_class = None
         best_adv_conf = None
+        max_succeeded = False
+        max_probs = None
 
         # Try to perturb with maximum epsilon first to see if attack is possible
         try:
             max_adv_image = tf.clip_by_value(image + epsilon_max * perturbations, -1, 1)
-            max_probs = self.model.predict(max_adv_image, verbose=0)
+            max_probs = passes.predict(max_adv_image)
             _, max_class, max_conf = self.get_imagenet_label(max_probs)
+            max_succeeded = max_class != orig_class and max_conf >= min_confidence
+            passes.report(epsilon_max, max_succeeded)
             
             print(f"Testing max epsilon {epsilon_max}: class={max_class}, conf={max_conf*100:.2f}%")
             
@@ -202,10 +815,13 @@ class FGSM:
                 
                 # Try forcing a higher epsilon for images that are hard to attack
                 forced_epsilon = 0.5  # Use a significant perturbation 
-                print(f"Trying a forced higher epsilon of {forced_epsilon}...")
-                forced_adv_image = tf.clip_by_value(image + forced_epsilon * perturbations, -1, 1)
-                forced_probs = self.model.predict(forced_adv_image, verbose=0)
-                _, forced_class, forced_conf = self.get_imagenet_label(forced_probs)
+                forced_class, forced_conf = orig_class, 0.0
+                if not passes.exhausted():
+                    print(f"Trying a forced higher epsilon of {forced_epsilon}...")
+                    forced_adv_image = tf.clip_by_value(image + forced_epsilon * perturbations, -1, 1)
+                    forced_probs = passes.predict(forced_adv_image)
+                    _, forced_class, forced_conf = self.get_imagenet_label(forced_probs)
+                    passes.report(forced_epsilon, forced_class != orig_class and forced_conf >= min_confidence)
                 
                 if forced_class != orig_class and forced_conf >= min_confidence:
                     print(f"✓ Forced epsilon {forced_epsilon} worked! Class: {forced_class}, Conf: {forced_conf*100:.2f}%")
@@ -215,75 +831,80 @@ class FGSM:
                     best_adv_conf = forced_conf
                 else:
                     # Return a basic result with the original image
+                    if scorer is not None:
+                        return full_precision_search("TFLite scoring found no adversarial example")
                     print(f"⚠ Unable to find adversarial example. Using original with warning.")
                     return {
-                        "original_image": self.np_to_base64(np.clip(image[0] * 0.5 + 0.5, 0, 1)),
-                        "perturbation_image": self.np_to_base64(np.clip(perturbations[0] * 0.5 + 0.5, 0, 1)),
-                        "adversarial_image": self.np_to_base64(np.clip(max_adv_image[0] * 0.5 + 0.5, 0, 1)),
+                        **self.encode_display_images(
+                            np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                            np.clip(perturbations[0] * 0.5 + 0.5, 0, 1),
+                            np.clip(max_adv_image[0] * 0.5 + 0.5, 0, 1),
+                            encoder
+                        ),
                         "orig_class": orig_class,
                         "adv_class": max_class,
                         "orig_conf": float(orig_conf),
                         "adv_conf": float(max_conf),
                         "epsilon_used": epsilon_max,
                         "attack_success": False,
+                        "forward_passes": passes.count,
                         "warning": "Could not find an effective adversarial example that changes the class."
                     }
+        except ForwardPassBudgetExhausted:
+            print("Forward-pass budget spent before the max epsilon probe")
         except Exception as e:
             print(f"ERROR testing max epsilon: {e}")
             # Continue with the search anyway
 
-        # Step 1: Coarse search (larger step to quickly find a good epsilon range)
-        print("Starting coarse search...")
-        epsilon = epsilon_min
-        while epsilon <= epsilon_max:
-            try:
-                adv_image = tf.clip_by_value(image + epsilon * perturbations, -1, 1)
-                adv_probs = self.model.predict(adv_image, verbose=0)
-                _, adv_class, adv_conf = self.get_imagenet_label(adv_probs)
-
-                print(f"Coarse Search: Trying ε = {epsilon:.5f} -> Class: {adv_class}, Confidence: {adv_conf*100:.2f}%")
+        epsilon_bracket = None
+        if search_strategy == 'bisect':
+            # A successful max (or forced) probe is the upper end of the bracket
+            if best_epsilon is None and max_succeeded:
+                best_epsilon, best_adv_image, best_adv_class, best_adv_conf = epsilon_max, max_adv_image, max_class, max_conf
+            if best_epsilon is not None:
+                print("Starting bisection search...")
+                found, epsilon_bracket = self._bisect_search(
+                    passes, image, perturbations, epsilon_min,
+                    (best_epsilon, best_adv_image, best_adv_class, best_adv_conf),
+                    orig_class, min_confidence, tolerance
+                )
+                best_epsilon, best_adv_image, best_adv_class, best_adv_conf = found
+        else:
+            def search(epsilons, label):
+                if search_strategy == 'batched':
+                    return self._batched_search(passes, image, perturbations, epsilons, orig_class, min_confidence, sweep_memory_mb)
+                return self._sequential_search(passes, image, perturbations, epsilons, orig_class, min_confidence, label)
 
-                # If we find a misclassification with sufficient confidence, stop
-                if adv_class != orig_class and adv_conf >= min_confidence:
-                    print(f"  ✓ Coarse Search: Attack succeeded with sufficient confidence!")
-                    best_epsilon = epsilon
-                    best_adv_image = adv_image
-                    best_adv_class = adv_class
-                    best_adv_conf = adv_conf
-                    break
-            except Exception as e:
-                print(f"Error in coarse search at epsilon={epsilon}: {e}")
-                # Continue with next epsilon
-            
-            epsilon += coarse_step
+            # Step 1: Coarse search (larger step to quickly find a good epsilon range)
+            print("Starting coarse search...")
+            found = search(self._epsilon_grid(epsilon_min, epsilon_max, coarse_step), "Coarse Search")
+            if found is not None:
+                print(f"  ✓ Coarse Search: Attack succeeded with sufficient confidence!")
+                best_epsilon, best_adv_image, best_adv_class, best_adv_conf = found
 
-        # Step 2: Fine search if we found something in coarse search
-        if best_epsilon is not None:
-            print("Starting fine search...")
-            # Fine search (narrowing down epsilon in small steps)
-            epsilon_start = max(epsilon_min, best_epsilon - coarse_step)  # Start from the last candidate
-            epsilon_end = min(epsilon_max, best_epsilon)  # Don't search higher than what we know works
-            epsilon = epsilon_start
+            # Step 2: Fine search if we found something in coarse search
+            if best_epsilon is not None:
+                print("Starting fine search...")
+                # Fine search (narrowing down epsilon in small steps)
+                epsilon_start = max(epsilon_min, best_epsilon - coarse_step)  # Start from the last candidate
+                epsilon_end = min(epsilon_max, best_epsilon)  # Don't search higher than what we know works
+                found = search(self._epsilon_grid(epsilon_start, epsilon_end, fine_step), "Fine Search")
+                if found is not None:
+                    best_epsilon, best_adv_image, best_adv_class, best_adv_conf = found
 
-            while epsilon <= epsilon_end:
-                try:
-                    adv_image = tf.clip_by_value(image + epsilon * perturbations, -1, 1)
-                    adv_probs = self.model.predict(adv_image, verbose=0)
-                    _, adv_class, adv_conf = self.get_imagenet_label(adv_probs)
-
-                    print(f"Fine Search: Trying ε = {epsilon:.6f} -> Class: {adv_class}, Confidence: {adv_conf*100:.2f}%")
-
-                    if adv_class != orig_class and adv_conf >= min_confidence:
-                        best_epsilon = epsilon
-                        best_adv_image = adv_image
-                        best_adv_class = adv_class
-                        best_adv_conf = adv_conf
-                        break
-                except Exception as e:
-                    print(f"Error in fine search at epsilon={epsilon}: {e}")
-                    # Continue with next epsilon
-                
-                epsilon += fine_step
+        if scorer is not None:
+            if best_epsilon is None:
+                return full_precision_search("TFLite scoring found no adversarial example")
+            # Confirm the chosen epsilon with the full-precision model
+            confirm_probs = self.predict(best_adv_image)
+            passes.count += 1
+            _, confirmed_class, confirmed_conf = self.get_imagenet_label(confirm_probs)
+            if confirmed_class != orig_class and confirmed_conf >= min_confidence:
+                best_adv_class, best_adv_conf = confirmed_class, confirmed_conf
+            else:
+                return full_precision_search(
+                    f"TFLite candidate ε = {best_epsilon:.6f} not confirmed by the full model ({confirmed_class})"
+                )
 
         end_time = time.time()
         duration = end_time - start_time
@@ -291,14 +912,20 @@ class FGSM:
         if best_epsilon is not None:
             print(f"\n✅ Attack successful! Minimum ε ≈ {best_epsilon:.6f}")
             print(f"Adversarial Class: {best_adv_class} | Confidence: {best_adv_conf * 100:.2f}%")
-            print(f"⏱️ Auto-tune completed in {duration:.2f} seconds")
+            print(f"⏱️ Auto-tune completed in {duration:.2f} seconds using {passes.count} forward passes")
 
             results = self.display_attack_results(
                 image, perturbations, best_adv_image,
-                orig_class, best_adv_class, orig_conf, best_adv_conf
+                orig_class, best_adv_class, orig_conf, best_adv_conf, encoder=encoder
             )
             results["epsilon_used"] = best_epsilon
             results["attack_success"] = True
+            results["forward_passes"] = passes.count
+            if scorer is not None:
+                results["scoring_backend"] = self.scoring_backend
+                results["scorer_confirmed"] = True
+            if epsilon_bracket is not None:
+                results["epsilon_bracket"] = epsilon_bracket
             return results
         else:
             print(f"\n❌ Attack failed. No epsilon in range caused misclassification with {min_confidence*100:.0f}% confidence.")
@@ -306,24 +933,167 @@ class FGSM:
             
             # Return a result even when auto-tune fails, using highest epsilon
             max_adv_image = tf.clip_by_value(image + epsilon_max * perturbations, -1, 1)
-            max_probs = self.model.predict(max_adv_image, verbose=0)
+            if max_probs is None and not passes.exhausted():
+                max_probs = passes.predict(max_adv_image)
+            if max_probs is None:
+                return self._budget_spent_result(image, perturbations, orig_class, orig_conf, passes.count, encoder)
             _, max_class, max_conf = self.get_imagenet_label(max_probs)
             
             return {
-                "original_image": self.np_to_base64(np.clip(image[0] * 0.5 + 0.5, 0, 1)),
-                "perturbation_image": self.np_to_base64(np.clip(perturbations[0] * 0.5 + 0.5, 0, 1)),
-                "adversarial_image": self.np_to_base64(np.clip(max_adv_image[0] * 0.5 + 0.5, 0, 1)),
+                **self.encode_display_images(
+                    np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                    np.clip(perturbations[0] * 0.5 + 0.5, 0, 1),
+                    np.clip(max_adv_image[0] * 0.5 + 0.5, 0, 1),
+                    encoder
+                ),
                 "orig_class": orig_class,
                 "adv_class": max_class,
                 "orig_conf": float(orig_conf),
                 "adv_conf": float(max_conf),
                 "epsilon_used": epsilon_max,
                 "attack_success": False,
+                "forward_passes": passes.count,
                 "warning": "Could not find a good adversarial example. Showing result with maximum epsilon."
             }
 
+    def _budget_spent_result(self, image, perturbations, orig_class, orig_conf, forward_passes, encoder):
+        """
+        Failed auto-tune result for when the forward-pass budget ran out before an epsilon could be scored.
+        """
+        return {
+            **self.encode_display_images(
+                np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                np.clip(perturbations[0] * 0.5 + 0.5, 0, 1),
+                np.clip(image[0] * 0.5 + 0.5, 0, 1),
+                encoder
+            ),
+            "orig_class": orig_class,
+            "adv_class": orig_class,
+            "orig_conf": float(orig_conf),
+            "adv_conf": float(orig_conf),
+            "epsilon_used": 0.0,
+            "attack_success": False,
+            "forward_passes": forward_passes,
+            "warning": "The forward-pass budget ran out before any epsilon could be scored."
+        }
+
+    def _epsilon_grid(self, start, stop, step):
+        """
+        Candidate epsilons in scan order, accumulated the same way as the original loops.
+        """
+        epsilons = []
+        epsilon = start
+        while epsilon <= stop:
+            epsilons.append(epsilon)
+            epsilon += step
+        return epsilons
+
+    def _try_epsilon(self, passes, image, perturbations, epsilon, orig_class, min_confidence, label):
+        """
+        Score a single epsilon; return (epsilon, adv_image, adv_class, adv_conf) if it succeeds.
+        """
+        try:
+            adv_image = tf.clip_by_value(image + epsilon * perturbations, -1, 1)
+            adv_probs = passes.predict(adv_image)
+            _, adv_class, adv_conf = self.get_imagenet_label(adv_probs)
+
+            print(f"{label}: Trying ε = {epsilon:.6f} -> Class: {adv_class}, Confidence: {adv_conf*100:.2f}%")
+
+            succeeded = adv_class != orig_class and adv_conf >= min_confidence
+            passes.report(epsilon, succeeded)
+            if succeeded:
+                return epsilon, adv_image, adv_class, adv_conf
+        except Exception as e:
+            print(f"Error in {label.lower()} at epsilon={epsilon}: {e}")
+        return None
+
+    def _sequential_search(self, passes, image, perturbations, epsilons, orig_class, min_confidence, label):
+        """
+        Try each epsilon with its own forward pass and return the first successful one.
+        """
+        for epsilon in epsilons:
+            if passes.exhausted():
+                print(f"{label} stopped by the forward-pass budget before ε = {epsilon:.6f}")
+                break
+            # If we find a misclassification with sufficient confidence, stop
+            found = self._try_epsilon(passes, image, perturbations, epsilon, orig_class, min_confidence, label)
+            if found is not None:
+                return found
+        return None
+
+    def _bisect_search(self, passes, image, perturbations, epsilon_min, upper, orig_class, min_confidence, tolerance):
+        """
+        Bisect between epsilon_min and the successful candidate upper until the
+        bracket is within tolerance or the forward-pass budget runs out.
+        Returns the smallest successful candidate found and the final [low, high] bracket.
+        """
+        best = upper
+        low, high = epsilon_min, upper[0]
+
+        # The lower end may already be enough on its own
+        if not passes.exhausted():
+            found = self._try_epsilon(passes, image, perturbations, low, orig_class, min_confidence, "Bisection")
+            if found is not None:
+                return found, [low, low]
+
+        while high - low > tolerance and not passes.exhausted():
+            epsilon = (low + high) / 2
+            found = self._try_epsilon(passes, image, perturbations, epsilon, orig_class, min_confidence, "Bisection")
+            if found is not None:
+                best = found
+                high = epsilon
+            else:
+                low = epsilon
+
+        if high - low > tolerance:
+            print(f"Bisection stopped by the forward-pass budget with bracket [{low:.6f}, {high:.6f}]")
+        return best, [low, high]
+
+    def _batched_search(self, passes, image, perturbations, epsilons, orig_class, min_confidence, sweep_memory_mb):
+        """
+        Score stacked candidate images a chunk at a time and return the first successful epsilon.
+        """
+        image_bytes = int(np.prod(image.shape[1:])) * 4
+        chunk_size = max(1, int(sweep_memory_mb * 1024 * 1024) // image_bytes)
+
+        for chunk_start in range(0, len(epsilons), chunk_size):
+            if passes.exhausted():
+                print(f"Batched Search stopped by the forward-pass budget before ε = {epsilons[chunk_start]:.6f}")
+                break
+            chunk = epsilons[chunk_start:chunk_start + chunk_size]
+            try:
+                chunk_epsilons = tf.reshape(tf.constant(chunk, dtype=tf.float32), (-1, 1, 1, 1))
+                adv_images = tf.clip_by_value(image + chunk_epsilons * perturbations, -1, 1)
+                adv_probs = passes.predict(adv_images)
+            except Exception as e:
+                print(f"Error in batched search at epsilons {chunk[0]}..{chunk[-1]}: {e}")
+                continue
+            print(f"Batched Search: Scored {len(chunk)} candidates from ε = {chunk[0]:.6f} to {chunk[-1]:.6f}")
+
+            # Keep scan order so the smallest successful epsilon wins
+            for i, epsilon in enumerate(chunk):
+                _, adv_class, adv_conf = self.get_imagenet_label(adv_probs[i:i + 1])
+                if adv_class != orig_class and adv_conf >= min_confidence:
+                    passes.report(epsilon, True)
+                    return epsilon, adv_images[i:i + 1], adv_class, adv_conf
+            passes.report(chunk[-1], False)
+        return None
+
+    def encode_display_images(self, original, perturbation, adversarial, encoder=None):
+        """
+        Encode three [0..1] display images concurrently with encoder (PNG by default).
+        """
+        encoder = encoder or ImageEncoder()
+        b64_original, b64_pert, b64_adv = encoder.render_all([original, perturbation, adversarial])
+        return {
+            "original_image": b64_original,
+            "perturbation_image": b64_pert,
+            "adversarial_image": b64_adv,
+            "image_format": encoder.image_format,
+        }
+
     def display_attack_results(self, original_image, perturbation, adversarial_image, 
-                               orig_class, adv_class, orig_conf, adv_conf, output_dir=None):
+                               orig_class, adv_class, orig_conf, adv_conf, output_dir=None, encoder=None):
         """
         Return separate Base64 images for original, perturbation, and adversarial images.
         """
@@ -332,21 +1102,59 @@ class FGSM:
         display_adv = np.clip(adversarial_image[0] * 0.5 + 0.5, 0, 1)
         display_pert = np.clip(perturbation[0] * 0.5 + 0.5, 0, 1)
 
-        # Convert each to Base64
-        b64_original = self.np_to_base64(display_original)
-        b64_pert = self.np_to_base64(display_pert)
-        b64_adv = self.np_to_base64(display_adv)
-
         return {
-            "original_image": b64_original,
-            "perturbation_image": b64_pert,
-            "adversarial_image": b64_adv,
+            **self.encode_display_images(display_original, display_pert, display_adv, encoder),
             "orig_class": orig_class,
             "adv_class": adv_class,
             "orig_conf": float(orig_conf),
             "adv_conf": float(adv_conf),
         }
 
+class RemoteFGSM(FGSM):
+    """
+    FGSM engine whose forward and gradient passes run in the model server.
+
+    The front-end process only keeps the preprocessing and label decoding for
+    the model; attacks, auto-tune and iterative methods work unchanged because
+    they all go through predict() and gradient_and_prediction().
+    """
+
+    def __init__(self, server, model_name='mobilenet_v2', epsilon=0.05):
+        self.server = server
+        # Quantized scoring and execution modes apply inside the workers
+        super().__init__(epsilon=epsilon, model_name=model_name, scoring_backend='keras')
+
+    def load_model(self):
+        self.load_preprocessing()
+        self.cold_start["source"] = "model_server"
+
+    def build_compiled_steps(self):
+        pass
+
+    def predict(self, images):
+        start_time = time.perf_counter()
+        probs = self.server.predict(self.model_name, np.asarray(images, dtype=np.float32))
+        self.latency.record('predict', time.perf_counter() - start_time)
+        return probs
+
+    def gradient_and_prediction(self, images, labels):
+        start_time = time.perf_counter()
+        gradient, probs = self.server.gradient_and_prediction(
+            self.model_name, np.asarray(images, dtype=np.float32), np.asarray(labels, dtype=np.float32)
+        )
+        self.latency.record('gradient', time.perf_counter() - start_time)
+        return tf.convert_to_tensor(gradient), tf.convert_to_tensor(probs)
+
+    def memory_footprint(self):
+        # The weights live in the worker processes
+        return 0
+
+    def warm_up(self):
+        start_time = time.time()
+        self.server.load(self.model_name)
+        self.cold_start["warm_up_seconds"] = time.time() - start_time
+        print(f"Loaded {self.model_name} in the model server in {time.time() - start_time:.2f} seconds")
+
 def main():
     # image_path = "image/animals/val/dog/dog1.jpg"  # Change image path here
     image_path = "image/ferrari.jpeg"  # Change image path here
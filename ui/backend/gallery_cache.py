@@ -0,0 +1,98 @@
+"""
+In-process cache of the serialized /available-images response.
+
+The gallery table rarely changes, so the JSON body is built once and served
+from memory until it is ttl_seconds old or the gallery is invalidated. Each
+body carries a strong ETag so clients can revalidate with If-None-Match.
+
+Every gunicorn worker has its own cache, so invalidation goes through a
+version file shared by all of them: invalidate() touches it and each worker
+reloads once it sees the modification time change. After editing the gallery
+table, run:
+    python gallery_cache.py invalidate
+"""
+import os
+import sys
+import time
+import hashlib
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class GalleryCache:
+    """Single-entry cache of a response body and its ETag"""
+
+    def __init__(self, ttl_seconds=None, version_file=None, clock=time.monotonic):
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('GALLERY_CACHE_TTL_SECONDS', '300'))
+        self.ttl_seconds = ttl_seconds
+        self.version_file = version_file or os.getenv('GALLERY_VERSION_FILE', 'gallery.version')
+        self._clock = clock
+        self._entry = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _version(self):
+        try:
+            return os.stat(self.version_file).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, load):
+        """
+        Returns (body, etag). load() builds the body as bytes when the cached
+        one is missing, expired or from an older gallery version; if it
+        raises, nothing is cached.
+        """
+        with self._lock:
+            version = self._version()
+            entry = self._entry
+            if entry is not None and entry[2] == version and self._clock() < entry[3]:
+                self.hits += 1
+                return entry[0], entry[1]
+            self.misses += 1
+            # Loaded under the lock so concurrent misses run one query
+            body = load()
+            etag = hashlib.sha256(body).hexdigest()[:32]
+            self._entry = (body, etag, version, self._clock() + self.ttl_seconds)
+            return body, etag
+
+    def invalidate(self):
+        """Drop the cached body here and in every other process sharing the version file"""
+        with self._lock:
+            self._entry = None
+            self.invalidations += 1
+            with open(self.version_file, 'a'):
+                pass
+            os.utime(self.version_file, None)
+
+    def clear(self):
+        """Drop the cached body in this process only"""
+        with self._lock:
+            self._entry = None
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached": self._entry is not None,
+                "bytes": len(self._entry[0]) if self._entry else 0,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+
+# Shared by every request thread in this process
+gallery_cache = GalleryCache()
+
+if __name__ == '__main__':
+    if sys.argv[1:] != ['invalidate']:
+        sys.exit("Usage: python gallery_cache.py invalidate")
+    gallery_cache.invalidate()
+    print(f"Gallery cache invalidated ({gallery_cache.version_file})")
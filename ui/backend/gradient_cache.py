@@ -0,0 +1,95 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class GradientCache:
+    """
+    LRU cache of the epsilon-independent part of an FGSM attack.
+
+    Entries are keyed by (image hash, model name) and hold the original
+    prediction and the sign of the loss gradient. The sign is stored as int8,
+    a quarter of the float32 size. Entries expire after ttl_seconds and the
+    least recently used ones are evicted to keep the cache under max_bytes.
+    """
+
+    def __init__(self, max_bytes=None, ttl_seconds=None, clock=time.monotonic):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('GRADIENT_CACHE_MB', '64')) * 1024 * 1024)
+        if ttl_seconds is None:
+            ttl_seconds = float(os.getenv('GRADIENT_CACHE_TTL_SECONDS', '600'))
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return (image_probs, sign_gradient) or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry[0] > self.ttl_seconds:
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key, image_probs, sign_gradient):
+        image_probs = np.array(image_probs, dtype=np.float32)
+        sign_gradient = np.asarray(sign_gradient).astype(np.int8)
+        size = image_probs.nbytes + sign_gradient.nbytes
+        if size > self.max_bytes:
+            return
+        # Cached arrays are shared between requests, so make them read-only
+        image_probs.setflags(write=False)
+        sign_gradient.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (self._clock(), image_probs, sign_gradient, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.current_bytes -= self._entries.pop(key)[3]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every FGSM engine in this process; keys include the model name
+gradient_cache = GradientCache()
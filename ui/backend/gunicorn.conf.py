@@ -0,0 +1,26 @@
+import os
+import tempfile
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', '2'))
+# Threads let a worker serve other requests while one waits on a model
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+# Result image URLs (responseMode=urls) must resolve in whichever worker
+# serves them, so several workers share one artifact directory by default
+if workers > 1:
+    os.environ.setdefault('ARTIFACT_DIR', os.path.join(tempfile.gettempdir(), 'fgsm-artifacts'))
+# Auto-tune and batch attacks can run for minutes on the larger models
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+# Import the app and TensorFlow and fetch model weights once in the master (see wsgi.py)
+preload_app = True
+accesslog = '-'
+
+def post_fork(server, worker):
+    from wsgi import prepare_worker
+    prepare_worker(workers=server.cfg.workers, threads=server.cfg.threads)
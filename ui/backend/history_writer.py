@@ -0,0 +1,168 @@
+import os
+import time
+import atexit
+import threading
+from collections import deque
+from dotenv import load_dotenv
+from db import execute_many
+
+# Load environment variables
+load_dotenv()
+
+HISTORY_INSERT = """
+    INSERT INTO attack_history
+    (user_id, model_used, epsilon_used, orig_class, orig_conf, adv_class, adv_conf)
+    VALUES (%s, %s, %s, %s, %s, %s, %s)
+"""
+
+def insert_history_rows(rows):
+    return execute_many(HISTORY_INSERT, rows)
+
+class HistoryWriter:
+    """
+    Write-behind queue for attack_history rows.
+
+    record() only appends the row to an in-memory queue, so saving history no
+    longer adds a database round trip to the attack request. A background
+    thread writes the queue with one multi-row INSERT once flush_rows rows are
+    waiting or the oldest has waited flush_ms. At most max_pending rows are
+    held; rows recorded beyond that are dropped and counted. close() (also run
+    at exit) writes whatever is still queued.
+    """
+
+    def __init__(self, write=None, flush_rows=None, flush_ms=None, max_pending=None):
+        self.write = write or insert_history_rows
+        self.flush_rows = flush_rows or int(os.getenv('HISTORY_FLUSH_ROWS', '50'))
+        if flush_ms is None:
+            flush_ms = float(os.getenv('HISTORY_FLUSH_MS', '500'))
+        self.flush_interval = flush_ms / 1000.0
+        self.max_pending = max_pending or int(os.getenv('HISTORY_QUEUE_LIMIT', '10000'))
+        self._rows = deque()
+        self._oldest = None
+        self._condition = threading.Condition()
+        self._worker = None
+        self._pid = None
+        self._closed = False
+        self._flushing = 0
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self.flush_seconds = 0.0
+        self.max_flush_seconds = 0.0
+        atexit.register(self.close)
+
+    def _ensure_worker(self):
+        # Started on first use, and again in a forked worker, where the
+        # parent's thread does not exist
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._rows.clear()
+            self._oldest = None
+            self._worker = threading.Thread(target=self._run, name="history-writer", daemon=True)
+            self._worker.start()
+
+    def record(self, row):
+        """Queue one attack_history row; returns False if it had to be dropped"""
+        with self._condition:
+            self._ensure_worker()
+            if self._closed or len(self._rows) >= self.max_pending:
+                self.dropped += 1
+                if self.dropped == 1 or self.dropped % 1000 == 0:
+                    print(f"History queue is full or closed, {self.dropped} rows dropped so far")
+                return False
+            if not self._rows:
+                self._oldest = time.monotonic()
+            self._rows.append(row)
+            self.recorded += 1
+            if len(self._rows) >= self.flush_rows:
+                self._condition.notify()
+            return True
+
+    def _take_batch(self):
+        batch = [self._rows.popleft() for _ in range(min(self.flush_rows, len(self._rows)))]
+        self._oldest = time.monotonic() if self._rows else None
+        self._flushing += len(batch)
+        return batch
+
+    def _flush(self, batch):
+        start_time = time.monotonic()
+        try:
+            result = self.write(batch)
+        except Exception as e:
+            print(f"Error saving history: {e}")
+            result = None
+        elapsed = time.monotonic() - start_time
+        with self._condition:
+            self._flushing -= len(batch)
+            self.flushes += 1
+            self.flush_seconds += elapsed
+            self.max_flush_seconds = max(self.max_flush_seconds, elapsed)
+            if result is None:
+                self.failed += len(batch)
+            else:
+                self.written += len(batch)
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._rows and (self._closed or len(self._rows) >= self.flush_rows):
+                        break
+                    if self._closed:
+                        return
+                    if self._rows:
+                        timeout = self._oldest + self.flush_interval - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._condition.wait(timeout)
+                batch = self._take_batch()
+            self._flush(batch)
+
+    def flush(self, timeout=None):
+        """Wait until every row recorded so far has been written (or failed)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            if self._rows:
+                # Write now rather than waiting for the time trigger
+                self._oldest = time.monotonic() - self.flush_interval
+                self._condition.notify_all()
+            while self._rows or self._flushing:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            return True
+
+    def close(self, timeout=10):
+        """Write the queued rows and stop the background thread"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+            worker = self._worker if self._pid == os.getpid() else None
+        if worker is not None:
+            worker.join(timeout)
+
+    def stats(self):
+        with self._condition:
+            return {
+                "queued": len(self._rows) + self._flushing,
+                "max_pending": self.max_pending,
+                "oldest_queued_ms": round((time.monotonic() - self._oldest) * 1000, 1) if self._oldest else 0.0,
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "mean_flush_ms": round(self.flush_seconds / self.flushes * 1000, 2) if self.flushes else 0.0,
+                "max_flush_ms": round(self.max_flush_seconds * 1000, 2),
+            }
+
+# Shared by every request thread in this process
+history_writer = HistoryWriter()
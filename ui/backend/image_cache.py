@@ -0,0 +1,75 @@
+import os
+import threading
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class ImageCache:
+    """
+    LRU cache of decoded, resized images.
+
+    Entries are keyed by (SHA-256 of the raw image bytes, model input size) and
+    hold the compact uint8 pixel array, so re-attacking the same image skips
+    decoding and resizing. The total size of the cached arrays is kept under
+    max_bytes by evicting the least recently used entries.
+    """
+
+    def __init__(self, max_bytes=None):
+        if max_bytes is None:
+            max_bytes = int(float(os.getenv('IMAGE_CACHE_MB', '64')) * 1024 * 1024)
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            pixels = self._entries.get(key)
+            if pixels is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pixels
+
+    def put(self, key, pixels):
+        if pixels.nbytes > self.max_bytes:
+            return
+        # Cached arrays are shared between requests, so make them read-only
+        pixels.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = pixels
+            self.current_bytes += pixels.nbytes
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+            }
+
+
+# Shared by every FGSM engine in this process
+image_cache = ImageCache()
@@ -0,0 +1,102 @@
+import os
+import io
+import time
+import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from PIL import Image
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+OUTPUT_FORMATS = ('png', 'webp', 'jpeg')
+
+# Quality used when a request does not give one. For PNG this is the zlib
+# compression level (0-9); for WebP and JPEG it is the 1-100 quality.
+DEFAULT_QUALITY = {'png': 6, 'webp': 80, 'jpeg': 90}
+
+# Shared by all requests; Pillow releases the GIL while encoding, so the
+# images of one result are compressed in parallel
+_encode_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv('ENCODE_WORKERS', '4')),
+    thread_name_prefix='image-encode',
+)
+
+class EncodeTimings:
+    """
+    Per-format encode counters: number of images, total and slowest encode time, output bytes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._formats = {}
+
+    def record(self, image_format, seconds, size):
+        with self._lock:
+            entry = self._formats.setdefault(image_format, {"images": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0})
+            entry["images"] += 1
+            entry["seconds"] += seconds
+            entry["max_seconds"] = max(entry["max_seconds"], seconds)
+            entry["bytes"] += size
+
+    def stats(self):
+        with self._lock:
+            return {
+                image_format: dict(entry,
+                                   mean_ms=1000 * entry["seconds"] / entry["images"],
+                                   mean_bytes=entry["bytes"] / entry["images"])
+                for image_format, entry in self._formats.items()
+            }
+
+encode_timings = EncodeTimings()
+
+class ImageEncoder:
+    """
+    Encodes float [0..1] display images for attack results.
+
+    image_format is 'png', 'webp' or 'jpeg'. quality is the PNG compression
+    level (0-9) or the WebP/JPEG quality (1-100); None uses DEFAULT_QUALITY.
+    render() returns a Base64 string; render_all() encodes several images
+    concurrently on the shared encode pool.
+    """
+
+    def __init__(self, image_format='png', quality=None):
+        image_format = (image_format or 'png').lower()
+        if image_format == 'jpg':
+            image_format = 'jpeg'
+        if image_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {image_format}")
+        if quality is None or quality == '':
+            quality = DEFAULT_QUALITY[image_format]
+        quality = int(quality)
+        low, high = (0, 9) if image_format == 'png' else (1, 100)
+        if not low <= quality <= high:
+            raise ValueError(f"Quality for {image_format} must be between {low} and {high}")
+        self.image_format = image_format
+        self.quality = quality
+
+    @property
+    def mimetype(self):
+        return f"image/{self.image_format}"
+
+    def encode(self, img_array):
+        """Encode a float [0..1] image array to bytes in this encoder's format."""
+        start_time = time.perf_counter()
+        img_array_255 = np.clip(np.asarray(img_array) * 255, 0, 255).astype(np.uint8)
+        pil_img = Image.fromarray(img_array_255)
+        buffer = io.BytesIO()
+        if self.image_format == 'png':
+            pil_img.save(buffer, format='PNG', compress_level=self.quality)
+        else:
+            pil_img.save(buffer, format=self.image_format.upper(), quality=self.quality)
+        data = buffer.getvalue()
+        encode_timings.record(self.image_format, time.perf_counter() - start_time, len(data))
+        return data
+
+    def render(self, img_array):
+        """The value placed in the JSON result for one image."""
+        return base64.b64encode(self.encode(img_array)).decode('utf-8')
+
+    def render_all(self, img_arrays):
+        return list(_encode_pool.map(self.render, img_arrays))
@@ -0,0 +1,110 @@
+import time
+import numpy as np
+import tensorflow as tf
+from model_catalog import ITERATIVE_METHODS
+
+class IterativeAttack:
+    """
+    Multi-step sign-gradient attacks built on an FGSM engine's compiled gradient step.
+
+    'bim' repeats the FGSM step with a small step size, 'pgd' does the same from a
+    random start inside the epsilon ball, and 'mifgsm' accumulates a decayed,
+    L1-normalised gradient momentum before taking the sign. After every step the
+    perturbation is projected back into the L-infinity ball of radius epsilon.
+
+    Samples are attacked as a batch. A sample whose prediction has already left
+    its original class is dropped from later iterations, so each iteration only
+    spends forward and backward passes on the samples still being attacked.
+    """
+
+    def __init__(self, engine, method='bim', epsilon=0.05, step_size=None, iterations=10, decay=1.0):
+        if method not in ITERATIVE_METHODS:
+            raise ValueError(f"Unsupported attack method: {method}")
+        self.engine = engine
+        self.method = method
+        self.epsilon = float(epsilon)
+        self.iterations = max(1, int(iterations))
+        self.step_size = float(step_size) if step_size else self.epsilon / self.iterations
+        self.decay = float(decay)
+
+    def run(self, images, image_probs=None):
+        """
+        Attack a batch of preprocessed images.
+
+        Returns a dict with the original and adversarial probabilities, the
+        adversarial images, a per-sample success mask, the iteration each sample
+        stopped at, and per-iteration timing and active-sample counts.
+        """
+        images = tf.convert_to_tensor(images, dtype=tf.float32)
+        if image_probs is None:
+            image_probs = self.engine.predict(images)
+        num_classes = image_probs.shape[-1]
+        orig_labels = np.argmax(image_probs, axis=-1)
+        targets = tf.one_hot(orig_labels, num_classes)
+
+        originals = images.numpy()
+        adv_images = originals.copy()
+        if self.method == 'pgd':
+            noise = np.random.uniform(-self.epsilon, self.epsilon, size=adv_images.shape).astype(np.float32)
+            adv_images = np.clip(adv_images + noise, -1, 1)
+        momentum = np.zeros_like(adv_images)
+        adv_probs = np.array(image_probs, copy=True)
+
+        batch_size = adv_images.shape[0]
+        active = np.arange(batch_size)
+        success = np.zeros(batch_size, dtype=bool)
+        stopped_at = np.full(batch_size, self.iterations)
+        iteration_stats = []
+
+        for iteration in range(1, self.iterations + 1):
+            if len(active) == 0:
+                break
+            start_time = time.time()
+            active_count = len(active)
+
+            # One pass gives both the gradient and the prediction at the current point
+            gradient, prediction = self.engine.gradient_and_prediction(
+                adv_images[active], tf.gather(targets, active)
+            )
+            gradient, prediction = gradient.numpy(), prediction.numpy()
+            fooled = np.argmax(prediction, axis=-1) != orig_labels[active]
+
+            # Samples that are already misclassified stop here
+            adv_probs[active[fooled]] = prediction[fooled]
+            success[active[fooled]] = True
+            stopped_at[active[fooled]] = iteration - 1
+            keep = ~fooled
+            active, gradient = active[keep], gradient[keep]
+
+            if len(active):
+                if self.method == 'mifgsm':
+                    l1 = np.mean(np.abs(gradient), axis=(1, 2, 3), keepdims=True) + 1e-12
+                    momentum[active] = self.decay * momentum[active] + gradient / l1
+                    step = np.sign(momentum[active])
+                else:
+                    step = np.sign(gradient)
+                stepped = adv_images[active] + self.step_size * step
+                # Project back into the epsilon ball and the valid input range
+                delta = np.clip(stepped - originals[active], -self.epsilon, self.epsilon)
+                adv_images[active] = np.clip(originals[active] + delta, -1, 1)
+
+            iteration_stats.append({
+                "iteration": iteration,
+                "active": active_count,
+                "stopped": int(fooled.sum()),
+                "seconds": time.time() - start_time,
+            })
+
+        # Only the samples still active after the last step need a final prediction
+        if len(active):
+            adv_probs[active] = self.engine.predict(adv_images[active])
+            success[active] = np.argmax(adv_probs[active], axis=-1) != orig_labels[active]
+
+        return {
+            "image_probs": image_probs,
+            "adversarial_images": tf.convert_to_tensor(adv_images),
+            "adv_probs": adv_probs,
+            "success": success,
+            "stopped_at": stopped_at,
+            "iteration_stats": iteration_stats,
+        }
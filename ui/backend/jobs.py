@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed')
+
+class JobQueueFull(Exception):
+    pass
+
+class JobManager:
+    """
+    Background jobs for long attacks such as auto-tune, persisted in SQLite.
+
+    submit() stores the job with its parameters and image and returns its id
+    straight away; a bounded thread pool runs it with runner(params, image_bytes,
+    progress). The runner calls progress(dict) as it goes and returns the result
+    dict. A job submitted with a user_id can only be read back by that user.
+    Because everything needed to run a job is stored, recover() can
+    requeue jobs that were queued or running when the process stopped.
+    """
+
+    def __init__(self, runner, db_path=None, max_workers=None, max_pending=None,
+                 retention_seconds=None, progress_interval=0.5):
+        self.runner = runner
+        self.db_path = db_path or os.getenv('JOBS_DB_PATH', 'jobs.sqlite3')
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '2'))
+        self.max_pending = max_pending or int(os.getenv('JOB_QUEUE_LIMIT', '32'))
+        if retention_seconds is None:
+            retention_seconds = float(os.getenv('JOB_RETENTION_SECONDS', '86400'))
+        self.retention_seconds = retention_seconds
+        self.progress_interval = progress_interval
+        self._pool = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per operation; commits on success
+        connection = sqlite3.connect(self.db_path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def _ensure_ready(self):
+        # The database and pool are created on first use, not at import time
+        with self._lock:
+            if self._db_ready:
+                return
+            with self._connect() as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        params TEXT NOT NULL,
+                        user_id INTEGER,
+                        image BLOB,
+                        progress TEXT,
+                        result TEXT,
+                        error TEXT,
+                        created_at REAL NOT NULL,
+                        updated_at REAL NOT NULL
+                    )
+                    """
+                )
+                # Databases created before jobs had owners
+                columns = {row["name"] for row in connection.execute("PRAGMA table_info(jobs)")}
+                if "user_id" not in columns:
+                    connection.execute("ALTER TABLE jobs ADD COLUMN user_id INTEGER")
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='attack-job')
+            self._db_ready = True
+
+    def submit(self, kind, params, image_bytes, user_id=None):
+        """Store a new job, owned by user_id if given, and queue it. Raises JobQueueFull when too many jobs are waiting."""
+        self._ensure_ready()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"Too many pending jobs (limit {self.max_pending})")
+            self._pending += 1
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO jobs (id, kind, status, params, user_id, image, created_at, updated_at) VALUES (?, ?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), user_id, image_bytes, now, now)
+            )
+        self._pool.submit(self._run, job_id)
+        self._purge_expired()
+        return job_id
+
+    def get(self, job_id, user_id=None):
+        """
+        Status, progress and (once finished) result of a job, or None if there
+        is no such job or it belongs to a user other than user_id.
+        """
+        self._ensure_ready()
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT id, kind, status, user_id, progress, result, error, created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+        if row is None or (row["user_id"] is not None and row["user_id"] != user_id):
+            return None
+        return {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "progress": json.loads(row["progress"]) if row["progress"] else None,
+            "result": json.loads(row["result"]) if row["result"] else None,
+            "error": row["error"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+        }
+
+    def recover(self, stale_seconds=None):
+        """
+        Requeue jobs left queued, or running without progress for stale_seconds,
+        by a process that has stopped. Returns the number of jobs requeued.
+        """
+        self._ensure_ready()
+        if stale_seconds is None:
+            stale_seconds = float(os.getenv('JOB_STALE_SECONDS', '120'))
+        cutoff = time.time() - stale_seconds
+        with self._connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'queued' WHERE status = 'running' AND updated_at < ?", (cutoff,)
+            )
+            job_ids = [row["id"] for row in connection.execute("SELECT id FROM jobs WHERE status = 'queued'")]
+        for job_id in job_ids:
+            with self._lock:
+                self._pending += 1
+            self._pool.submit(self._run, job_id)
+        if job_ids:
+            print(f"Requeued {len(job_ids)} attack jobs")
+        return len(job_ids)
+
+    def _run(self, job_id):
+        try:
+            with self._connect() as connection:
+                # Claim the job so another process recovering the same database skips it
+                claimed = connection.execute(
+                    "UPDATE jobs SET status = 'running', updated_at = ? WHERE id = ? AND status = 'queued'",
+                    (time.time(), job_id)
+                ).rowcount
+                row = connection.execute("SELECT params, image FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not claimed or row is None:
+                return
+
+            last_write = [0.0]
+
+            def progress(update):
+                now = time.time()
+                if now - last_write[0] >= self.progress_interval:
+                    last_write[0] = now
+                    self._update(job_id, progress=json.dumps(update))
+
+            try:
+                result = self.runner(json.loads(row["params"]), row["image"], progress)
+            except Exception as e:
+                print(f"Attack job {job_id} failed: {e}")
+                self._update(job_id, status='failed', error=str(e), image=None)
+                return
+            if result is None:
+                self._update(job_id, status='failed', error='Attack failed', image=None)
+            else:
+                # The image is only needed to rerun the job, so drop it once done
+                self._update(job_id, status='succeeded', result=json.dumps(result), image=None)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as connection:
+            connection.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def _purge_expired(self):
+        cutoff = time.time() - self.retention_seconds
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND updated_at < ?", (cutoff,)
+            )
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+        counts = {}
+        if self._db_ready:
+            with self._connect() as connection:
+                counts = {row["status"]: row["count"] for row in
+                          connection.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status")}
+        return {
+            "workers": self.max_workers,
+            "pending": pending,
+            "max_pending": self.max_pending,
+            "jobs": counts,
+        }
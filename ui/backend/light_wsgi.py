@@ -0,0 +1,20 @@
+"""
+Lightweight entry point for the routes that never touch a model:
+    gunicorn --bind 0.0.0.0:5001 --workers 2 light_wsgi:app
+
+It serves the account, history, image-listing and model-info routes of the
+main app and nothing else, so its workers never import TensorFlow and start
+in well under a second. Attack, job and stats routes stay on wsgi:app.
+"""
+from flask import Flask
+from flask_cors import CORS
+import app as backend
+
+LIGHT_ENDPOINTS = ('register', 'login', 'verify', 'get_available_images', 'get_history', 'get_model_info')
+
+app = Flask(__name__)
+CORS(app, resources={r"/*": {"origins": "*"}})
+
+for rule in backend.app.url_map.iter_rules():
+    if rule.endpoint in LIGHT_ENDPOINTS:
+        app.add_url_rule(rule.rule, rule.endpoint, backend.app.view_functions[rule.endpoint], methods=rule.methods)
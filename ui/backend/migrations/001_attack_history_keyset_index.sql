@@ -0,0 +1,13 @@
+-- Index behind the keyset-paginated /history endpoint.
+--
+-- Each page is
+--   WHERE user_id = ? AND (created_at < ? OR (created_at = ? AND id < ?))
+--   ORDER BY created_at DESC, id DESC LIMIT ?
+-- which this index answers with a backward range scan that stops after LIMIT
+-- rows, so a page costs the same however much history a user has.
+--
+-- Apply once:
+--   mysql -h "$DB_HOST" -P "$DB_PORT" -u "$DB_USER" -p "$DB_NAME" < migrations/001_attack_history_keyset_index.sql
+
+CREATE INDEX idx_attack_history_user_created_id
+    ON attack_history (user_id, created_at, id);
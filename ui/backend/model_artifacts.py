@@ -0,0 +1,81 @@
+"""
+Locally exported models and the ImageNet label table.
+
+export_models.py writes <MODEL_DIR>/<model_name>.keras for each model, the
+label table and a manifest. When they are present the engines load from them
+and decode labels from the local table, without any network access.
+"""
+import os
+import json
+import threading
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+MODEL_DIR = os.getenv('MODEL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+LABELS_FILE = 'imagenet_class_index.json'
+MANIFEST_FILE = 'manifest.json'
+
+def model_path(model_name, model_dir=None):
+    return os.path.join(model_dir or MODEL_DIR, f"{model_name}.keras")
+
+def has_model(model_name, model_dir=None):
+    return os.path.isfile(model_path(model_name, model_dir))
+
+def read_manifest(model_dir=None):
+    try:
+        with open(os.path.join(model_dir or MODEL_DIR, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_manifest(manifest, model_dir=None):
+    path = os.path.join(model_dir or MODEL_DIR, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+
+class LabelTable:
+    """
+    Offline replacement for keras decode_predictions, reading the ImageNet
+    class index from a local JSON file the first time it is needed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._classes = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._classes is None:
+                with open(self.path) as f:
+                    index = json.load(f)
+                self._classes = [tuple(index[str(i)]) for i in range(len(index))]
+            return self._classes
+
+    def decode_predictions(self, preds, top=5):
+        """Same output as keras decode_predictions: per row, (class_id, class_name, score) tuples."""
+        classes = self._load()
+        preds = np.asarray(preds)
+        results = []
+        for row in preds:
+            top_indices = np.argsort(row)[-top:][::-1]
+            results.append([(*classes[i], float(row[i])) for i in top_indices])
+        return results
+
+# One table per file, shared by every engine
+_tables = {}
+_tables_lock = threading.Lock()
+
+def label_table(model_dir=None):
+    """The local label table, or None when it has not been exported."""
+    path = os.path.join(model_dir or MODEL_DIR, LABELS_FILE)
+    if not os.path.isfile(path):
+        return None
+    with _tables_lock:
+        if path not in _tables:
+            _tables[path] = LabelTable(path)
+        return _tables[path]
@@ -0,0 +1,20 @@
+"""
+Names and input sizes of the supported models, the auto-tune search strategies
+and the iterative attack methods.
+
+Kept apart from fgsm so that modules which only need to validate a model name,
+a search strategy or an attack method do not import TensorFlow.
+"""
+
+SUPPORTED_MODELS = ('mobilenet_v2', 'inception_v3', 'vgg19', 'densenet121')
+# Keras application class, preprocessing module and input size for each model
+MODEL_APPLICATIONS = {
+    'mobilenet_v2': ('MobileNetV2', 'mobilenet_v2', (224, 224)),
+    'inception_v3': ('InceptionV3', 'inception_v3', (299, 299)),
+    'vgg19': ('VGG19', 'vgg19', (224, 224)),
+    'densenet121': ('DenseNet121', 'densenet', (224, 224)),
+}
+# How auto_tune_attack scans candidate epsilons
+SEARCH_STRATEGIES = ('linear', 'batched', 'bisect')
+# Multi-step attacks run by iterative.IterativeAttack
+ITERATIVE_METHODS = ('bim', 'pgd', 'mifgsm')
@@ -0,0 +1,189 @@
+import os
+import sys
+import multiprocessing
+import threading
+import time
+from collections import OrderedDict
+from dotenv import load_dotenv
+from model_catalog import SUPPORTED_MODELS
+import model_artifacts
+from batching import BatchScheduler
+from model_server import ModelServer
+
+# Load environment variables
+load_dotenv()
+
+def warmup_models():
+    return [name.strip() for name in os.getenv('WARMUP_MODELS', 'mobilenet_v2,inception_v3').split(',')
+            if name.strip()]
+
+def fetch_weights(model_names):
+    """
+    Load each model once so its weights are downloaded and cached. Exits with
+    status 1, naming the models, if any of them could not be fetched.
+    """
+    import fgsm
+    failed = []
+    for model_name in model_names:
+        try:
+            fgsm.FGSM(model_name=model_name, defer_build=True)
+        except Exception as e:
+            print(f"Error fetching weights for {model_name}: {e}")
+            failed.append(model_name)
+    if failed:
+        sys.exit(f"Could not fetch weights for {', '.join(failed)}")
+
+class ModelRegistry:
+    """
+    Process-wide cache of FGSM engines, one per model name.
+
+    Each model is loaded and warmed up once, then handed to every request that
+    asks for it. When a memory budget is set, the least recently used engines
+    are dropped to make room for newly requested ones. With batching enabled,
+    each engine gets a BatchScheduler so concurrent attacks share passes.
+    With MODEL_SERVER_WORKERS set, engines run their passes in a ModelServer
+    worker pool instead of this process.
+    """
+
+    def __init__(self, memory_budget_mb=None, batching=None, model_server=None):
+        if memory_budget_mb is None:
+            memory_budget_mb = float(os.getenv('MODEL_MEMORY_BUDGET_MB', '0'))
+        if batching is None:
+            batching = os.getenv('BATCHING_ENABLED', 'false').lower() == 'true'
+        # A budget of 0 means "never evict"
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.batching = batching
+        self.batch_max_size = int(os.getenv('BATCH_MAX_SIZE', '8'))
+        self.batch_max_wait_ms = float(os.getenv('BATCH_MAX_WAIT_MS', '5'))
+        if model_server is None and int(os.getenv('MODEL_SERVER_WORKERS', '0')) > 0:
+            model_server = ModelServer()
+        self.model_server = model_server
+        self._engines = OrderedDict()  # model_name -> FGSM, least recently used first
+        self._footprints = {}
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    def get(self, model_name):
+        """Return a ready FGSM engine for model_name, loading it on first use."""
+        model_name = model_name.lower()
+        if model_name not in SUPPORTED_MODELS:
+            raise ValueError("Unsupported model.")
+
+        engine = self._lookup(model_name)
+        if engine is not None:
+            return engine
+
+        with self._lock:
+            load_lock = self._load_locks.setdefault(model_name, threading.Lock())
+
+        # Only one thread builds a given model; the others wait and reuse it
+        with load_lock:
+            engine = self._lookup(model_name)
+            if engine is not None:
+                return engine
+            engine = self._load(model_name)
+            with self._lock:
+                self._engines[model_name] = engine
+                self.loads += 1
+                self._footprints[model_name] = int(engine.memory_footprint())
+                self._evict(keep=model_name)
+        return engine
+
+    def warm_up(self, model_names=None):
+        """Load and warm up the given models, defaulting to WARMUP_MODELS."""
+        if model_names is None:
+            model_names = warmup_models()
+        for model_name in model_names:
+            try:
+                self.get(model_name)
+            except Exception as e:
+                print(f"Error warming up {model_name}: {e}")
+
+    def preload(self, model_names=None):
+        """
+        Fetch the weight files of the given models (default WARMUP_MODELS) in a
+        separate process, without running TensorFlow in this one.
+
+        A pre-forking server calls this in its master so that its workers find
+        the weights on disk instead of all downloading them at once. The models
+        themselves are built in each worker: TensorFlow graphs cannot run in a
+        process forked from one that has already built a model.
+        """
+        if self.model_server is not None:
+            # The model server processes load the weights themselves
+            return
+        # Models exported with export_models.py are already on disk
+        model_names = [name for name in model_names or warmup_models() if not model_artifacts.has_model(name)]
+        if not model_names:
+            return
+        start_time = time.time()
+        process = multiprocessing.get_context('spawn').Process(target=fetch_weights, args=(model_names,))
+        process.start()
+        process.join()
+        if process.exitcode != 0:
+            # The child has named the models it could not fetch; workers download those themselves
+            print(f"Fetching model weights for {', '.join(model_names)} failed with exit code {process.exitcode}")
+        else:
+            print(f"Fetched weights for {', '.join(model_names)} in {time.time() - start_time:.2f} seconds")
+
+    def loaded_models(self):
+        with self._lock:
+            return list(self._engines)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "loaded_models": list(self._engines),
+                "memory_bytes": sum(self._footprints.values()),
+                "memory_budget_bytes": self.memory_budget,
+                "hits": self.hits,
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "engines": {name: engine.stats() for name, engine in self._engines.items()},
+                "model_server": self.model_server.stats() if self.model_server is not None else None,
+            }
+
+    def _lookup(self, model_name):
+        with self._lock:
+            engine = self._engines.get(model_name)
+            if engine is not None:
+                self._engines.move_to_end(model_name)
+                self.hits += 1
+            return engine
+
+    def _load(self, model_name):
+        start_time = time.time()
+        # fgsm pulls in TensorFlow, so it is imported by the first load rather
+        # than with this module; routes that never attack never pay for it
+        import fgsm
+        if self.model_server is not None:
+            engine = fgsm.RemoteFGSM(self.model_server, model_name=model_name)
+        else:
+            engine = fgsm.FGSM(model_name=model_name)
+        engine.warm_up()
+        if self.batching:
+            engine.scheduler = BatchScheduler(engine, self.batch_max_size, self.batch_max_wait_ms)
+        print(f"Registered {model_name} in {time.time() - start_time:.2f} seconds")
+        return engine
+
+    def _evict(self, keep):
+        """Drop least recently used engines until the budget is met. Caller holds the lock."""
+        if not self.memory_budget:
+            return
+        while sum(self._footprints.values()) > self.memory_budget and len(self._engines) > 1:
+            model_name = next(name for name in self._engines if name != keep)
+            engine = self._engines.pop(model_name)
+            # Requests still holding the engine fall back to unbatched attacks
+            scheduler, engine.scheduler = engine.scheduler, None
+            if scheduler is not None:
+                scheduler.close()
+            del self._footprints[model_name]
+            self.evictions += 1
+            print(f"Evicted {model_name} from the model registry")
+
+
+# Shared by every request handler in this process
+model_registry = ModelRegistry()
@@ -0,0 +1,312 @@
+import os
+import atexit
+import queue
+import threading
+import time
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy as np
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Every supported model is an ImageNet classifier
+NUM_CLASSES = 1000
+
+def parse_cpu_sets(spec):
+    """Parse "0-1;2,3" into [{0, 1}, {2, 3}]."""
+    cpu_sets = []
+    for group in spec.split(';'):
+        cpus = set()
+        for part in group.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            if '-' in part:
+                first, last = part.split('-', 1)
+                cpus.update(range(int(first), int(last) + 1))
+            else:
+                cpus.add(int(part))
+        if cpus:
+            cpu_sets.append(cpus)
+    return cpu_sets
+
+def split_cpus(num_workers):
+    """Divide the CPUs this process may use into num_workers contiguous sets."""
+    if not hasattr(os, 'sched_getaffinity'):
+        return [None] * num_workers
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < num_workers:
+        # More workers than cores: let them share every core
+        return [set(cpus)] * num_workers
+    share = len(cpus) // num_workers
+    return [set(cpus[i * share:(i + 1) * share]) for i in range(num_workers)]
+
+def load_engine(model_name, num_threads):
+    """Default worker engine: a warmed-up FGSM with TensorFlow limited to the worker's cores."""
+    from fgsm import FGSM
+    from runtime_config import thread_config
+    # Each worker serves one request at a time on its own cores
+    thread_config.apply(cpus=num_threads, workers=1, threads=1)
+    engine = FGSM(model_name=model_name, scoring_backend='keras')
+    engine.warm_up()
+    return engine
+
+def _worker_main(connection, cpus, engine_factory):
+    """
+    Worker process loop. Requests arrive as small tuples on the pipe; the
+    tensors themselves are read from and written to the shared-memory block
+    named in each request.
+    """
+    if cpus and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cpus)
+    num_threads = len(cpus) if cpus else (os.cpu_count() or 1)
+    engines = {}
+    block = None
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+        op, model_name, block_name = request[:3]
+        try:
+            engine = engines.get(model_name)
+            if engine is None:
+                engine = engines[model_name] = engine_factory(model_name, num_threads)
+            if op == 'load':
+                connection.send(('ok', None))
+                continue
+            if block is None or block.name != block_name:
+                if block is not None:
+                    block.close()
+                block = shared_memory.SharedMemory(name=block_name)
+            image_shape, label_shape = request[3], request[4]
+            images = np.ndarray(image_shape, dtype=np.float32, buffer=block.buf)
+            output_offset = images.nbytes
+            if op == 'predict':
+                probs = np.asarray(engine.predict(images.copy()), dtype=np.float32)
+            elif op == 'gradient':
+                labels = np.ndarray(label_shape, dtype=np.float32, buffer=block.buf, offset=images.nbytes)
+                gradient, probs = engine.gradient_and_prediction(images.copy(), labels.copy())
+                output_offset += labels.nbytes
+                gradient_out = np.ndarray(image_shape, dtype=np.float32, buffer=block.buf, offset=output_offset)
+                gradient_out[...] = np.asarray(gradient, dtype=np.float32)
+                output_offset += gradient_out.nbytes
+                probs = np.asarray(probs, dtype=np.float32)
+            else:
+                raise ValueError(f"Unknown model server operation: {op}")
+            if output_offset + probs.nbytes > block.size:
+                raise ValueError("Shared-memory block is too small for the result")
+            np.ndarray(probs.shape, dtype=np.float32, buffer=block.buf, offset=output_offset)[...] = probs
+            connection.send(('ok', probs.shape))
+        except Exception as e:
+            connection.send(('error', f"{type(e).__name__}: {e}"))
+    if block is not None:
+        block.close()
+
+class _WorkerSlot:
+    """One worker process with its pipe and the shared-memory block it reads and writes."""
+
+    def __init__(self, index, cpus, engine_factory, block_bytes, context):
+        self.index = index
+        self.cpus = cpus
+        self.engine_factory = engine_factory
+        self.context = context
+        self.block = shared_memory.SharedMemory(create=True, size=block_bytes)
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self.restarts = 0
+        self.process = None
+        self.connection = None
+        self.start()
+
+    def start(self):
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(
+            target=_worker_main, args=(child_connection, self.cpus, self.engine_factory),
+            name=f"model-server-{self.index}", daemon=True
+        )
+        self.process.start()
+        child_connection.close()
+
+    def restart(self):
+        self.restarts += 1
+        self.connection.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.start()
+
+    def ensure_capacity(self, num_bytes):
+        if num_bytes <= self.block.size:
+            return
+        # The worker attaches to the new block by name on its next request
+        self.block.close()
+        self.block.unlink()
+        self.block = shared_memory.SharedMemory(create=True, size=num_bytes)
+
+    def call(self, request):
+        start_time = time.perf_counter()
+        try:
+            self.connection.send(request)
+            status, payload = self.connection.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            print(f"Model server worker {self.index} died, restarting it")
+            self.restart()
+            raise RuntimeError("Model server worker died while handling the request")
+        finally:
+            self.requests += 1
+            self.busy_seconds += time.perf_counter() - start_time
+        if status != 'ok':
+            raise RuntimeError(f"Model server worker {self.index} failed: {payload}")
+        return payload
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.kill()
+        self.connection.close()
+        self.block.close()
+        self.block.unlink()
+
+class ModelServer:
+    """
+    Pool of inference worker processes, each pinned to its own set of cores.
+
+    Every worker loads the models it is asked for and runs predictions and
+    gradients on them, so TensorFlow execution no longer competes with the
+    Flask process for the GIL. Tensors travel through a shared-memory block per
+    worker; only a small request tuple goes through the pipe. A request is
+    served by whichever worker is idle first.
+    """
+
+    def __init__(self, num_workers=None, cpu_sets=None, block_mb=None, engine_factory=load_engine):
+        if num_workers is None:
+            num_workers = int(os.getenv('MODEL_SERVER_WORKERS', '0'))
+        if cpu_sets is None and os.getenv('MODEL_SERVER_CPUS'):
+            cpu_sets = parse_cpu_sets(os.getenv('MODEL_SERVER_CPUS'))
+        if block_mb is None:
+            block_mb = float(os.getenv('MODEL_SERVER_BLOCK_MB', '16'))
+        if num_workers < 1:
+            raise ValueError("The model server needs at least one worker")
+        if cpu_sets is None:
+            cpu_sets = split_cpus(num_workers)
+        if len(cpu_sets) < num_workers:
+            raise ValueError(f"{num_workers} workers need {num_workers} CPU sets, got {len(cpu_sets)}")
+        self.num_workers = num_workers
+        self.cpu_sets = cpu_sets[:num_workers]
+        self.block_bytes = int(block_mb * 1024 * 1024)
+        self.engine_factory = engine_factory
+        self._slots = []
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        # load() holds every worker at once; two loads taking them in turns would deadlock
+        self._load_lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_started(self):
+        # Processes are spawned on first use, not when the module is imported
+        with self._lock:
+            if self._slots or self._closed:
+                return
+            # TensorFlow is not fork-safe, so workers start from a fresh interpreter
+            context = multiprocessing.get_context('spawn')
+            for index, cpus in enumerate(self.cpu_sets):
+                slot = _WorkerSlot(index, cpus, self.engine_factory, self.block_bytes, context)
+                self._slots.append(slot)
+                self._idle.put(slot)
+            atexit.register(self.close)
+            print(f"Started {self.num_workers} model server workers on CPUs "
+                  f"{[sorted(cpus) if cpus else 'any' for cpus in self.cpu_sets]}")
+
+    def load(self, model_name):
+        """Load model_name in every worker, so any of them can serve it."""
+        self._ensure_started()
+        with self._load_lock:
+            slots = [self._idle.get() for _ in range(self.num_workers)]
+            try:
+                for slot in slots:
+                    slot.call(('load', model_name, slot.block.name))
+            finally:
+                for slot in slots:
+                    self._idle.put(slot)
+
+    def predict(self, model_name, images):
+        """Class probabilities for a batch of preprocessed images."""
+        images = np.ascontiguousarray(images, dtype=np.float32)
+        num_bytes = images.nbytes + len(images) * NUM_CLASSES * 4
+        slot, probs_shape = self._send(model_name, 'predict', images, None, num_bytes)
+        try:
+            return np.ndarray(probs_shape, dtype=np.float32, buffer=slot.block.buf, offset=images.nbytes).copy()
+        finally:
+            self._idle.put(slot)
+
+    def gradient_and_prediction(self, model_name, images, labels):
+        """Loss gradient with respect to the images, plus the probabilities from the same pass."""
+        images = np.ascontiguousarray(images, dtype=np.float32)
+        labels = np.ascontiguousarray(labels, dtype=np.float32)
+        num_bytes = 2 * images.nbytes + labels.nbytes + len(images) * NUM_CLASSES * 4
+        slot, probs_shape = self._send(model_name, 'gradient', images, labels, num_bytes)
+        try:
+            offset = images.nbytes + labels.nbytes
+            gradient = np.ndarray(images.shape, dtype=np.float32, buffer=slot.block.buf, offset=offset).copy()
+            probs = np.ndarray(probs_shape, dtype=np.float32, buffer=slot.block.buf,
+                               offset=offset + images.nbytes).copy()
+            return gradient, probs
+        finally:
+            self._idle.put(slot)
+
+    def _send(self, model_name, op, images, labels, num_bytes):
+        """Write the inputs into an idle worker's block and run op. The caller releases the slot."""
+        self._ensure_started()
+        if self._closed:
+            raise RuntimeError("Model server is closed")
+        slot = self._idle.get()
+        try:
+            slot.ensure_capacity(num_bytes)
+            np.ndarray(images.shape, dtype=np.float32, buffer=slot.block.buf)[...] = images
+            label_shape = None
+            if labels is not None:
+                np.ndarray(labels.shape, dtype=np.float32, buffer=slot.block.buf, offset=images.nbytes)[...] = labels
+                label_shape = labels.shape
+            probs_shape = slot.call((op, model_name, slot.block.name, images.shape, label_shape))
+        except Exception:
+            self._idle.put(slot)
+            raise
+        return slot, probs_shape
+
+    def stats(self):
+        with self._lock:
+            slots = list(self._slots)
+        return {
+            "workers": [
+                {
+                    "pid": slot.process.pid,
+                    "alive": slot.process.is_alive(),
+                    "cpus": sorted(slot.cpus) if slot.cpus else None,
+                    "requests": slot.requests,
+                    "busy_seconds": round(slot.busy_seconds, 3),
+                    "restarts": slot.restarts,
+                    "block_bytes": slot.block.size,
+                }
+                for slot in slots
+            ],
+            "idle_workers": self._idle.qsize(),
+        }
+
+    def close(self):
+        """Stop the workers and free their shared memory."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            slots, self._slots = self._slots, []
+        for slot in slots:
+            slot.close()
@@ -0,0 +1,129 @@
+import os
+import hmac
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+class PasswordHasherBusy(Exception):
+    pass
+
+def _to_bytes(value):
+    return value.encode('utf-8') if isinstance(value, str) else value
+
+def hash_password(password, rounds):
+    return bcrypt.hashpw(_to_bytes(password), bcrypt.gensalt(rounds))
+
+def check_password(pw_hash, password):
+    pw_hash = _to_bytes(pw_hash)
+    return hmac.compare_digest(bcrypt.hashpw(_to_bytes(password), pw_hash), pw_hash)
+
+def hash_rounds(pw_hash):
+    """The cost factor of a bcrypt hash ('$2b$12$...'), or None if it is not one"""
+    parts = str(pw_hash).split('$')
+    if len(parts) != 4 or parts[1] not in ('2a', '2b', '2y') or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification off the request threads.
+
+    Same generate_password_hash/check_password_hash interface as Flask-Bcrypt,
+    but each call runs in a pool of worker processes (started with spawn on
+    first use, so the TensorFlow-heavy server process is never forked). At
+    most max_pending calls are admitted at once; a caller that cannot get a
+    slot within queue_timeout seconds gets PasswordHasherBusy instead of piling
+    more CPU work onto a login storm. With workers=0 the hashing runs inline.
+    """
+
+    def __init__(self, rounds=None, workers=None, max_pending=None, queue_timeout=None):
+        self.rounds = rounds or int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+        if workers is None:
+            workers = int(os.getenv('BCRYPT_WORKERS', '2'))
+        self.workers = workers
+        self.max_pending = max_pending or int(os.getenv('BCRYPT_MAX_PENDING', str(max(1, workers) * 4)))
+        if queue_timeout is None:
+            queue_timeout = float(os.getenv('BCRYPT_QUEUE_TIMEOUT', '5'))
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self.hashes = 0
+        self.checks = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.total_seconds = 0.0
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+                self._pid = os.getpid()
+            return self._pool
+
+    def _run(self, counter, function, *args):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy(f"{self.max_pending} password checks already in progress")
+        start_time = time.perf_counter()
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            self.in_flight += 1
+        try:
+            if self.workers <= 0:
+                return function(*args)
+            return self._executor().submit(function, *args).result()
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call
+            with self._lock:
+                self._pool = None
+            raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.total_seconds += time.perf_counter() - start_time
+            self._slots.release()
+
+    def generate_password_hash(self, password, rounds=None):
+        """bcrypt hash of password as bytes, at the configured cost unless rounds is given"""
+        return self._run('hashes', hash_password, password, rounds or self.rounds)
+
+    def check_password_hash(self, pw_hash, password):
+        return self._run('checks', check_password, pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        """True if pw_hash is not a bcrypt hash at the configured cost"""
+        return hash_rounds(pw_hash) != self.rounds
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None and self._pid == os.getpid():
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            calls = self.hashes + self.checks
+            return {
+                "rounds": self.rounds,
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "hashes": self.hashes,
+                "checks": self.checks,
+                "rejected": self.rejected,
+                "mean_ms": round(self.total_seconds / calls * 1000, 2) if calls else 0.0,
+            }
+
+# Shared by every request thread in this process
+password_hasher = PasswordHasher()
@@ -1,9 +1,9 @@
 import sys
-from flask_bcrypt import Bcrypt
 from db import execute_query, get_connection
+from password_hashing import password_hasher
 
-# Initialize bcrypt
-bcrypt = Bcrypt()
+# Hash at the same configured cost as the server
+bcrypt = password_hasher
 
 def reset_user_password(email, new_password):
     """Reset a user's password to a new known value"""
@@ -0,0 +1,132 @@
+import os
+import math
+import threading
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+THREAD_PROFILES = ('latency', 'throughput')
+
+def _read(path):
+    with open(path) as f:
+        return f.read().strip()
+
+def cgroup_cpu_limit(root='/sys/fs/cgroup'):
+    """
+    CPU limit of this container in cores (e.g. 1.5), from cgroup v2 cpu.max or
+    the cgroup v1 CFS quota, or None when there is no limit.
+    """
+    try:
+        quota, period = _read(os.path.join(root, 'cpu.max')).split()[:2]
+        return None if quota == 'max' else int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    for controller in ('cpu', 'cpu,cpuacct'):
+        try:
+            quota = int(_read(os.path.join(root, controller, 'cpu.cfs_quota_us')))
+            period = int(_read(os.path.join(root, controller, 'cpu.cfs_period_us')))
+            return None if quota <= 0 else quota / period
+        except (OSError, ValueError):
+            continue
+    return None
+
+def available_cpus(root='/sys/fs/cgroup'):
+    """Cores this process can actually use: its affinity mask capped by the cgroup limit."""
+    if hasattr(os, 'sched_getaffinity'):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit(root)
+    if limit is not None:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
+
+def plan_threads(cpus, workers=1, threads=1, profile='latency'):
+    """
+    TensorFlow intra-op and inter-op pool sizes for one of `workers` processes
+    sharing `cpus` cores, each serving up to `threads` requests at once.
+
+    Every process gets an equal share of the cores. 'latency' gives a single
+    request's ops the whole share, so one attack finishes as fast as possible;
+    'throughput' splits the share between the concurrent requests so they do
+    not fight over the same cores.
+    """
+    if profile not in THREAD_PROFILES:
+        raise ValueError(f"Unsupported thread profile: {profile}")
+    share = max(1, cpus // max(1, workers))
+    if profile == 'latency':
+        return {"intra_op": share, "inter_op": min(2, share)}
+    return {"intra_op": max(1, share // max(1, threads)), "inter_op": max(1, min(threads, share))}
+
+class ThreadingConfig:
+    """
+    Sizes TensorFlow's thread pools for this process.
+
+    TensorFlow only accepts thread counts before it runs its first op, so
+    apply() is called before any model is built and only its first call takes
+    effect. TF_INTRA_OP_THREADS and TF_INTER_OP_THREADS override the plan
+    computed from the CPU limit, the request workers and TF_THREAD_PROFILE.
+    """
+
+    def __init__(self, profile=None, intra_op=None, inter_op=None, cgroup_root='/sys/fs/cgroup'):
+        self.profile = profile or os.getenv('TF_THREAD_PROFILE', 'latency').lower()
+        if self.profile not in THREAD_PROFILES:
+            raise ValueError(f"Unsupported thread profile: {self.profile}")
+        self.intra_op = intra_op or int(os.getenv('TF_INTRA_OP_THREADS', '0'))
+        self.inter_op = inter_op or int(os.getenv('TF_INTER_OP_THREADS', '0'))
+        self.cgroup_root = cgroup_root
+        self._lock = threading.Lock()
+        self._applied = None
+
+    def plan(self, cpus=None, workers=None, threads=None):
+        """Thread counts for the given (or detected) cores and request concurrency."""
+        if cpus is None:
+            cpus = available_cpus(self.cgroup_root)
+        # Gunicorn passes its settings to apply(); these cover other launchers
+        if workers is None:
+            workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+        if threads is None:
+            threads = int(os.getenv('GUNICORN_THREADS', '1'))
+        plan = plan_threads(cpus, workers, threads, self.profile)
+        if self.intra_op:
+            plan["intra_op"] = self.intra_op
+        if self.inter_op:
+            plan["inter_op"] = self.inter_op
+        plan.update({"cpus": cpus, "workers": workers, "threads": threads, "profile": self.profile})
+        return plan
+
+    def apply(self, cpus=None, workers=None, threads=None):
+        """Set TensorFlow's pools from plan() the first time this is called in a process."""
+        with self._lock:
+            if self._applied is not None:
+                return self._applied
+            import tensorflow as tf
+            plan = self.plan(cpus, workers, threads)
+            try:
+                tf.config.threading.set_intra_op_parallelism_threads(plan["intra_op"])
+                tf.config.threading.set_inter_op_parallelism_threads(plan["inter_op"])
+                plan["applied"] = True
+            except RuntimeError as e:
+                # TensorFlow already ran an op in this process and keeps its pools
+                print(f"TensorFlow thread pools are already initialised, keeping them: {e}")
+                plan["applied"] = False
+            self._applied = plan
+            print(f"TensorFlow threads: intra-op {plan['intra_op']}, inter-op {plan['inter_op']} "
+                  f"({plan['cpus']} CPUs, {plan['workers']} workers x {plan['threads']} threads, "
+                  f"{plan['profile']} profile)")
+            return plan
+
+    def stats(self):
+        with self._lock:
+            applied = dict(self._applied) if self._applied is not None else None
+        if applied is not None:
+            import tensorflow as tf
+            # 0 means TensorFlow picked the size itself
+            applied["effective_intra_op"] = tf.config.threading.get_intra_op_parallelism_threads()
+            applied["effective_inter_op"] = tf.config.threading.get_inter_op_parallelism_threads()
+        return {"cgroup_cpu_limit": cgroup_cpu_limit(self.cgroup_root), "tensorflow": applied}
+
+
+# Shared by every engine in this process
+thread_config = ThreadingConfig()
@@ -50,10 +50,11 @@ def main():
         return False
     
     # Step 3: Run the application
+    # This is the development server; production runs gunicorn -c gunicorn.conf.py wsgi:app
     print("\nStarting the Flask application...")
     try:
         import app
-        app.app.run(debug=True)
+        app.app.run(debug=os.getenv('FLASK_DEBUG', 'false').lower() == 'true')
         return True
     except Exception as e:
         print(f"❌ Error starting application: {e}")
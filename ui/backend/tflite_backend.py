@@ -0,0 +1,66 @@
+import threading
+import time
+import numpy as np
+import tensorflow as tf
+
+try:
+    # LiteRT is the maintained home of the TFLite interpreter
+    from ai_edge_litert.interpreter import Interpreter
+except ImportError:
+    Interpreter = tf.lite.Interpreter
+
+TFLITE_QUANTIZATIONS = ('float16', 'int8')
+
+class TFLiteScorer:
+    """
+    Forward-only, quantized copy of a Keras classifier for cheap candidate scoring.
+
+    'float16' stores the weights as float16. 'int8' quantizes the weights to
+    int8 and, when calibration_images are given, the activations too. Inputs
+    and outputs stay float32, so predict() is a drop-in replacement for the
+    Keras forward pass. Gradients still have to come from the Keras model.
+    """
+
+    def __init__(self, model, quantization='float16', calibration_images=None, num_threads=None):
+        if quantization not in TFLITE_QUANTIZATIONS:
+            raise ValueError(f"Unsupported TFLite quantization: {quantization}")
+        self.quantization = quantization
+        start_time = time.time()
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if quantization == 'float16':
+            converter.target_spec.supported_types = [tf.float16]
+        elif calibration_images is not None:
+            def representative_dataset():
+                for image in calibration_images:
+                    yield [np.asarray(image, dtype=np.float32)[None, ...]]
+            converter.representative_dataset = representative_dataset
+        self.model_content = converter.convert()
+        self.conversion_seconds = time.time() - start_time
+
+        self._interpreter = Interpreter(model_content=self.model_content, num_threads=num_threads)
+        self._input_index = self._interpreter.get_input_details()[0]['index']
+        self._output_index = self._interpreter.get_output_details()[0]['index']
+        self._batch_size = None
+        # An interpreter holds its tensors in place, so calls must not overlap
+        self._lock = threading.Lock()
+        print(f"Converted model to TFLite {quantization} ({len(self.model_content) / 1024 / 1024:.1f} MB) "
+              f"in {self.conversion_seconds:.2f} seconds")
+
+    def predict(self, images):
+        images = np.asarray(images, dtype=np.float32)
+        with self._lock:
+            if images.shape[0] != self._batch_size:
+                self._interpreter.resize_tensor_input(self._input_index, list(images.shape))
+                self._interpreter.allocate_tensors()
+                self._batch_size = images.shape[0]
+            self._interpreter.set_tensor(self._input_index, images)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
+
+    def stats(self):
+        return {
+            "quantization": self.quantization,
+            "model_bytes": len(self.model_content),
+            "conversion_seconds": self.conversion_seconds,
+        }
@@ -0,0 +1,34 @@
+"""
+Production entry point: gunicorn -c gunicorn.conf.py wsgi:app
+
+gunicorn.conf.py sets preload_app, so this module is imported once in the
+master process before the workers are forked. The Flask app and its modules
+are imported there, and preload() also imports fgsm (and TensorFlow with it),
+which the app otherwise imports only when the first model is loaded; the
+workers then share those modules copy-on-write instead of each paying for the
+import. The database is checked once and the model weights are fetched to
+disk once. Each
+worker then builds and warms up its own engines in prepare_worker(), because
+TensorFlow graphs hang in a process forked after a model has been built.
+"""
+from app import app, init_db, model_registry, job_manager
+from runtime_config import thread_config
+
+def preload():
+    # Importing TensorFlow is safe before fork; only building a model is not
+    print("Importing TensorFlow...")
+    import fgsm  # noqa: F401
+    print("Initializing database...")
+    init_db()
+    print("Fetching model weights...")
+    model_registry.preload()
+
+def prepare_worker(workers=None, threads=None):
+    # Size TensorFlow's thread pools for this worker's share of the CPUs
+    thread_config.apply(workers=workers, threads=threads)
+    print("Warming up models...")
+    model_registry.warm_up()
+    print("Recovering unfinished attack jobs...")
+    job_manager.recover()
+
+preload()
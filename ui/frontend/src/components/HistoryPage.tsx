@@ -18,38 +18,51 @@ const HistoryPage: React.FC = () => {
   const [isLoading, setIsLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
 
-  useEffect(() => {
-    const fetchHistory = async () => {
-      try {
-        const token = localStorage.getItem('token');
-        if (!token) {
-          setError('Authentication required');
-          setIsLoading(false);
-          return;
-        }
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState<boolean>(false);
+
+  // Pages come newest first; next_cursor is null on the last page
+  const fetchHistory = async (cursor: string | null = null) => {
+    const token = localStorage.getItem('token');
+    if (!token) {
+      setError('Authentication required');
+      return;
+    }
 
-        const response = await axios.get('http://localhost:5000/history', {
-          headers: {
-            'Authorization': `Bearer ${token}`
-          }
-        });
+    const response = await axios.get('http://localhost:5000/history', {
+      headers: {
+        'Authorization': `Bearer ${token}`
+      },
+      params: cursor ? { cursor } : {}
+    });
 
-        if (response.data.success) {
-          setHistory(response.data.history);
-        } else {
-          setError('Failed to load history');
-        }
-      } catch (err) {
+    if (response.data.success) {
+      setHistory((previous) => (cursor ? [...previous, ...response.data.history] : response.data.history));
+      setNextCursor(response.data.next_cursor || null);
+    } else {
+      setError('Failed to load history');
+    }
+  };
+
+  useEffect(() => {
+    fetchHistory()
+      .catch((err) => {
         setError('Error fetching history');
         console.error(err);
-      } finally {
-        setIsLoading(false);
-      }
-    };
-
-    fetchHistory();
+      })
+      .finally(() => setIsLoading(false));
   }, []);
 
+  const loadMore = () => {
+    setIsLoadingMore(true);
+    fetchHistory(nextCursor)
+      .catch((err) => {
+        setError('Error fetching history');
+        console.error(err);
+      })
+      .finally(() => setIsLoadingMore(false));
+  };
+
   const formatDate = (dateString: string) => {
     const date = new Date(dateString);
     return date.toLocaleString();
@@ -120,6 +133,25 @@ const HistoryPage: React.FC = () => {
                 ))}
               </tbody>
             </table>
+            {nextCursor && (
+              <div style={{ textAlign: 'center', marginTop: '20px' }}>
+                <button
+                  onClick={loadMore}
+                  disabled={isLoadingMore}
+                  style={{
+                    padding: '10px 16px',
+                    cursor: 'pointer',
+                    backgroundColor: '#4a90e2',
+                    color: 'white',
+                    border: 'none',
+                    borderRadius: '4px',
+                    fontSize: '16px'
+                  }}
+                >
+                  {isLoadingMore ? 'Loading...' : 'Load more'}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>